@@ -0,0 +1,18 @@
+from fastapi import HTTPException
+
+from app.services.readiness import readiness
+
+def require_ready(*components: str):
+    """Dependency that fails fast with 503 while a needed component is still warming up"""
+    async def dependency():
+        waiting = readiness.not_ready(components)
+        if waiting:
+            raise HTTPException(
+                status_code=503,
+                detail={
+                    "status": "degraded",
+                    "waiting_for": {name: readiness.state(name) for name in waiting}
+                },
+                headers={"Retry-After": "5"}
+            )
+    return dependency
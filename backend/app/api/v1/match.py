@@ -0,0 +1,111 @@
+# backend/app/api/v1/match.py
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List
+import json
+import logging
+
+from app.api.deps import require_ready
+from app.services.match_pipeline import MatchPipeline
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+class MatchRequest(BaseModel):
+    job_description: str = Field(..., min_length=1)
+    personal_story: str = ""
+    limit: int = Field(5, ge=1, le=20)
+
+class EmailDraftRequest(BaseModel):
+    job_description: str = Field(..., min_length=1)
+    resume_content: str = Field(..., min_length=1)
+    personal_story: str = ""
+
+class BulkMatchRequest(BaseModel):
+    job_descriptions: List[str] = Field(..., min_length=1, max_length=500)
+    limit: int = Field(5, ge=1, le=50)
+
+def _summarize(match: dict) -> dict:
+    """Drop full resume text from streamed results"""
+    return {
+        "id": match["id"],
+        "file_name": match.get("file_name"),
+        "file_path": match.get("file_path"),
+        "score": match["score"],
+        "keyword_matches": match.get("keyword_matches", []),
+        "best_section": match.get("best_section")
+    }
+
+@router.post("/", dependencies=[Depends(require_ready("encoder", "weaviate"))])
+async def find_match(payload: MatchRequest, request: Request, user_id: int = Query(...)):
+    """Find the best resume for a job and generate gap analysis and an outreach email, with per-stage timings"""
+    pipeline = MatchPipeline(
+        request.app.state.vector_service, request.app.state.ml_service, search_limit=payload.limit
+    )
+    result = await pipeline.run(payload.job_description, user_id, payload.personal_story)
+    search_status = result["timings"]["search"]["status"]
+    if search_status != "ok":
+        # Nothing to match against; an empty result here would look like a user with no resumes
+        raise HTTPException(
+            status_code=503,
+            detail={"status": "degraded", "search": search_status},
+            headers={"Retry-After": "5"}
+        )
+    if result["best_resume"] is None:
+        raise HTTPException(status_code=400, detail="No resumes uploaded")
+
+    best = result["best_resume"]
+    return {
+        "best_resume": {**_summarize(best), "content": best["content"]} if best else None,
+        "alternatives": [_summarize(match) for match in result["alternatives"]],
+        "gap_analysis": result["gap_analysis"],
+        "email_draft": result["email_draft"],
+        "timings": result["timings"],
+        "total_ms": result["total_ms"]
+    }
+
+@router.post("/bulk", dependencies=[Depends(require_ready("encoder", "weaviate"))])
+async def bulk_match(payload: BulkMatchRequest, request: Request, user_id: int = Query(...)):
+    """Match many job descriptions at once, streaming one NDJSON line per job as it is scored"""
+    vector_service = request.app.state.vector_service
+
+    async def stream():
+        try:
+            async for result in vector_service.match_jobs(payload.job_descriptions, user_id, limit=payload.limit):
+                yield json.dumps({
+                    "index": result["index"],
+                    "matches": [_summarize(match) for match in result["matches"]]
+                }) + "\n"
+        except Exception as e:
+            logger.error(f"Bulk match failed: {str(e)}")
+            yield json.dumps({"error": "bulk match failed"}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/email/stream", dependencies=[Depends(require_ready("llm"))])
+async def stream_email_draft(payload: EmailDraftRequest, request: Request):
+    """Stream an outreach email draft as Server-Sent Events while the LLM generates it"""
+    ml_service = request.app.state.ml_service
+
+    async def stream():
+        try:
+            async for item in ml_service.stream_email_draft(
+                payload.job_description, payload.resume_content, payload.personal_story
+            ):
+                event = item.pop("event")
+                yield _sse(event, item)
+        except Exception as e:
+            logger.error(f"Email draft stream failed: {str(e)}")
+            yield _sse("error", {"error": "email draft failed"})
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream, which would defeat the early first byte
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
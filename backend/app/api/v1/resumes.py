@@ -1,53 +1,185 @@
 # backend/app/api/v1/resumes.py
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, UploadFile, File, HTTPException, Query, Request
 from fastapi.responses import FileResponse
 from datetime import datetime
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
 import os
-import shutil
+import uuid
 
+from app.services.resume_store import ResumeStore
+from app.services.single_flight import SingleFlight
+from app.services.skill_extractor import skill_extractor
+from app.services.text_extraction import ExtractionError
+from app.services.uploads import DEFAULT_MAX_BYTES, UnsupportedUpload, UploadTooLarge, save_upload
+
+logger = logging.getLogger(__name__)
 router = APIRouter()
+
+# Import settings with fallback; every setting below has a getattr default
+try:
+    from app.core.config import settings
+except ImportError:
+    class DefaultSettings:
+        pass
+    settings = DefaultSettings()
 UPLOAD_DIR = os.path.join(os.getcwd(), "uploads", "resumes")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+MAX_UPLOAD_BYTES = getattr(settings, 'MAX_UPLOAD_BYTES', DEFAULT_MAX_BYTES)
+# Unreferenced files are kept this long, so a quick re-upload still finds them
+GC_GRACE_SECONDS = getattr(settings, 'RESUME_GC_GRACE_SECONDS', 3600)
+
+# Content-addressed files plus per-user references, shared by every request
+resume_store = ResumeStore(UPLOAD_DIR)
+_processing = SingleFlight()
 
 @router.post("/upload")
-async def upload_resume(resume: UploadFile = File(...), clerk_user_id: str = Query(...)):
+async def upload_resume(request: Request, resume: UploadFile = File(...), clerk_user_id: str = Query(...),
+                        user_id: Optional[int] = Query(None)):
+    """Store a resume once per distinct content and give the user a reference to it
+
+    Text extraction, keywords and section embeddings are memoized by content
+    hash, so a file anyone uploaded before returns without reprocessing. With
+    ``user_id`` (the numeric ID the match API searches) the resume is also
+    indexed for matching.
+    """
     try:
-        filename = f"{clerk_user_id}_{datetime.utcnow().timestamp()}_{resume.filename}"
-        file_path = os.path.join(UPLOAD_DIR, filename)
+        original_name = os.path.basename(resume.filename or "resume")
+        temp_path = resume_store.temp_path(f"{uuid.uuid4().hex}.upload")
+
+        stored = await save_upload(resume, temp_path, max_bytes=MAX_UPLOAD_BYTES)
+        ref, duplicate = await resume_store.ingest(
+            temp_path, stored.sha256, stored.size, stored.file_format, clerk_user_id, original_name
+        )
 
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(resume.file, buffer)
+        # Concurrent uploads of the same new file share one processing run
+        artifacts = await _processing.run(stored.sha256, lambda: _process(request, ref))
+        if user_id is not None:
+            ref["index_id"] = await _index(request, ref, artifacts, user_id)
 
         return {
-            "id": 1,  # Replace with real DB ID if needed
-            "fileName": resume.filename,
-            "filePath": file_path,
-            "fileSize": os.path.getsize(file_path),
-            "createdAt": datetime.utcnow().isoformat()
+            **_describe(ref),
+            "sha256": stored.sha256,
+            "duplicate": duplicate,
+            "contentText": artifacts.get("content_text"),
+            "keywords": artifacts.get("keywords"),
+            "extraction": artifacts.get("extraction"),
+            "indexId": ref.get("index_id")
         }
 
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedUpload as e:
+        raise HTTPException(status_code=415, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
+def _describe(ref: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": ref["id"],
+        "fileName": ref["file_name"],
+        "filePath": ref["path"],
+        "fileSize": ref["size"],
+        "fileType": ref["file_format"],
+        "createdAt": datetime.utcfromtimestamp(ref["created_at"]).isoformat()
+    }
+
+async def _process(request: Request, ref: Dict[str, Any]) -> Dict[str, Any]:
+    """Memoized text, keywords and section vectors for a blob, computing whatever is missing"""
+    artifacts = await resume_store.artifacts(ref["sha256"])
+    if artifacts.get("extraction") is None:
+        content_text, extraction = await _extract_text(request, ref["path"], ref["file_name"])
+        keywords = skill_extractor.extract(content_text) if content_text else None
+        artifacts.update(content_text=content_text, extraction=extraction, keywords=keywords)
+        # Only successes are memoized; a timeout or a missing extractor may not happen next time
+        if extraction["status"] == "ok":
+            await resume_store.save_extraction(ref["sha256"], content_text, extraction, keywords)
+        artifacts["extraction"] = {**extraction, "cached": False}
+    else:
+        artifacts["extraction"] = {**artifacts["extraction"], "cached": True}
+
+    vector_service = getattr(request.app.state, "vector_service", None)
+    ready = vector_service is not None and vector_service.embedder is not None
+    if ready and artifacts.get("content_text"):
+        model = vector_service.embedding_cache.model_name
+        if artifacts.get("section_vectors") is None or artifacts.get("embedding_model") != model:
+            vectors = await vector_service.embed_resume_sections(artifacts["content_text"])
+            await resume_store.save_section_vectors(ref["sha256"], model, vectors)
+            artifacts.update(section_vectors=vectors, embedding_model=model)
+    return artifacts
+
+async def _index(request: Request, ref: Dict[str, Any], artifacts: Dict[str, Any], user_id: int) -> Optional[str]:
+    """Add the user's reference to the vector index once, reusing memoized section vectors"""
+    if ref.get("index_id"):
+        return ref["index_id"]
+    vector_service = getattr(request.app.state, "vector_service", None)
+    if vector_service is None or not vector_service.initialized or not artifacts.get("content_text"):
+        return None
+    index_id = await vector_service.store_resume(
+        artifacts["content_text"],
+        {"user_id": user_id, "file_name": ref["file_name"], "file_path": ref["path"]},
+        section_vectors=artifacts.get("section_vectors")
+    )
+    await resume_store.set_index_id(ref["id"], index_id)
+    return index_id
+
+async def _extract_text(request: Request, file_path: str, file_name: str):
+    """Resume text for ``content_text`` plus extraction details; a failure keeps the upload"""
+    extractor = getattr(request.app.state, "text_extractor", None)
+    if extractor is None:
+        return None, {"status": "unavailable"}
+    try:
+        result = await extractor.extract(file_path, file_name)
+    except ExtractionError as e:
+        logger.warning(f"Text extraction failed for {file_name}: {str(e)}")
+        return None, {"status": "failed", "error": str(e)}
+    return result["text"], {
+        "status": "ok",
+        "format": result["format"],
+        "pages": result["pages"],
+        "ocrPages": result["ocr_pages"],
+        "elapsedMs": result["elapsed_ms"]
+    }
+
 @router.get("/")
 async def list_resumes(clerk_user_id: str = Query(...)):
-    try:
-        files = os.listdir(UPLOAD_DIR)
-        user_files = [f for f in files if f.startswith(clerk_user_id)]
-        return {
-            "resumes": [
-                {
-                    "id": idx + 1,
-                    "fileName": f.split("_", 2)[-1],
-                    "filePath": os.path.join(UPLOAD_DIR, f),
-                    "fileSize": os.path.getsize(os.path.join(UPLOAD_DIR, f)),
-                    "createdAt": datetime.utcfromtimestamp(
-                        float(f.split("_")[1])
-                    ).isoformat()
-                }
-                for idx, f in enumerate(user_files)
-            ]
-        }
-    except FileNotFoundError:
-        return {"resumes": []}
+    refs = await resume_store.list_refs(clerk_user_id)
+    return {"resumes": [_describe(ref) for ref in refs] + await asyncio.to_thread(_legacy_files, clerk_user_id)}
+
+def _legacy_files(clerk_user_id: str) -> List[Dict[str, Any]]:
+    """Uploads saved as ``{clerk_user_id}_{timestamp}_{filename}`` before the content-addressed store"""
+    legacy = []
+    for f in os.listdir(UPLOAD_DIR):
+        path = os.path.join(UPLOAD_DIR, f)
+        if not f.startswith(f"{clerk_user_id}_") or not os.path.isfile(path):
+            continue
+        try:
+            created_at = datetime.utcfromtimestamp(float(f.split("_")[1])).isoformat()
+        except (IndexError, ValueError):
+            continue
+        legacy.append({
+            "id": None,
+            "fileName": f.split("_", 2)[-1],
+            "filePath": path,
+            "fileSize": os.path.getsize(path),
+            "createdAt": created_at,
+            "legacy": True
+        })
+    return legacy
+
+@router.delete("/{resume_id}")
+async def delete_resume(resume_id: int, request: Request, background_tasks: BackgroundTasks,
+                        clerk_user_id: str = Query(...), user_id: Optional[int] = Query(None)):
+    """Drop the user's reference; the file goes once no user references it and the GC grace period passes"""
+    ref = await resume_store.remove_ref(clerk_user_id, resume_id)
+    if ref is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+    vector_service = getattr(request.app.state, "vector_service", None)
+    if ref["index_id"] and vector_service is not None:
+        await vector_service.delete_resume(ref["index_id"], user_id)
+
+    background_tasks.add_task(resume_store.collect_garbage, GC_GRACE_SECONDS)
+    return {"deleted": resume_id}
@@ -1,7 +1,8 @@
 # backend/app/api/v1/router.py
 
 from fastapi import APIRouter
-from . import resumes
+from . import match, resumes
 
 api_router = APIRouter()
 api_router.include_router(resumes.router, prefix="/resumes", tags=["resumes"])
+api_router.include_router(match.router, prefix="/match", tags=["match"])
@@ -0,0 +1,105 @@
+"""Management commands
+
+Run from backend/: python -m app.cli <command> --help
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _read_jsonl(path: str, report_errors: list) -> Iterator[Dict[str, Any]]:
+    """Yield resumes from a JSONL file, recording unparsable lines instead of stopping"""
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                report_errors.append({"line": line_number, "error": f"invalid JSON: {str(e)}"})
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+async def _ingest(args) -> int:
+    from app.services.vector_service import VectorService
+
+    vector_service = VectorService()
+    await vector_service.initialize()
+    if not vector_service.initialized:
+        logger.error("Vector service could not be initialized, aborting import")
+        return 1
+
+    parse_errors: list = []
+    started = time.perf_counter()
+    try:
+        report = await vector_service.bulk_store_resumes(
+            _read_jsonl(args.path, parse_errors),
+            encode_batch_size=args.encode_batch_size,
+            import_batch_size=args.batch_size,
+            num_workers=args.workers
+        )
+    finally:
+        await vector_service.close()
+    elapsed = time.perf_counter() - started
+
+    failures = parse_errors + report["failed"]
+    if args.failures:
+        with open(args.failures, "w", encoding="utf-8") as f:
+            for failure in failures:
+                f.write(json.dumps(failure) + "\n")
+
+    stored = len(report["stored"])
+    logger.info(
+        f"Imported {stored} resumes in {elapsed:.1f}s "
+        f"({stored / elapsed if elapsed else 0:.1f}/s), {len(failures)} failed"
+    )
+    return 0 if not failures else 2
+
+async def _gc_resumes(args) -> int:
+    from app.services.resume_store import ResumeStore
+
+    store = ResumeStore(args.root)
+    try:
+        result = await store.collect_garbage(args.grace_seconds)
+    finally:
+        store.close()
+    logger.info(f"Removed {result['blobs']} unreferenced resumes ({result['bytes']} bytes) "
+                f"and {result['temp_files']} abandoned uploads")
+    return 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="JobAssist AI management commands")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = subcommands.add_parser(
+        "ingest",
+        help="Bulk-import resumes from JSONL (content, user_id, file_name, file_path[, id])"
+    )
+    ingest.add_argument("path", help="JSONL file, or - for stdin")
+    ingest.add_argument("--batch-size", type=int, default=100, help="objects per vector index import batch")
+    ingest.add_argument("--workers", type=int, default=2, help="parallel import workers")
+    ingest.add_argument("--encode-batch-size", type=int, default=256, help="resumes encoded per forward batch")
+    ingest.add_argument("--failures", help="write per-item failures to this JSONL file")
+    ingest.set_defaults(handler=_ingest)
+
+    gc = subcommands.add_parser("gc-resumes", help="Delete stored resume files no user references any more")
+    gc.add_argument("--root", default=os.path.join(os.getcwd(), "uploads", "resumes"), help="resume store directory")
+    gc.add_argument("--grace-seconds", type=float, default=3600.0,
+                    help="keep files released more recently than this")
+    gc.set_defaults(handler=_gc_resumes)
+
+    args = parser.parse_args(argv)
+    return asyncio.run(args.handler(args))
+
+if __name__ == "__main__":
+    sys.exit(main())
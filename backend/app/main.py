@@ -1,9 +1,12 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 import os
 from typing import Dict, Any
+from app.services.readiness import readiness, STARTING, READY, DEGRADED, FAILED
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -39,45 +42,93 @@ except ImportError:
 try:
     from app.services.vector_service import VectorService
     from app.services.ml_service import MLService
+    from app.services.text_extraction import TextExtractor
+    from app.services.match_pipeline import MatchPipeline
     SERVICES_AVAILABLE = True
 except ImportError:
     logger.warning("Services not available")
     SERVICES_AVAILABLE = False
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Application lifespan events"""
-    logger.info("Starting JobAssist AI...")
-    
+async def warm_up(app: FastAPI):
+    """Bring up database, encoder, vector index and LLM clients in the background"""
     if DATABASE_AVAILABLE:
+        readiness.mark("db", STARTING)
         try:
             from app.models.user import User
             from app.models.resume import Resume, JobMatch
-            Base.metadata.create_all(bind=engine)
+            await asyncio.to_thread(Base.metadata.create_all, bind=engine)
+            readiness.mark("db", READY)
             logger.info("Database tables created/verified")
         except Exception as e:
+            readiness.mark("db", FAILED, str(e))
             logger.error(f"Database setup failed: {e}")
     
     if SERVICES_AVAILABLE:
-        try:
-            vector_service = VectorService()
-            ml_service = MLService()
-            await vector_service.initialize()
-            await ml_service.initialize()
-            app.state.vector_service = vector_service
-            app.state.ml_service = ml_service
-            logger.info("Services initialized")
-        except Exception as e:
-            logger.error(f"Service initialization failed: {e}")
+        # Vector and LLM warm-up are independent of each other
+        results = await asyncio.gather(
+            app.state.vector_service.initialize(),
+            app.state.ml_service.initialize(),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Service initialization failed: {result}")
+        logger.info("Services initialized")
+    
+    logger.info(f"Warm-up finished (ready={readiness.ready})")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan events"""
+    logger.info("Starting JobAssist AI...")
+    
+    if DATABASE_AVAILABLE:
+        readiness.register("db")
+    else:
+        readiness.mark("db", DEGRADED, "database module not available")
+    
+    if SERVICES_AVAILABLE:
+        # A misconfigured deadline budget would fail every /match request, so refuse to start
+        worst = MatchPipeline.check_deadlines()
+        logger.info(f"Match pipeline worst-case latency: {worst:.2f}s")
+        readiness.register("encoder", "weaviate", "llm")
+        app.state.vector_service = VectorService()
+        app.state.ml_service = MLService(embed_many=app.state.vector_service.embed_texts)
+        app.state.text_extractor = TextExtractor(
+            max_workers=getattr(settings, 'EXTRACTION_WORKERS', None),
+            timeout=getattr(settings, 'EXTRACTION_TIMEOUT', 30.0),
+            max_memory_mb=getattr(settings, 'EXTRACTION_MAX_MEMORY_MB', 512),
+            ocr=getattr(settings, 'EXTRACTION_OCR', True),
+            ocr_languages=getattr(settings, 'OCR_LANGUAGES', 'eng')
+        )
+    else:
+        for component in ("encoder", "weaviate", "llm"):
+            readiness.mark(component, FAILED, "services not available")
+    
+    # Serve /health right away; /ready reports progress while this runs
+    app.state.warmup_task = asyncio.create_task(warm_up(app))
     
     yield
 
     logger.info("Shutting down JobAssist AI...")
+    if not app.state.warmup_task.done():
+        app.state.warmup_task.cancel()
+        try:
+            await app.state.warmup_task
+        except asyncio.CancelledError:
+            pass
     if SERVICES_AVAILABLE and hasattr(app.state, 'vector_service'):
         try:
             await app.state.vector_service.close()
         except Exception as e:
             logger.error(f"Error closing vector service: {e}")
+    if SERVICES_AVAILABLE and hasattr(app.state, 'ml_service'):
+        try:
+            await app.state.ml_service.close()
+        except Exception as e:
+            logger.error(f"Error closing ML service: {e}")
+    if SERVICES_AVAILABLE and hasattr(app.state, 'text_extractor'):
+        app.state.text_extractor.shutdown()
 
 # ✅ Create FastAPI app
 app = FastAPI(
@@ -96,6 +147,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ✅ Reject oversized uploads before their bodies are spooled
+try:
+    from app.services.uploads import DEFAULT_MAX_BYTES, UploadSizeLimit
+    app.add_middleware(UploadSizeLimit, max_bytes=getattr(settings, 'MAX_UPLOAD_BYTES', DEFAULT_MAX_BYTES))
+except ImportError:
+    logger.warning("Upload size limit not available")
+
 # ✅ Setup monitoring if available
 try:
     from app.core.monitoring import setup_monitoring
@@ -130,6 +188,22 @@ async def health_check():
         "services": SERVICES_AVAILABLE
     }
 
+@app.get("/ready")
+async def readiness_check():
+    snapshot = readiness.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
+@app.get("/stats")
+async def service_stats():
+    stats: Dict[str, Any] = {}
+    if hasattr(app.state, 'vector_service'):
+        stats["vector_service"] = app.state.vector_service.get_stats()
+    if hasattr(app.state, 'ml_service'):
+        stats["ml_service"] = app.state.ml_service.get_stats()
+    if hasattr(app.state, 'text_extractor'):
+        stats["text_extraction"] = app.state.text_extractor.stats()
+    return stats
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
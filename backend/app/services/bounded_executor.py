@@ -0,0 +1,98 @@
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class ExecutorSaturated(Exception):
+    """Raised when the executor's wait queue is full"""
+
+class BoundedExecutor:
+    """Dedicated thread pool for blocking client calls, with a bounded queue and gauges
+
+    Blocking calls run on ``max_workers`` threads instead of the event loop or
+    the shared default executor. At most ``max_queue`` calls may wait for a
+    thread; beyond that callers fail fast with ``ExecutorSaturated``. Each call
+    can carry a timeout after which the awaiting caller gets ``TimeoutError``.
+    """
+
+    def __init__(self, name: str, max_workers: int = 8, max_queue: int = 64,
+                 default_timeout: Optional[float] = None):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.default_timeout = default_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    def _adjust(self, queued: int = 0, in_flight: int = 0):
+        with self._lock:
+            self.queued += queued
+            self.in_flight += in_flight
+
+    def _invoke(self, fn: Callable, *args, **kwargs):
+        self._adjust(queued=-1, in_flight=1)
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        else:
+            with self._lock:
+                self.completed += 1
+            return result
+        finally:
+            self._adjust(in_flight=-1)
+
+    def _on_done(self, future):
+        # A call cancelled before it started never ran _invoke, so release its queue slot here
+        if future.cancelled():
+            self._adjust(queued=-1)
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = ..., **kwargs) -> Any:
+        """Run ``fn(*args, **kwargs)`` on the pool and await its result"""
+        if timeout is ...:
+            timeout = self.default_timeout
+
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturated(f"{self.name} executor queue is full ({self.max_queue} waiting)")
+            self.queued += 1
+
+        future = self._pool.submit(functools.partial(self._invoke, fn, *args, **kwargs))
+        future.add_done_callback(self._on_done)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            # Drops the call if it is still queued; a running call finishes in the background
+            future.cancel()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+                "rejected": self.rejected
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,135 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different copies share a cache key"""
+    text = unicodedata.normalize("NFC", text or "")
+    return _WHITESPACE.sub(" ", text).strip()
+
+class EmbeddingCache:
+    """Two-tier embedding cache keyed by model name and normalized-text hash
+
+    The memory tier is a bounded LRU. The optional disk tier stores each
+    vector as a float32 ``.npy`` file under ``disk_dir`` so repeat texts
+    survive restarts. Cached vectors are shared between callers, so they are
+    kept read-only: an in-place edit raises instead of corrupting later hits.
+    """
+
+    def __init__(self, model_name: str, max_entries: int = 10000, disk_dir: Optional[str] = None):
+        self.model_name = model_name
+        self.max_entries = max(1, max_entries)
+        self.disk_dir = disk_dir
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def key(self, text: str) -> str:
+        """Cache key for a text under this cache's model"""
+        payload = f"{self.model_name}\0{normalize_text(text)}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.npy")
+
+    def _remember(self, key: str, vector: np.ndarray):
+        vector.flags.writeable = False
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get_memory(self, key: str) -> Optional[np.ndarray]:
+        """Look up the memory tier only"""
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+        return vector
+
+    def get_disk(self, key: str) -> Optional[np.ndarray]:
+        """Look up the disk tier and promote hits into memory (blocking)"""
+        if not self.disk_dir:
+            return None
+        try:
+            vector = np.load(self._disk_path(key), allow_pickle=False)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cached embedding {key}: {str(e)}")
+            return None
+
+        self.disk_hits += 1
+        self._remember(key, vector)
+        return vector
+
+    def put_disk(self, key: str, vector: np.ndarray):
+        """Persist a vector to the disk tier (blocking)"""
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial vector
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, vector, allow_pickle=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to persist cached embedding {key}: {str(e)}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    async def lookup(self, key: str) -> Optional[np.ndarray]:
+        """Return a cached vector from either tier, or None on a miss"""
+        vector = self.get_memory(key)
+        if vector is None and self.disk_dir:
+            vector = await asyncio.to_thread(self.get_disk, key)
+        if vector is None:
+            self.misses += 1
+        return vector
+
+    async def store(self, key: str, vector: np.ndarray):
+        """Add a freshly computed vector to both tiers"""
+        # Own copy, so the caller's array stays writable and can't change the cached one
+        vector = np.array(vector, dtype=np.float32)
+        self._remember(key, vector)
+        if self.disk_dir:
+            await asyncio.to_thread(self.put_disk, key, vector)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for sizing the cache"""
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "model": self.model_name,
+            "entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "disk_enabled": bool(self.disk_dir)
+        }
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingEngine:
+    """Micro-batching front end for a sentence encoder
+
+    Concurrent ``encode`` calls are queued and flushed to the encoder as one
+    batch once ``max_batch_size`` texts are waiting or ``max_wait_ms`` has
+    elapsed since the first one arrived. The forward pass runs in a dedicated
+    executor so the event loop keeps serving other requests.
+    """
+
+    def __init__(self, encoder, max_batch_size: int = 32, max_wait_ms: float = 5.0,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.encoder = encoder
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        # A single worker keeps torch from oversubscribing cores; batches queue up behind it
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+        self._owns_executor = executor is None
+        self._queue: Optional[asyncio.Queue] = None
+        self._queue_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.batches_run = 0
+        self.texts_encoded = 0
+
+    def _ensure_worker(self):
+        """Start (or restart) the batching loop on the running event loop
+
+        A replacement worker keeps the existing queue, so requests queued while
+        the previous one died are still served. Only a queue left on another
+        event loop is discarded, and its waiting callers are cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        # A worker left on another (possibly dead) loop never reports done(), so check the loop first
+        if self._queue_loop is loop and self._worker is not None and not self._worker.done():
+            return
+        if (self._queue_loop is loop and self._worker is not None and not self._worker.cancelled()
+                and self._worker.exception() is not None):
+            logger.error(f"Embedding batch worker died, restarting: {str(self._worker.exception())}")
+
+        if self._queue is None or self._queue_loop is not loop:
+            if self._queue is not None:
+                self._cancel_queued()
+            self._queue = asyncio.Queue()
+            self._queue_loop = loop
+        self._worker = loop.create_task(self._run())
+
+    def _cancel_queued(self):
+        """Cancel every caller still waiting in the queue"""
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                try:
+                    future.get_loop().call_soon_threadsafe(future.cancel)
+                except RuntimeError:  # its loop is closed; nobody is waiting any more
+                    pass
+
+    async def encode(self, text: str) -> np.ndarray:
+        """Encode a single text, sharing a forward pass with concurrent callers"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def encode_many(self, texts: List[str]) -> np.ndarray:
+        """Encode a list of texts directly as one batch"""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        loop = asyncio.get_running_loop()
+        embeddings = await loop.run_in_executor(self._executor, self._encode_batch, list(texts))
+        return embeddings
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Run the encoder on a batch (executor thread)"""
+        embeddings = self.encoder.encode(
+            texts,
+            batch_size=len(texts),
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        self.batches_run += 1
+        self.texts_encoded += len(texts)
+        return np.asarray(embeddings, dtype=np.float32)
+
+    async def _collect_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Wait for the first request, then gather more into ``batch`` until full or the deadline passes
+
+        Items go into the caller's list as soon as they leave the queue, so a
+        cancelled worker still knows which callers it has to settle.
+        """
+        batch.append(await self._queue.get())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run(self):
+        """Batching loop: collect, encode off-loop, resolve futures"""
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[str, asyncio.Future]] = []
+        try:
+            while True:
+                batch = []
+                await self._collect_batch(batch)
+                # Callers that already gave up don't need a forward pass
+                batch[:] = [(text, future) for text, future in batch if not future.done()]
+                if not batch:
+                    continue
+
+                texts = [text for text, _ in batch]
+                try:
+                    embeddings = await loop.run_in_executor(self._executor, self._encode_batch, texts)
+                except Exception as e:
+                    logger.error(f"Embedding batch of {len(texts)} failed: {str(e)}")
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                for (_, future), embedding in zip(batch, embeddings):
+                    if not future.done():
+                        future.set_result(embedding)
+        except BaseException as e:
+            # Whatever stops the worker, the batch it holds must not leave callers waiting
+            for _, future in batch:
+                if not future.done():
+                    if isinstance(e, asyncio.CancelledError):
+                        future.cancel()
+                    else:
+                        future.set_exception(e)
+            raise
+
+    async def close(self):
+        """Stop the batching loop and release the executor"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        if self._queue is not None:
+            self._cancel_queued()
+
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
@@ -0,0 +1,88 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Type, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Minimum cosine similarity between a backend's vectors and the full-precision
+# torch backend for the same text. Vectors above it can share an index with
+# vectors produced by the reference backend. Checked by benchmarks/bench_encoders.py
+COMPATIBILITY_TOLERANCE = 0.99
+
+class EncoderBackend(ABC):
+    """Interface the embedding engine and vector service rely on"""
+
+    name = "base"
+
+    @abstractmethod
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32,
+               convert_to_numpy: bool = True, show_progress_bar: bool = False) -> np.ndarray:
+        """Embeddings for ``texts``, one row per text"""
+
+    @abstractmethod
+    def get_sentence_embedding_dimension(self) -> int:
+        """Width of the vectors ``encode`` returns"""
+
+class SentenceTransformerEncoder(EncoderBackend):
+    """Full-precision sentence-transformers model (the reference backend)"""
+
+    name = "torch"
+
+    def __init__(self, model_name: str, num_threads: Optional[int] = None, device: str = "cpu"):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if num_threads:
+            # Per-process setting: size it to cores / uvicorn workers to avoid oversubscription
+            torch.set_num_threads(num_threads)
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name, device=device)
+        self.model.eval()
+
+    def encode(self, texts, batch_size: int = 32, convert_to_numpy: bool = True,
+               show_progress_bar: bool = False) -> np.ndarray:
+        import torch
+
+        with torch.inference_mode():
+            return self.model.encode(
+                texts,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=show_progress_bar
+            )
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+class QuantizedCPUEncoder(SentenceTransformerEncoder):
+    """Same model with its linear layers dynamically quantized to int8 for CPU inference
+
+    Weights are stored as int8 and activations are quantized on the fly, which
+    usually cuts transformer latency noticeably on AVX2/AVX-512 CPUs without any
+    calibration data.
+    """
+
+    name = "torch-int8"
+
+    def __init__(self, model_name: str, num_threads: Optional[int] = None, device: str = "cpu"):
+        import torch
+
+        super().__init__(model_name, num_threads=num_threads, device="cpu")
+        self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model.eval()
+
+ENCODER_BACKENDS: Dict[str, Type[EncoderBackend]] = {
+    SentenceTransformerEncoder.name: SentenceTransformerEncoder,
+    QuantizedCPUEncoder.name: QuantizedCPUEncoder,
+}
+
+def create_encoder(backend: str, model_name: str, num_threads: Optional[int] = None) -> EncoderBackend:
+    """Instantiate an encoder backend by name (blocking; loads model weights)"""
+    try:
+        encoder_class = ENCODER_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown encoder backend '{backend}', expected one of {sorted(ENCODER_BACKENDS)}")
+    logger.info(f"Loading {model_name} with {backend} encoder backend (threads={num_threads or 'default'})")
+    return encoder_class(model_name, num_threads=num_threads)
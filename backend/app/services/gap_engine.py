@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from app.services.prompt_budget import split_units
+from app.services.resume_sections import ResumeSection, split_sections
+from app.services.skill_extractor import display_name, skill_extractor
+
+logger = logging.getLogger(__name__)
+
+# Words that mark a job description sentence as a requirement rather than company blurb
+_REQUIREMENT_CUES = re.compile(
+    r'\b(experience|years?|proficien\w*|familiar\w*|knowledge|expertise|understanding|ability|'
+    r'must|required?|requirements?|qualifications?|degree|certifi\w*|background|track record|'
+    r'hands-on|strong|you have|you will|responsib\w*|skills?)\b', re.I
+)
+_YEARS = re.compile(r'(\d+)\s*\+?\s*(?:years?|yrs)', re.I)
+# Numbers that read as results: percentages, money, multipliers, counts of two or more digits
+_METRIC = re.compile(r'\d\s*%|\$\s*\d|\b\d+(?:\.\d+)?\s*[kmbx]\b|\b\d{2,}\b', re.I)
+_WORD = re.compile(r'[a-z][a-z+#.]{2,}')
+_STOPWORDS = frozenset("""
+    the and for with you your our are will that this from have has able who into their they them
+    work working team teams role using use new more years year experience strong ability across
+    within about such other including etc plus must required preferred nice knowledge skills
+""".split())
+
+# A requirement needs this many words to be worth a suggestion
+MIN_REQUIREMENT_WORDS = 4
+MAX_REQUIREMENTS = 40
+
+# Cosine similarity to the nearest resume section (all-MiniLM-L6-v2): at or above
+# COVERED the requirement is addressed, below WEAK nothing in the resume speaks to it
+COVERED_SIMILARITY = 0.55
+WEAK_SIMILARITY = 0.35
+
+# Same thresholds for share of a requirement's content words found in a section,
+# used when embeddings are unavailable or too slow
+COVERED_OVERLAP = 0.5
+WEAK_OVERLAP = 0.2
+
+# Only used to pad very short reports, e.g. when the posting has no recognisable requirements
+GENERIC_SUGGESTIONS = (
+    "Add specific metrics and quantifiable achievements to demonstrate impact",
+    "Include more industry-specific keywords from the job description",
+    "Highlight relevant technical skills and technologies",
+    "Emphasize leadership and collaboration experiences",
+    "Add relevant certifications or professional development",
+    "Include specific project examples that match the role requirements",
+)
+MIN_SUGGESTIONS = 3
+
+class Requirement(NamedTuple):
+    position: int
+    text: str
+    skills: frozenset
+
+def extract_requirements(job_description: str) -> List[Requirement]:
+    """Sentences and bullets of a job description that state a requirement"""
+    requirements = []
+    for unit in split_units(job_description):
+        if len(unit.text.split()) < MIN_REQUIREMENT_WORDS:
+            continue
+        if unit.skills or _REQUIREMENT_CUES.search(unit.text):
+            requirements.append(Requirement(len(requirements), unit.text, unit.skills))
+            if len(requirements) >= MAX_REQUIREMENTS:
+                break
+    return requirements
+
+def excerpt(text: str, limit: int = 90) -> str:
+    """Shorten text to ``limit`` characters at a word boundary"""
+    text = " ".join(text.split()).rstrip(".;:")
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0].rstrip(",;:") + "…"
+
+def _content_words(text: str) -> frozenset:
+    return frozenset(word.rstrip('.') for word in _WORD.findall(text.lower())) - _STOPWORDS
+
+def _overlap_matrix(requirements: Sequence[Requirement], sections: Sequence[ResumeSection]) -> np.ndarray:
+    """Share of each requirement's content words present in each section"""
+    section_words = [_content_words(section.text) for section in sections]
+    matrix = np.zeros((len(requirements), len(sections)), dtype=np.float32)
+    for i, requirement in enumerate(requirements):
+        words = _content_words(requirement.text)
+        if words:
+            for j, other in enumerate(section_words):
+                matrix[i, j] = len(words & other) / len(words)
+    return matrix
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+def _section_label(section: ResumeSection) -> str:
+    first_line = next((line.strip() for line in section.text.splitlines() if line.strip()), "")
+    if section.kind in ("experience", "projects") and first_line:
+        return f'{section.kind} entry "{excerpt(first_line, 50)}"'
+    return f"{section.kind} section"
+
+class GapEngine:
+    """Local gap analysis: requirement sentences matched against resume sections
+
+    The job description is cut into requirement sentences and the resume into
+    sections; both are embedded in one batch (resume sections usually come
+    straight from the embedding cache) and each requirement is paired with its
+    nearest section. Skills a requirement names that the resume lacks, and
+    requirements no section covers well, become specific suggestions quoting
+    the posting. Without an embedder, or if it misses ``embed_timeout``, word
+    overlap stands in for similarity. A late embedding batch is left to finish
+    so its vectors still reach the embedding cache, and no new batch is started
+    while one is outstanding, so abandoned work never queues up in front of
+    the search embeddings.
+    """
+
+    def __init__(self, embed_many: Optional[Callable[[List[str]], Awaitable[Optional[np.ndarray]]]] = None,
+                 embed_timeout: float = 0.05, limit: int = 8):
+        self.embed_many = embed_many
+        self.embed_timeout = embed_timeout
+        self.limit = limit
+        self.analyses = 0
+        self.embedded = 0
+        self.total_ms = 0.0
+        self._abandoned: set = set()
+
+    async def analyze(self, resume_content: str, job_description: str) -> Dict[str, Any]:
+        """Gap report with embedding similarity when available"""
+        started = time.perf_counter()
+        requirements = extract_requirements(job_description)
+        sections = split_sections(resume_content)
+        similarity = await self._similarity(requirements, sections)
+        return self._report(requirements, sections, resume_content, similarity, started)
+
+    def analyze_lexical(self, resume_content: str, job_description: str) -> Dict[str, Any]:
+        """Gap report from word overlap only; synchronous, for fallbacks"""
+        started = time.perf_counter()
+        return self._report(extract_requirements(job_description), split_sections(resume_content),
+                            resume_content, None, started)
+
+    async def _similarity(self, requirements: List[Requirement],
+                          sections: List[ResumeSection]) -> Optional[np.ndarray]:
+        if not self.embed_many or not requirements or not sections:
+            return None
+        if self._abandoned:
+            # The embedder is still busy with a batch an earlier analysis gave up on
+            return None
+        texts = [requirement.text for requirement in requirements] + [section.text for section in sections]
+        task = asyncio.ensure_future(self.embed_many(texts))
+        try:
+            # Shielded: timing out abandons the wait, not the encode, which still fills the cache
+            vectors = await asyncio.wait_for(asyncio.shield(task), self.embed_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(task)
+            logger.warning(f"Gap analysis embeddings missed their {self.embed_timeout}s budget, using word overlap")
+            return None
+        except asyncio.CancelledError:
+            self._abandon(task)
+            raise
+        except Exception as e:
+            logger.warning(f"Gap analysis without embeddings: {str(e)}")
+            return None
+        if vectors is None:
+            return None
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        return vectors[:len(requirements)] @ vectors[len(requirements):].T
+
+    def _abandon(self, task: asyncio.Future):
+        self._abandoned.add(task)
+        task.add_done_callback(self._finished_late)
+
+    def _finished_late(self, task: asyncio.Future):
+        self._abandoned.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Abandoned gap analysis embedding failed: {str(task.exception())}")
+
+    def _report(self, requirements: List[Requirement], sections: List[ResumeSection], resume_content: str,
+                similarity: Optional[np.ndarray], started: float) -> Dict[str, Any]:
+        embedded = similarity is not None
+        if embedded:
+            covered, weak = COVERED_SIMILARITY, WEAK_SIMILARITY
+        else:
+            similarity = _overlap_matrix(requirements, sections)
+            covered, weak = COVERED_OVERLAP, WEAK_OVERLAP
+
+        resume_skills = set(skill_extractor.extract(resume_content))
+        # Skills that appear in the resume, but only in a skills list
+        evidenced = set()
+        for section in sections:
+            if section.kind != "skills":
+                evidenced.update(skill_extractor.extract(section.text))
+
+        missing_lines, loose_lines, uncovered_lines = [], [], []
+        missing_skills: List[str] = []
+        details = []
+        for requirement in requirements:
+            best = int(np.argmax(similarity[requirement.position])) if sections else -1
+            score = float(similarity[requirement.position, best]) if sections else 0.0
+            # Skills in the order the posting names them
+            missing = [skill for skill in skill_extractor.extract(requirement.text)
+                       if skill not in resume_skills and skill not in missing_skills]
+            missing_skills.extend(missing)
+            details.append({
+                "requirement": requirement.text,
+                "coverage": round(score, 3),
+                "section": sections[best].kind if sections else None,
+                "missing_skills": missing
+            })
+
+            quote = excerpt(requirement.text)
+            years = _YEARS.search(requirement.text)
+            if missing:
+                line = f'Add {", ".join(map(display_name, missing))} to your resume: the posting asks for "{quote}"'
+                if years:
+                    line += f" (state your years of hands-on use; it asks for {years.group(1)}+)"
+                missing_lines.append(line)
+            elif score < weak:
+                uncovered_lines.append(f'Address "{quote}": nothing in your resume speaks to it yet')
+            elif score < covered:
+                loose_lines.append(f'Expand your {_section_label(sections[best])} to show "{quote}"')
+
+        job_skills = {skill for requirement in requirements for skill in requirement.skills}
+        listed_only = [skill for skill in skill_extractor.extract(" ".join(r.text for r in requirements))
+                       if skill in resume_skills and skill not in evidenced and skill in job_skills]
+        evidence_lines = []
+        if listed_only and any(section.kind != "skills" for section in sections):
+            evidence_lines.append(f"Back up {', '.join(map(display_name, listed_only[:3]))} with an experience or project bullet; "
+                                  f"right now {'it appears' if len(listed_only) == 1 else 'they appear'} "
+                                  f"only in your skills list")
+
+        experience = [section for section in sections if section.kind == "experience"]
+        if experience and not any(_METRIC.search(section.text) for section in experience):
+            evidence_lines.append("Quantify your experience entries with numbers (%, $, users, latency, team size); "
+                                  "none of them includes a measurable result")
+
+        # Most specific first: missing skills, then uncovered, loosely covered, evidence
+        suggestions = (missing_lines[:4] + uncovered_lines[:2] + loose_lines[:2] + evidence_lines
+                       + missing_lines[4:] + uncovered_lines[2:] + loose_lines[2:])[:self.limit]
+        for generic in GENERIC_SUGGESTIONS:
+            if len(suggestions) >= MIN_SUGGESTIONS:
+                break
+            suggestions.append(generic)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.analyses += 1
+        self.embedded += embedded
+        self.total_ms += elapsed_ms
+        return {
+            "suggestions": suggestions,
+            "missing_skills": missing_skills,
+            "requirements": details,
+            "method": "embedding" if embedded else "lexical",
+            "elapsed_ms": round(elapsed_ms, 2)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "analyses": self.analyses,
+            "embedded": self.embedded,
+            "mean_ms": round(self.total_ms / self.analyses, 2) if self.analyses else 0.0
+        }
@@ -0,0 +1,184 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class LLMResponseCache:
+    """Two-tier cache of LLM completions keyed by everything that shapes the output
+
+    The memory tier is a bounded LRU. The optional SQLite tier at ``db_path``
+    survives restarts; entries older than ``ttl_seconds`` are ignored and
+    purged, and the least recently used rows are evicted past ``max_disk_entries``.
+    Each entry remembers how long the original call took, so hits can report
+    the latency they saved.
+    """
+
+    # Run TTL/size eviction on the SQLite tier every this many writes
+    _EVICT_EVERY = 64
+
+    def __init__(self, max_entries: int = 512, db_path: Optional[str] = None,
+                 ttl_seconds: float = 7 * 24 * 3600, max_disk_entries: int = 50000):
+        self.max_entries = max(1, max_entries)
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max(1, max_disk_entries)
+        self._memory: "OrderedDict[str, Tuple[float, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.latency_saved = 0.0
+
+        if self.db_path:
+            try:
+                self._open()
+            except Exception as e:
+                logger.warning(f"LLM cache database unavailable, using memory only: {str(e)}")
+                self._db = None
+
+    def _open(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, latency REAL NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._db.commit()
+
+    @staticmethod
+    def key(model: str, system_prompt: str, prompt: str, params: Dict[str, Any]) -> str:
+        """Cache key for one completion request"""
+        payload = json.dumps(
+            {"model": model, "system": system_prompt, "prompt": prompt, "params": params},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at: float) -> bool:
+        return time.time() - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, created_at: float, response: str, latency: float):
+        with self._lock:
+            self._memory[key] = (created_at, response, latency)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get_memory(self, key: str) -> Optional[str]:
+        """Look up the memory tier only"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            created_at, response, latency = entry
+            if self._expired(created_at):
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            self.latency_saved += latency
+        return response
+
+    def get_disk(self, key: str) -> Optional[str]:
+        """Look up the SQLite tier and promote hits into memory (blocking)"""
+        if self._db is None:
+            return None
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT response, latency, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or self._expired(row[2]):
+                    return None
+                self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                self._db.commit()
+        except Exception as e:
+            logger.warning(f"LLM cache read failed for {key}: {str(e)}")
+            return None
+
+        response, latency, created_at = row
+        self._remember(key, created_at, response, latency)
+        with self._lock:
+            self.disk_hits += 1
+            self.latency_saved += latency
+        return response
+
+    def put_disk(self, key: str, response: str, latency: float, created_at: float):
+        """Persist a completion to the SQLite tier (blocking)"""
+        if self._db is None:
+            return
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, latency, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, response, latency, created_at, created_at)
+                )
+                self._writes += 1
+                if self._writes % self._EVICT_EVERY == 0:
+                    self._evict()
+                self._db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to persist LLM response {key}: {str(e)}")
+
+    def _evict(self):
+        """Drop expired rows, then the least recently used rows beyond the size limit"""
+        self._db.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        self._db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
+
+    async def lookup(self, key: str) -> Optional[str]:
+        """Return a cached completion from either tier, or None on a miss"""
+        response = self.get_memory(key)
+        if response is None and self._db is not None:
+            response = await asyncio.to_thread(self.get_disk, key)
+        if response is None:
+            with self._lock:
+                self.misses += 1
+        return response
+
+    async def store(self, key: str, response: str, latency: float):
+        """Add a fresh completion and the seconds it took to both tiers"""
+        created_at = time.time()
+        self._remember(key, created_at, response, latency)
+        if self._db is not None:
+            await asyncio.to_thread(self.put_disk, key, response, latency, created_at)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and the LLM time saved by hits"""
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "latency_saved_seconds": round(self.latency_saved, 3),
+            "disk_enabled": self._db is not None
+        }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,315 @@
+import asyncio
+import json
+import logging
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class ProvidersUnavailable(Exception):
+    """Raised when every provider failed or has its circuit open"""
+
+def parse_json_object(text: Optional[str]) -> Optional[Dict[str, Any]]:
+    """JSON object in a model response, tolerating code fences and stray prose; None if there is none"""
+    text = re.sub(r'^```(?:json)?\s*|\s*```$', '', (text or "").strip())
+    try:
+        data = json.loads(text)
+    except ValueError:
+        match = re.search(r'\{.*\}', text, re.DOTALL)
+        try:
+            data = json.loads(match.group(0)) if match else None
+        except ValueError:
+            data = None
+    return data if isinstance(data, dict) else None
+
+class CircuitBreaker:
+    """Rolling-window circuit breaker driven by error rate and slow calls
+
+    The last ``window`` outcomes are kept. Once ``min_calls`` are recorded and
+    the share of failures (errors plus calls slower than ``slow_call_seconds``)
+    reaches ``failure_threshold``, the circuit opens for ``open_seconds``.
+    After that one trial call is let through: success closes the circuit,
+    failure re-opens it.
+    """
+
+    def __init__(self, window: int = 20, min_calls: int = 5, failure_threshold: float = 0.5,
+                 slow_call_seconds: float = 10.0, open_seconds: float = 30.0):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._outcomes: deque = deque(maxlen=window)
+        self._latencies: deque = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trial_running = False
+        self.opened = 0
+
+    def allow(self) -> bool:
+        """Whether a call may be sent now (claims the trial slot when half-open)"""
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self.state = HALF_OPEN
+            self._trial_running = False
+        if self.state == HALF_OPEN:
+            if self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+        return self.state == CLOSED
+
+    def available(self) -> bool:
+        """Like ``allow`` but without claiming anything"""
+        if self.state == OPEN:
+            return time.monotonic() - self._opened_at >= self.open_seconds
+        return self.state == CLOSED or not self._trial_running
+
+    def record(self, ok: bool, latency: float):
+        failed = not ok or latency > self.slow_call_seconds
+        if ok:
+            self._latencies.append(latency)
+
+        if self.state == HALF_OPEN:
+            self._trial_running = False
+            if failed:
+                self._open()
+            else:
+                self.state = CLOSED
+                self._outcomes.clear()
+            return
+
+        self._outcomes.append(failed)
+        if len(self._outcomes) >= self.min_calls and self.error_rate() >= self.failure_threshold:
+            self._open()
+
+    def release(self):
+        """Give back a trial slot whose call was abandoned without an outcome"""
+        if self.state == HALF_OPEN:
+            self._trial_running = False
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self.opened += 1
+        self._outcomes.clear()
+
+    def error_rate(self) -> float:
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    def p90(self) -> Optional[float]:
+        """90th percentile latency of recent successful calls"""
+        if len(self._latencies) < self.min_calls:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))]
+
+    def stats(self) -> Dict[str, Any]:
+        p90 = self.p90()
+        return {
+            "state": self.state,
+            "error_rate": round(self.error_rate(), 3),
+            "p90_seconds": round(p90, 3) if p90 is not None else None,
+            "opened": self.opened
+        }
+
+class LLMProvider(ABC):
+    """A completion backend the router can call; ``complete`` returns the response text"""
+
+    name = "base"
+
+    @abstractmethod
+    async def complete(self, prompt: str, system_prompt: str, max_tokens: int,
+                       temperature: float, json_mode: bool = False) -> str:
+        """Response text for one prompt"""
+
+    async def close(self):
+        pass
+
+class CallableProvider(LLMProvider):
+    """Adapts an existing ``fn(prompt, max_tokens=..., json_mode=...)`` coroutine"""
+
+    def __init__(self, name: str, fn: Callable[..., Awaitable[str]]):
+        self.name = name
+        self.fn = fn
+
+    async def complete(self, prompt: str, system_prompt: str, max_tokens: int,
+                       temperature: float, json_mode: bool = False) -> str:
+        return await self.fn(prompt, max_tokens=max_tokens, json_mode=json_mode)
+
+class HuggingFaceProvider(LLMProvider):
+    """Text generation through the HuggingFace Inference API"""
+
+    name = "huggingface"
+
+    def __init__(self, client: httpx.AsyncClient, model: str,
+                 base_url: str = "https://api-inference.huggingface.co/models"):
+        self.client = client
+        self.url = f"{base_url.rstrip('/')}/{model}"
+
+    async def complete(self, prompt: str, system_prompt: str, max_tokens: int,
+                       temperature: float, json_mode: bool = False) -> str:
+        if json_mode:
+            prompt += "\nRespond with JSON only."
+        response = await self.client.post(self.url, json={
+            "inputs": f"{system_prompt}\n\n{prompt.strip()}\n",
+            "parameters": {
+                "max_new_tokens": max_tokens,
+                "temperature": max(temperature, 0.01),
+                "return_full_text": False
+            },
+            "options": {"wait_for_model": False}
+        })
+        response.raise_for_status()
+        data = response.json()
+        if isinstance(data, list) and data and isinstance(data[0], dict):
+            text = data[0].get("generated_text", "")
+        elif isinstance(data, dict):
+            text = data.get("generated_text", "")
+        else:
+            text = ""
+        if not text.strip():
+            raise ValueError("HuggingFace returned an empty completion")
+        return text.strip()
+
+    async def close(self):
+        await self.client.aclose()
+
+class ProviderRouter:
+    """Route completions across providers in priority order, with circuit breakers and hedging
+
+    The first provider whose circuit allows it gets the call. If it hasn't
+    answered by its own recent p90 latency (``hedge_after`` until enough calls
+    are seen), the next available provider is raced against it and the first
+    good answer wins; the loser is cancelled. A provider that errors hands
+    over to the next one immediately. In JSON mode an answer only counts as
+    good if it contains a JSON object, so a fast malformed reply can't beat a
+    slower valid one.
+    """
+
+    def __init__(self, providers: List[LLMProvider], breakers: Optional[Dict[str, CircuitBreaker]] = None,
+                 hedge: bool = True, hedge_after: float = 3.0, min_hedge_delay: float = 0.25):
+        self.providers = providers
+        self.breakers = breakers or {provider.name: CircuitBreaker() for provider in providers}
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.min_hedge_delay = min_hedge_delay
+        self.calls = 0
+        self.hedged = 0
+        self.wins: Dict[str, int] = {provider.name: 0 for provider in providers}
+        self.errors: Dict[str, int] = {provider.name: 0 for provider in providers}
+
+    def __bool__(self) -> bool:
+        return bool(self.providers)
+
+    def available(self, name: str) -> bool:
+        breaker = self.breakers.get(name)
+        return breaker is not None and breaker.available()
+
+    def _hedge_delay(self, provider: LLMProvider) -> float:
+        p90 = self.breakers[provider.name].p90()
+        return max(self.min_hedge_delay, p90 if p90 is not None else self.hedge_after)
+
+    async def _attempt(self, provider: LLMProvider, **request) -> str:
+        breaker = self.breakers[provider.name]
+        started = time.monotonic()
+        try:
+            text = await provider.complete(**request)
+            if request["json_mode"] and parse_json_object(text) is None:
+                raise ValueError("response is not a JSON object")
+        except asyncio.CancelledError:
+            # Lost a hedge race (or the caller left): no verdict on the provider
+            breaker.release()
+            raise
+        except Exception:
+            breaker.record(False, time.monotonic() - started)
+            self.errors[provider.name] += 1
+            raise
+        breaker.record(True, time.monotonic() - started)
+        return text
+
+    async def complete(self, prompt: str, system_prompt: str, max_tokens: int,
+                       temperature: float, json_mode: bool = False) -> str:
+        text, _ = await self.route(prompt, system_prompt, max_tokens, temperature, json_mode=json_mode)
+        return text
+
+    async def route(self, prompt: str, system_prompt: str, max_tokens: int,
+                    temperature: float, json_mode: bool = False) -> Tuple[str, str]:
+        """Like ``complete``, but returns ``(text, name of the provider that answered)``"""
+        request = dict(prompt=prompt, system_prompt=system_prompt, max_tokens=max_tokens,
+                       temperature=temperature, json_mode=json_mode)
+        self.calls += 1
+        queue = list(self.providers)
+        running: Dict[asyncio.Task, LLMProvider] = {}
+        last_error: Optional[Exception] = None
+
+        def launch_next() -> bool:
+            while queue:
+                provider = queue.pop(0)
+                if self.breakers[provider.name].allow():
+                    running[asyncio.ensure_future(self._attempt(provider, **request))] = provider
+                    return True
+            return False
+
+        try:
+            if not launch_next():
+                raise ProvidersUnavailable("All LLM providers have open circuits")
+
+            while running:
+                # Hedge only off the oldest call still running, and only while someone else is left
+                timeout = None
+                if self.hedge and queue and len(running) == 1:
+                    timeout = self._hedge_delay(next(iter(running.values())))
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    if launch_next():
+                        self.hedged += 1
+                    continue
+
+                # Look at every finished call, so a failure that lands alongside the winner is still retrieved
+                winner = None
+                for task in done:
+                    provider = running.pop(task)
+                    if task.exception() is None:
+                        if winner is None:
+                            winner = (task.result(), provider.name)
+                        continue
+                    last_error = task.exception()
+                    logger.warning(f"LLM provider {provider.name} failed: {str(last_error)}")
+                if winner is not None:
+                    self.wins[winner[1]] += 1
+                    return winner
+                if not running:
+                    launch_next()
+        finally:
+            for task in running:
+                task.cancel()
+
+        raise ProvidersUnavailable(f"All LLM providers failed: {str(last_error)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "providers": {
+                provider.name: {
+                    **self.breakers[provider.name].stats(),
+                    "wins": self.wins[provider.name],
+                    "errors": self.errors[provider.name]
+                }
+                for provider in self.providers
+            }
+        }
+
+    async def close(self):
+        for provider in self.providers:
+            await provider.close()
@@ -0,0 +1,691 @@
+import asyncio
+import glob
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from app.services import quantization
+from app.services.quantization import QuantizedMatrix, STORAGE_MODES
+from app.services.skill_index import decode_mask
+
+logger = logging.getLogger(__name__)
+
+# A shard's journal is folded into a new base segment once it holds this many
+# rows and at least as many as the base, which keeps ingest amortized O(1) per row
+COMPACT_MIN_ROWS = 64
+
+class _GrowableArray:
+    """Rows with spare capacity at the end, so appending n rows is amortized O(n)"""
+
+    def __init__(self, tail, dtype):
+        self._data = np.zeros((0,) + tuple(tail), dtype=dtype)
+        self.count = 0
+
+    def extend(self, values: np.ndarray):
+        needed = self.count + len(values)
+        if needed > len(self._data):
+            grown = np.empty((max(16, needed, 2 * len(self._data)),) + self._data.shape[1:], dtype=self._data.dtype)
+            grown[:self.count] = self._data[:self.count]
+            self._data = grown
+        self._data[self.count:needed] = values
+        self.count = needed
+
+    def __setitem__(self, index, value):
+        self._data[index] = value
+
+    @property
+    def view(self) -> np.ndarray:
+        return self._data[:self.count]
+
+def _pwrite_all(fd: int, data: bytes, offset: int):
+    """``os.pwrite`` until every byte is written"""
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view, offset = view[written:], offset + written
+
+class _ShardFiles:
+    """One user's shard on disk: a compacted base segment plus an append-only journal
+
+    ``user_<id>/MANIFEST`` names the current generation ``g``; the base is
+    ``base-<g>.npy`` with its ``base-<g>.json`` (ids and metadata), and later
+    writes go to ``journal-<g>.f32`` (raw float32 rows) and
+    ``journal-<g>.jsonl`` (one record per row). A journal record is written
+    after its row, so a complete line is the commit point of a write; a torn
+    tail is dropped on load. Compaction writes the next generation's files
+    and switches to them with a single rename of the manifest.
+    """
+
+    def __init__(self, directory: str, dimension: int):
+        self.directory = directory
+        self.dimension = dimension
+        self.generation = 0
+        self.base_rows = 0
+        self.journal_rows = 0
+        # Length of the journal log up to its last committed record
+        self.log_bytes = 0
+        self._journal_map: Optional[np.ndarray] = None
+        self._journal_map_key = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @property
+    def manifest_path(self) -> str:
+        return self._path("MANIFEST")
+
+    @property
+    def journal_path(self) -> str:
+        return self._path(f"journal-{self.generation}.f32")
+
+    @property
+    def log_path(self) -> str:
+        return self._path(f"journal-{self.generation}.jsonl")
+
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    def load(self):
+        """Base ids, metadata and (memory-mapped) rows, plus the committed journal records"""
+        with open(self.manifest_path) as f:
+            manifest = json.load(f)
+        self.generation = manifest["generation"]
+        with open(self._path(f"base-{self.generation}.json")) as f:
+            sidecar = json.load(f)
+        base = np.load(self._path(f"base-{self.generation}.npy"), mmap_mode="r")
+        if base.shape != (len(sidecar["ids"]), self.dimension):
+            raise ValueError("base vector/metadata shape mismatch")
+        self.base_rows = base.shape[0]
+
+        records = []
+        if os.path.exists(self.log_path):
+            row_bytes = self.dimension * 4
+            available = os.path.getsize(self.journal_path) // row_bytes if os.path.exists(self.journal_path) else 0
+            committed = 0
+            with open(self.log_path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line) if line.endswith(b"\n") else None
+                    except ValueError:
+                        record = None
+                    if record is None or record["row"] != len(records) or record["row"] >= available:
+                        break
+                    records.append(record)
+                    committed += len(line)
+            if committed != os.path.getsize(self.log_path):
+                logger.warning(f"Dropping torn journal tail in {self.directory}")
+                os.truncate(self.log_path, committed)
+            self.log_bytes = committed
+        self.journal_rows = len(records)
+
+        # Files of generations other than the current one are left over from an interrupted compaction
+        current = {"MANIFEST", f"base-{self.generation}.npy", f"base-{self.generation}.json",
+                   f"journal-{self.generation}.f32", f"journal-{self.generation}.jsonl"}
+        for name in os.listdir(self.directory):
+            if name not in current:
+                os.remove(self._path(name))
+        return sidecar["ids"], sidecar["metadata"], base, records
+
+    def journal(self) -> np.ndarray:
+        """Committed journal rows, memory-mapped"""
+        if not self.journal_rows:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        # Mapped once per journal length, not on every search
+        key = (self.generation, self.journal_rows)
+        if self._journal_map_key != key:
+            self._journal_map = np.memmap(self.journal_path, dtype=np.float32, mode="r",
+                                          shape=(self.journal_rows, self.dimension))
+            self._journal_map_key = key
+        return self._journal_map
+
+    def append(self, entries: List, rows: np.ndarray) -> int:
+        """Append (resume_id, properties) entries and their rows; returns the first journal row"""
+        first = self.journal_rows
+        fd = os.open(self.journal_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            # Written at the committed offset, so bytes of an earlier torn write are overwritten
+            _pwrite_all(fd, np.ascontiguousarray(rows, dtype=np.float32).tobytes(), first * self.dimension * 4)
+        finally:
+            os.close(fd)
+        lines = "".join(
+            json.dumps({"row": first + i, "id": resume_id, "metadata": properties}) + "\n"
+            for i, (resume_id, properties) in enumerate(entries)
+        ).encode("utf-8")
+        fd = os.open(self.log_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            # Also written at the committed offset: a partial line from a failed write
+            # (e.g. ENOSPC) is cut off, never left with acknowledged records behind it
+            os.ftruncate(fd, self.log_bytes)
+            try:
+                _pwrite_all(fd, lines, self.log_bytes)
+            except OSError:
+                os.ftruncate(fd, self.log_bytes)
+                raise
+        finally:
+            os.close(fd)
+        self.log_bytes += len(lines)
+        self.journal_rows += len(entries)
+        return first
+
+    def needs_compaction(self) -> bool:
+        return self.journal_rows >= max(COMPACT_MIN_ROWS, self.base_rows)
+
+    def compact(self, ids: List[str], metadata: List[Dict[str, Any]], vectors: np.ndarray) -> np.ndarray:
+        """Write everything as the next generation's base; returns it memory-mapped"""
+        os.makedirs(self.directory, exist_ok=True)
+        previous = self.generation if self.exists() else None
+        generation = (previous + 1) if previous is not None else 0
+        base_path = self._path(f"base-{generation}.npy")
+        np.save(base_path, np.ascontiguousarray(vectors, dtype=np.float32), allow_pickle=False)
+        with open(self._path(f"base-{generation}.json"), "w") as f:
+            json.dump({"ids": ids, "metadata": metadata}, f)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"generation": generation}, f)
+        os.replace(tmp_path, self.manifest_path)
+
+        self.generation, self.base_rows, self.journal_rows, self.log_bytes = generation, len(ids), 0, 0
+        if previous is not None:
+            for name in (f"base-{previous}.npy", f"base-{previous}.json",
+                         f"journal-{previous}.f32", f"journal-{previous}.jsonl"):
+                try:
+                    os.remove(self._path(name))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:  # e.g. still memory-mapped on Windows; load() retries
+                    logger.warning(f"Could not remove {name} from {self.directory}: {str(e)}")
+        return np.load(base_path, mmap_mode="r")
+
+    def remove(self):
+        # Without its manifest the shard no longer exists, whatever is left behind
+        if self.exists():
+            os.remove(self.manifest_path)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+class _UserShard:
+    """One user's resume vectors and their metadata
+
+    In ``float32`` storage the rows stay resident for a single matrix-vector
+    product. Otherwise only the quantized codes are resident and ``source``
+    maps each row to its float32 copy on disk (base segment, then journal),
+    read back for rescoring.
+    """
+
+    def __init__(self, dimension: int, storage: str):
+        self.dimension = dimension
+        self.storage = storage
+        self.ids: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        self.positions: Dict[str, int] = {}
+        self._rows = _GrowableArray((dimension,), np.float32) if storage == "float32" else None
+        self._codes = _GrowableArray((dimension,), np.float16 if storage == "float16" else np.int8)
+        self._scales = _GrowableArray((), np.float32)
+        self._source = _GrowableArray((), np.int64)
+        self.base: np.ndarray = np.zeros((0, dimension), dtype=np.float32)
+        self.files: Optional[_ShardFiles] = None
+
+    def put_many(self, ids: List[str], metadata: List[Dict[str, Any]], rows: np.ndarray, sources: np.ndarray):
+        """Add or replace rows; a later duplicate ID in the batch wins"""
+        latest = {resume_id: i for i, resume_id in enumerate(ids)}
+        order = list(latest.values())
+        if not order:
+            return
+        rows = np.asarray(rows, dtype=np.float32)[order]
+        sources = np.asarray(sources)[order]
+        quantized = None
+        if self._rows is None:
+            quantized = QuantizedMatrix.from_float32(rows, self.storage)
+
+        appended = []
+        for j, i in enumerate(order):
+            resume_id = ids[i]
+            position = self.positions.get(resume_id)
+            if position is None:
+                self.positions[resume_id] = len(self.ids)
+                self.ids.append(resume_id)
+                self.metadata.append(metadata[i])
+                appended.append(j)
+                continue
+            self.metadata[position] = metadata[i]
+            self._source[position] = sources[j]
+            if quantized is None:
+                self._rows[position] = rows[j]
+            else:
+                self._codes[position] = quantized.codes[j]
+                if quantized.scales is not None:
+                    self._scales[position] = quantized.scales[j]
+
+        if appended:
+            self._source.extend(sources[appended])
+            if quantized is None:
+                self._rows.extend(rows[appended])
+            else:
+                self._codes.extend(quantized.codes[appended])
+                if quantized.scales is not None:
+                    self._scales.extend(quantized.scales[appended])
+
+    @property
+    def quantized(self) -> Optional[QuantizedMatrix]:
+        """Compact in-memory copy used for scoring when storage isn't float32"""
+        if self._rows is not None:
+            return None
+        scales = self._scales.view if self.storage == "int8" else None
+        return QuantizedMatrix(self._codes.view, scales, self.storage)
+
+    @property
+    def vectors(self):
+        """Float32 rows: resident, or read back from disk on indexing"""
+        if self._rows is not None:
+            return self._rows.view
+        return _DiskRows(self.base, self.files.journal() if self.files else self.base[:0], self._source.view)
+
+    def all_vectors(self) -> np.ndarray:
+        if self._rows is not None:
+            return self._rows.view.copy()
+        return self.vectors[np.arange(len(self.ids))]
+
+class _DiskRows:
+    """Float32 rows of a quantized shard, gathered from the base segment and journal"""
+
+    def __init__(self, base: np.ndarray, journal: np.ndarray, source: np.ndarray):
+        self.base = base
+        self.journal = journal
+        self.source = source
+
+    def __getitem__(self, rows) -> np.ndarray:
+        source = self.source[rows]
+        out = np.empty((len(source), self.base.shape[1]), dtype=np.float32)
+        in_base = source < len(self.base)
+        out[in_base] = self.base[source[in_base]]
+        out[~in_base] = self.journal[source[~in_base] - len(self.base)]
+        return out
+
+class _SectionSet:
+    """Section vectors of one resume, keyed by section content hash"""
+
+    def __init__(self, user_id: int, hashes: List[str], kinds: List[str], vectors: np.ndarray):
+        self.user_id = user_id
+        self.hashes = hashes
+        self.kinds = kinds
+        self.vectors = vectors
+
+class LocalVectorIndex:
+    """In-process resume vector index used when Weaviate is unavailable
+
+    Each user gets a float32 matrix of unit-normalized vectors, so cosine
+    similarity is a single matrix-vector product. Shards are persisted under
+    ``user_<id>/`` as a base segment plus an append-only journal (see
+    ``_ShardFiles``), so a write costs the rows it adds rather than the whole
+    shard, and a restart doesn't have to re-embed anything.
+
+    With ``storage`` set to ``int8`` (or ``float16``, which halves memory
+    less and scores several times slower; see ``QuantizedMatrix``) searches
+    score a quantized in-memory copy and the float32 rows stay on disk,
+    memory-mapped, where only the shortlisted candidates are read back for
+    rescoring.
+    """
+
+    def __init__(self, data_dir: str, dimension: int, storage: str = "float32",
+                 rescore: bool = True, rescore_factor: int = 4):
+        if storage not in STORAGE_MODES:
+            raise ValueError(f"Unknown embedding storage mode: {storage}")
+        self.data_dir = data_dir
+        self.dimension = dimension
+        self.storage = storage
+        self.rescore = rescore
+        self.rescore_factor = rescore_factor
+        self._shards: Dict[int, _UserShard] = {}
+        self._owners: Dict[str, int] = {}
+        self._sections: Dict[str, _SectionSet] = {}
+        self._write_lock = asyncio.Lock()
+
+    async def initialize(self):
+        """Load persisted shards memory-mapped"""
+        os.makedirs(os.path.join(self.data_dir, "sections"), exist_ok=True)
+        await asyncio.to_thread(self._load_all)
+        logger.info(f"Local vector index loaded {len(self._owners)} resumes for {len(self._shards)} users")
+
+    def _shard_files(self, user_id: int) -> _ShardFiles:
+        return _ShardFiles(os.path.join(self.data_dir, f"user_{user_id}"), self.dimension)
+
+    def _section_path(self, resume_id: str) -> str:
+        return os.path.join(self.data_dir, "sections", f"{resume_id}.npz")
+
+    def _build_shard(self, files: _ShardFiles, ids: List[str], metadata: List[Dict[str, Any]],
+                     base: np.ndarray, records: List[Dict[str, Any]] = ()) -> _UserShard:
+        shard = _UserShard(self.dimension, self.storage)
+        shard.files = files
+        shard.base = base
+        shard.put_many(ids, metadata, base, np.arange(len(ids)))
+        if records:
+            journal = files.journal()
+            shard.put_many([record["id"] for record in records], [record["metadata"] for record in records],
+                           journal[[record["row"] for record in records]],
+                           len(ids) + np.array([record["row"] for record in records]))
+        return shard
+
+    def _load_all(self):
+        sections_dir = os.path.join(self.data_dir, "sections")
+        for legacy_path in glob.glob(os.path.join(sections_dir, "*.json")):
+            self._migrate_sections(legacy_path)
+        for path in glob.glob(os.path.join(sections_dir, "*.npz")):
+            resume_id = os.path.basename(path)[:-len(".npz")]
+            try:
+                with np.load(path, allow_pickle=False) as data:
+                    self._sections[resume_id] = _SectionSet(
+                        int(data["user_id"]), data["hashes"].tolist(), data["kinds"].tolist(),
+                        np.array(data["vectors"], dtype=np.float32)
+                    )
+            except Exception as e:
+                logger.error(f"Skipping corrupt section vectors for resume {resume_id}: {str(e)}")
+
+        for legacy_path in glob.glob(os.path.join(self.data_dir, "user_*.json")):
+            self._migrate_shard(legacy_path)
+        for manifest_path in glob.glob(os.path.join(self.data_dir, "user_*", "MANIFEST")):
+            match = re.search(r"user_(-?\d+)$", os.path.dirname(manifest_path))
+            if not match:
+                continue
+            user_id = int(match.group(1))
+            files = self._shard_files(user_id)
+            try:
+                ids, metadata, base, records = files.load()
+                shard = self._build_shard(files, ids, metadata, base, records)
+            except Exception as e:
+                logger.error(f"Skipping corrupt local index shard for user {user_id}: {str(e)}")
+                continue
+            self._shards[user_id] = shard
+            for resume_id in shard.ids:
+                self._owners[resume_id] = user_id
+
+    def _migrate_shard(self, meta_path: str):
+        """Rewrite a shard saved as a single ``user_<id>.npy`` + JSON pair in the segment layout"""
+        match = re.search(r"user_(-?\d+)\.json$", meta_path)
+        if not match:
+            return
+        user_id = int(match.group(1))
+        vector_path = meta_path[:-len(".json")] + ".npy"
+        try:
+            with open(meta_path) as f:
+                sidecar = json.load(f)
+            vectors = np.load(vector_path)
+            if vectors.shape[0] != len(sidecar["ids"]):
+                raise ValueError("vector/metadata row count mismatch")
+            files = self._shard_files(user_id)
+            if not files.exists():
+                files.compact(sidecar["ids"], sidecar["metadata"], vectors)
+        except Exception as e:
+            logger.error(f"Skipping corrupt local index shard for user {user_id}: {str(e)}")
+            return
+        for path in (vector_path, meta_path):
+            os.remove(path)
+
+    def _migrate_sections(self, meta_path: str):
+        """Rewrite section vectors saved as an ``.npy`` + JSON pair as one ``.npz``"""
+        resume_id = os.path.basename(meta_path)[:-len(".json")]
+        vector_path = meta_path[:-len(".json")] + ".npy"
+        try:
+            with open(meta_path) as f:
+                sidecar = json.load(f)
+            vectors = np.load(vector_path)
+            self._persist_sections(resume_id, _SectionSet(sidecar["userId"], sidecar["hashes"],
+                                                          sidecar["kinds"], vectors))
+        except Exception as e:
+            logger.error(f"Skipping corrupt section vectors for resume {resume_id}: {str(e)}")
+            return
+        for path in (vector_path, meta_path):
+            os.remove(path)
+
+    def _persist_sections(self, resume_id: str, section_set: Optional[_SectionSet]):
+        """Atomically write (or remove) a resume's section vectors (blocking)
+
+        Vectors, hashes and kinds share one file, replaced with a single rename.
+        """
+        path = self._section_path(resume_id)
+        if section_set is None or not section_set.hashes:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, user_id=np.int64(section_set.user_id), hashes=np.array(section_set.hashes),
+                     kinds=np.array(section_set.kinds), vectors=np.asarray(section_set.vectors, dtype=np.float32))
+        os.replace(tmp_path, path)
+
+    def _rewrite(self, files: _ShardFiles, ids: List[str], metadata: List[Dict[str, Any]],
+                 vectors: np.ndarray) -> _UserShard:
+        """Write a shard's full contents as a new base segment and load it (blocking)"""
+        base = files.compact(ids, metadata, vectors)
+        return self._build_shard(files, ids, metadata, base)
+
+    def _compact(self, shard: _UserShard) -> _UserShard:
+        """Fold a shard's journal into a new base segment (blocking)"""
+        return self._rewrite(shard.files, list(shard.ids), list(shard.metadata), shard.all_vectors())
+
+    async def _write_rows(self, user_id: int, ids: List[str], metadata: List[Dict[str, Any]], rows: np.ndarray):
+        """Persist rows for one user, then apply them in memory; caller holds the write lock
+
+        A user's first rows become the base segment; later ones are appended
+        to the journal, which is compacted once it outgrows the base.
+        """
+        shard = self._shards.get(user_id)
+        if shard is None:
+            latest = list({resume_id: i for i, resume_id in enumerate(ids)}.values())
+            shard = await asyncio.to_thread(
+                self._rewrite, self._shard_files(user_id),
+                [ids[i] for i in latest], [metadata[i] for i in latest], rows[latest]
+            )
+        else:
+            first = await asyncio.to_thread(shard.files.append, list(zip(ids, metadata)), rows)
+            shard.put_many(ids, metadata, rows, shard.files.base_rows + first + np.arange(len(ids)))
+            if shard.files.needs_compaction():
+                try:
+                    shard = await asyncio.to_thread(self._compact, shard)
+                except Exception as e:
+                    # The rows are already committed to the journal; compaction is retried on the next write
+                    logger.error(f"Local index compaction failed for user {user_id}: {str(e)}")
+        self._shards[user_id] = shard
+
+        # A resume re-stored under another user leaves its previous owner's shard
+        moved: Dict[int, List[str]] = {}
+        for resume_id in dict.fromkeys(ids):
+            previous = self._owners.get(resume_id)
+            if previous is not None and previous != user_id:
+                moved.setdefault(previous, []).append(resume_id)
+            self._owners[resume_id] = user_id
+        for previous, resume_ids in moved.items():
+            await self._remove_rows(previous, resume_ids)
+
+    async def _remove_rows(self, user_id: int, resume_ids: List[str]):
+        """Drop rows from a user's shard; caller holds the write lock and maintains ``_owners``
+
+        Deletes are rare, so they rewrite the shard rather than journal a tombstone.
+        """
+        shard = self._shards.get(user_id)
+        if shard is None:
+            return
+        drop = {shard.positions[resume_id] for resume_id in resume_ids if resume_id in shard.positions}
+        if not drop:
+            return
+        keep = [i for i in range(len(shard.ids)) if i not in drop]
+        if keep:
+            self._shards[user_id] = await asyncio.to_thread(
+                self._rewrite, shard.files, [shard.ids[i] for i in keep],
+                [shard.metadata[i] for i in keep], shard.vectors[np.array(keep)]
+            )
+        else:
+            await asyncio.to_thread(shard.files.remove)
+            del self._shards[user_id]
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    async def store(self, resume_id: str, vector, properties: Dict[str, Any]):
+        """Add or replace a resume vector in its owner's shard"""
+        user_id = int(properties["userId"])
+        row = self._normalize(vector)
+        if row.shape[0] != self.dimension:
+            raise ValueError(f"Expected {self.dimension}-dim vector, got {row.shape[0]}")
+
+        async with self._write_lock:
+            await self._write_rows(user_id, [resume_id], [properties], row[None, :])
+
+    async def store_many(self, objects, batch_size: int = 100, num_workers: int = 2) -> Dict[str, str]:
+        """Add many (id, vector, properties) triples, writing each touched shard once"""
+        errors: Dict[str, str] = {}
+        by_user: Dict[int, List] = {}
+        for resume_id, vector, properties in objects:
+            try:
+                row = self._normalize(vector)
+                if row.shape[0] != self.dimension:
+                    raise ValueError(f"Expected {self.dimension}-dim vector, got {row.shape[0]}")
+                by_user.setdefault(int(properties["userId"]), []).append((resume_id, row, properties))
+            except Exception as e:
+                errors[resume_id] = str(e)
+
+        async with self._write_lock:
+            for user_id, rows in by_user.items():
+                try:
+                    await self._write_rows(user_id, [resume_id for resume_id, _, _ in rows],
+                                           [properties for _, _, properties in rows],
+                                           np.stack([row for _, row, _ in rows]))
+                except Exception as e:
+                    for resume_id, _, _ in rows:
+                        errors[resume_id] = f"persist failed: {str(e)}"
+
+        return errors
+
+    async def search(self, vector, user_id: int, limit: int) -> List[Dict[str, Any]]:
+        """Batched cosine top-k over one user's resumes"""
+        shard = self._shards.get(user_id)
+        if shard is None or not shard.ids:
+            return []
+
+        query = self._normalize(vector)
+        quantized = shard.quantized
+        if quantized is not None:
+            top, similarities = quantization.search(
+                quantized, query, limit,
+                exact=shard.vectors if self.rescore else None,
+                rescore_factor=self.rescore_factor
+            )
+        else:
+            all_similarities = np.asarray(shard.vectors @ query)
+            top = quantization.top_k(all_similarities, limit)
+            similarities = all_similarities[top]
+
+        resumes = []
+        for position, similarity in zip(top, similarities):
+            item = shard.metadata[position]
+            similarity = float(similarity)
+            resumes.append({
+                "id": shard.ids[position],
+                "content": item["content"],
+                "file_name": item["fileName"],
+                "file_path": item["filePath"],
+                "keywords": item.get("keywords", []),
+                "skill_mask": decode_mask(item.get("skillMask")),
+                "distance": 1 - similarity,
+                "score": similarity
+            })
+        return resumes
+
+    async def get_user_vectors(self, user_id: int) -> Dict[str, Any]:
+        """All of a user's resume IDs, properties and float32 vectors"""
+        shard = self._shards.get(user_id)
+        if shard is None:
+            return {"ids": [], "metadata": [], "vectors": np.zeros((0, self.dimension), dtype=np.float32)}
+        return {"ids": list(shard.ids), "metadata": list(shard.metadata), "vectors": shard.all_vectors()}
+
+    async def delete(self, resume_id: str):
+        """Remove a resume from its owner's shard"""
+        async with self._write_lock:
+            user_id = self._owners.get(resume_id)
+            if user_id is None:
+                return
+            await self._remove_rows(user_id, [resume_id])
+            del self._owners[resume_id]
+
+            if resume_id in self._sections:
+                await asyncio.to_thread(self._persist_sections, resume_id, None)
+                del self._sections[resume_id]
+
+    async def store_sections(self, entries) -> Dict[str, str]:
+        """Upsert (resume_id, user_id, section_hash, kind, vector) entries; returns failures by resume ID"""
+        errors: Dict[str, str] = {}
+        by_resume: Dict[str, List] = {}
+        for resume_id, user_id, digest, kind, vector in entries:
+            by_resume.setdefault(resume_id, []).append((int(user_id), digest, kind, self._normalize(vector)))
+
+        async with self._write_lock:
+            for resume_id, rows in by_resume.items():
+                current = self._sections.get(resume_id)
+                hashes = list(current.hashes) if current else []
+                kinds = list(current.kinds) if current else []
+                vectors = [row for row in np.asarray(current.vectors)] if current else []
+                for user_id, digest, kind, row in rows:
+                    if digest in hashes:
+                        continue
+                    hashes.append(digest)
+                    kinds.append(kind)
+                    vectors.append(row)
+
+                section_set = _SectionSet(rows[0][0], hashes, kinds, np.stack(vectors).astype(np.float32))
+                try:
+                    await asyncio.to_thread(self._persist_sections, resume_id, section_set)
+                except Exception as e:
+                    errors[resume_id] = f"persist failed: {str(e)}"
+                    continue
+                self._sections[resume_id] = section_set
+
+        return errors
+
+    async def delete_sections(self, resume_id: str, hashes: Optional[List[str]] = None):
+        """Remove some (or all) section vectors of a resume"""
+        async with self._write_lock:
+            current = self._sections.get(resume_id)
+            if current is None:
+                return
+            drop = set(current.hashes if hashes is None else hashes)
+            keep = [i for i, digest in enumerate(current.hashes) if digest not in drop]
+            section_set = None
+            if keep:
+                section_set = _SectionSet(
+                    current.user_id,
+                    [current.hashes[i] for i in keep],
+                    [current.kinds[i] for i in keep],
+                    np.array(current.vectors[keep], dtype=np.float32)
+                )
+            await asyncio.to_thread(self._persist_sections, resume_id, section_set)
+            if section_set:
+                self._sections[resume_id] = section_set
+            else:
+                del self._sections[resume_id]
+
+    async def get_sections(self, resume_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Section hashes, kinds and vectors for the given resumes"""
+        found = {}
+        for resume_id in resume_ids:
+            section_set = self._sections.get(resume_id)
+            if section_set is not None:
+                found[resume_id] = {
+                    "hashes": section_set.hashes,
+                    "kinds": section_set.kinds,
+                    "vectors": np.asarray(section_set.vectors)
+                }
+        return found
+
+    async def close(self):
+        """Drop memory-mapped shards"""
+        self._shards.clear()
+        self._owners.clear()
+        self._sections.clear()
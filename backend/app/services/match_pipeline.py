@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Import settings with fallback; every setting below has a getattr default
+try:
+    from app.core.config import settings
+except ImportError:
+    class DefaultSettings:
+        pass
+    settings = DefaultSettings()
+
+Results = Dict[str, Any]
+
+class Stage:
+    """One node of a stage graph: an async step with dependencies, a deadline and a fallback
+
+    ``run`` and ``fallback`` receive the results of every stage finished so
+    far. The fallback result is used when ``run`` misses its deadline or
+    raises, so downstream stages always have an input.
+    """
+
+    def __init__(self, name: str, run: Callable[[Results], Awaitable[Any]],
+                 fallback: Callable[[Results], Any], timeout: float, depends_on: Sequence[str] = ()):
+        self.name = name
+        self.run = run
+        self.fallback = fallback
+        self.timeout = timeout
+        self.depends_on = tuple(depends_on)
+
+async def run_stages(stages: List[Stage]) -> Tuple[Results, Dict[str, Dict[str, Any]]]:
+    """Run stages as soon as their dependencies finish; returns (results, per-stage timings)"""
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        missing = [name for name in stage.depends_on if name not in by_name]
+        if missing:
+            raise ValueError(f"Stage {stage.name} depends on unknown stages {missing}")
+
+    results: Results = {}
+    timings: Dict[str, Dict[str, Any]] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+    origin = time.perf_counter()
+
+    async def execute(stage: Stage):
+        if stage.depends_on:
+            await asyncio.gather(*(tasks[name] for name in stage.depends_on))
+
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            results[stage.name] = await asyncio.wait_for(stage.run(results), stage.timeout)
+        except asyncio.TimeoutError:
+            status = "timeout"
+            logger.warning(f"Match stage {stage.name} missed its {stage.timeout}s deadline, using fallback")
+        except Exception as e:
+            status = "error"
+            logger.error(f"Match stage {stage.name} failed, using fallback: {str(e)}")
+        if status != "ok":
+            results[stage.name] = stage.fallback(results)
+
+        finished = time.perf_counter()
+        timings[stage.name] = {
+            "status": status,
+            "start_ms": round((started - origin) * 1000, 1),
+            "duration_ms": round((finished - started) * 1000, 1),
+            "deadline_ms": round(stage.timeout * 1000, 1)
+        }
+
+    # Dependencies are declared by name, so create every task before any of them runs
+    for stage in stages:
+        tasks[stage.name] = asyncio.ensure_future(execute(stage))
+    try:
+        await asyncio.gather(*tasks.values())
+    finally:
+        for task in tasks.values():
+            task.cancel()
+    return results, timings
+
+def critical_path(stages: List[Stage]) -> float:
+    """Longest chain of stage deadlines through the graph: the worst-case pipeline latency"""
+    by_name = {stage.name: stage for stage in stages}
+    finish: Dict[str, float] = {}
+
+    def latest_finish(stage: Stage) -> float:
+        if stage.name not in finish:
+            finish[stage.name] = stage.timeout + max(
+                (latest_finish(by_name[name]) for name in stage.depends_on), default=0.0
+            )
+        return finish[stage.name]
+
+    return max((latest_finish(stage) for stage in stages), default=0.0)
+
+class MatchPipeline:
+    """Job match as a stage graph: resume search, then gap analysis and email draft
+
+    A local gap analysis (``local_gap``) runs right after the search in a few
+    milliseconds; the LLM stages refine it and fall back to it. By default the
+    two LLM outputs come from one structured call (``insights``), which needs
+    the local draft in its prompt, so the stages form a strict chain: search,
+    local_gap, insights. With ``MATCH_COMBINED_LLM`` off they are separate
+    stages, and only then is there overlap: the email draft needs just the
+    search and runs alongside local_gap and gap_analysis.
+
+    Each stage has its own deadline (``MATCH_*_TIMEOUT`` settings); the longest
+    chain of them must fit the ``MATCH_TARGET_SECONDS`` (5 s P95) target, which
+    ``check_deadlines`` verifies once at startup. A late LLM call is
+    abandoned for a template, but coalesced calls keep running and still fill
+    the response cache for the next request.
+    """
+
+    def __init__(self, vector_service, ml_service, search_limit: int = 5):
+        self.vector_service = vector_service
+        self.ml_service = ml_service
+        self.search_limit = search_limit
+        self.search_timeout = getattr(settings, 'MATCH_SEARCH_TIMEOUT', 1.5)
+        self.local_gap_timeout = getattr(settings, 'MATCH_LOCAL_GAP_TIMEOUT', 0.5)
+        self.gap_timeout = getattr(settings, 'MATCH_GAP_TIMEOUT', 3.0)
+        self.email_timeout = getattr(settings, 'MATCH_EMAIL_TIMEOUT', 3.0)
+        self.combined = getattr(settings, 'MATCH_COMBINED_LLM', True)
+        self.insights_timeout = getattr(settings, 'MATCH_INSIGHTS_TIMEOUT', 3.0)
+        self.target_seconds = getattr(settings, 'MATCH_TARGET_SECONDS', 5.0)
+
+    @classmethod
+    def check_deadlines(cls) -> float:
+        """Fail fast on ``MATCH_*_TIMEOUT`` settings whose critical path exceeds the target
+
+        Settings don't change at runtime, so the app calls this once at startup
+        rather than on every request. Returns the worst-case latency.
+        """
+        pipeline = cls(vector_service=None, ml_service=None)
+        worst = critical_path(pipeline.stages("", 0))
+        if worst > pipeline.target_seconds + 1e-9:
+            raise ValueError(f"Match stage deadlines add up to {worst:.2f}s on the critical path, "
+                             f"over the {pipeline.target_seconds}s target; lower the MATCH_*_TIMEOUT settings")
+        return worst
+
+    def stages(self, job_description: str, user_id: int, personal_story: str = "") -> List[Stage]:
+        ml = self.ml_service
+
+        def best_content(results: Results) -> str:
+            matches = results.get("search") or []
+            return matches[0]["content"] if matches else ""
+
+        async def search(results: Results):
+            return await self.vector_service.search_resumes(job_description, user_id, limit=self.search_limit)
+
+        async def local_gap(results: Results):
+            return await ml.quick_gap_analysis(best_content(results), job_description)
+
+        def local_gap_fallback(results: Results):
+            return ml.gap_engine.analyze_lexical(best_content(results), job_description)["suggestions"]
+
+        async def gap_analysis(results: Results):
+            content = best_content(results)
+            if not content:
+                return gap_fallback(results)
+            return await ml.generate_gap_analysis(content, job_description, draft=results["local_gap"])
+
+        def gap_fallback(results: Results):
+            return results["local_gap"]
+
+        async def email_draft(results: Results):
+            content = best_content(results)
+            if not content:
+                return email_fallback(results)
+            return await ml.generate_email_draft(job_description, content, personal_story)
+
+        def email_fallback(results: Results):
+            return ml._fallback_email_template(ml._extract_company_info(job_description), job_description, personal_story)
+
+        async def insights(results: Results):
+            content = best_content(results)
+            if not content:
+                return insights_fallback(results)
+            return await ml.generate_match_insights(content, job_description, personal_story,
+                                                    draft=results["local_gap"])
+
+        def insights_fallback(results: Results):
+            return {"gap_analysis": gap_fallback(results), "email_draft": email_fallback(results), "source": "template"}
+
+        first_stages = [
+            Stage("search", search, lambda results: [], self.search_timeout),
+            Stage("local_gap", local_gap, local_gap_fallback, self.local_gap_timeout, depends_on=("search",)),
+        ]
+        if self.combined:
+            return first_stages + [
+                Stage("insights", insights, insights_fallback, self.insights_timeout, depends_on=("local_gap",)),
+            ]
+        return first_stages + [
+            Stage("gap_analysis", gap_analysis, gap_fallback, self.gap_timeout, depends_on=("local_gap",)),
+            Stage("email_draft", email_draft, email_fallback, self.email_timeout, depends_on=("search",)),
+        ]
+
+    async def run(self, job_description: str, user_id: int, personal_story: str = "") -> Dict[str, Any]:
+        """Best resume, alternatives, gap analysis, email draft and per-stage timings"""
+        started = time.perf_counter()
+        results, timings = await run_stages(self.stages(job_description, user_id, personal_story))
+        matches = results["search"]
+        if "insights" in results:
+            results.update(gap_analysis=results["insights"]["gap_analysis"],
+                           email_draft=results["insights"]["email_draft"])
+        return {
+            "best_resume": matches[0] if matches else None,
+            "alternatives": matches[1:],
+            "gap_analysis": results["gap_analysis"],
+            "email_draft": results["email_draft"],
+            "timings": timings,
+            "total_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
@@ -1,27 +1,102 @@
 import openai
 import logging
-from typing import List, Dict, Any
+import os
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, List, Dict, Any, Optional
 from app.core.config import settings
+from app.services.gap_engine import GapEngine
+from app.services.llm_cache import LLMResponseCache
+from app.services.llm_providers import (
+    CallableProvider, CircuitBreaker, HuggingFaceProvider, ProviderRouter, parse_json_object
+)
+from app.services.prompt_budget import PromptBudgeter
+from app.services.rate_limiter import LLMRateLimiter, estimate_tokens
+from app.services.readiness import readiness, READY, DEGRADED, FAILED
+from app.services.single_flight import SingleFlight
+from app.services.skill_extractor import skill_extractor
 import json
 import asyncio
 import httpx
 
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = "You are an expert career coach and resume advisor."
+
+# Response shape requested from the combined gap analysis + email call
+INSIGHTS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "suggestions": {"type": "array", "items": {"type": "string"}, "minItems": 6, "maxItems": 8},
+        "email": {"type": "string"}
+    },
+    "required": ["suggestions", "email"]
+}
+
+# Provider errors worth retrying: throttling, dropped connections/timeouts and 5xx
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
 class MLService:
     """Enhanced ML service with better error handling and fallbacks"""
     
-    def __init__(self):
+    def __init__(self, embed_many=None):
         self.openai_client = None
+        self.http_client = None
         self.huggingface_client = None
+        # Providers in priority order; empty until initialize() finds credentials
+        self.router = ProviderRouter([])
+        self.model = getattr(settings, 'OPENAI_MODEL', 'gpt-3.5-turbo')
+        self.max_tokens = 600
+        # The combined call returns suggestions and a full email
+        self.insights_max_tokens = 900
+        self.temperature = 0.4
+        # Give up on a stream that goes quiet for this long and fall back to the template
+        self.stream_idle_timeout = getattr(settings, 'LLM_STREAM_IDLE_TIMEOUT', 15.0)
+        self.response_cache = LLMResponseCache(
+            max_entries=getattr(settings, 'LLM_CACHE_SIZE', 512),
+            db_path=getattr(settings, 'LLM_CACHE_PATH', os.path.join(os.getcwd(), "data", "llm_cache.sqlite3")),
+            ttl_seconds=getattr(settings, 'LLM_CACHE_TTL_SECONDS', 7 * 24 * 3600),
+            max_disk_entries=getattr(settings, 'LLM_CACHE_MAX_DISK_ENTRIES', 50000)
+        )
+        # Identical requests already in flight share one LLM call
+        self.in_flight = SingleFlight()
+        # Stay under the provider's quotas instead of discovering them through 429s
+        self.rate_limiter = LLMRateLimiter(
+            max_concurrency=getattr(settings, 'LLM_MAX_CONCURRENCY', 8),
+            requests_per_minute=getattr(settings, 'LLM_REQUESTS_PER_MINUTE', 500),
+            tokens_per_minute=getattr(settings, 'LLM_TOKENS_PER_MINUTE', 90000)
+        )
+        self.max_retries = getattr(settings, 'LLM_MAX_RETRIES', 3)
+        # Prompts carry the most relevant sentences of each text instead of a fixed-length prefix
+        self.prompt_budgeter = PromptBudgeter(embed_many)
+        self.gap_job_tokens = getattr(settings, 'PROMPT_GAP_JOB_TOKENS', 400)
+        self.gap_resume_tokens = getattr(settings, 'PROMPT_GAP_RESUME_TOKENS', 400)
+        self.email_job_tokens = getattr(settings, 'PROMPT_EMAIL_JOB_TOKENS', 300)
+        self.email_resume_tokens = getattr(settings, 'PROMPT_EMAIL_RESUME_TOKENS', 200)
+        # Local gap analysis: the instant answer, and the draft the LLM refines
+        self.gap_engine = GapEngine(embed_many, embed_timeout=getattr(settings, 'GAP_EMBED_TIMEOUT', 0.05))
+        self.retries = 0
         self.initialized = False
     
     async def initialize(self):
         """Initialize AI clients with fallbacks"""
         try:
             if settings.OPENAI_API_KEY:
-                openai.api_key = settings.OPENAI_API_KEY
-                self.openai_client = openai
+                max_connections = getattr(settings, 'LLM_MAX_CONNECTIONS', 20)
+                # One pooled transport for every call, so requests reuse warm keep-alive connections
+                self.http_client = httpx.AsyncClient(
+                    limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+                    timeout=httpx.Timeout(getattr(settings, 'LLM_TIMEOUT', 30.0), connect=5.0)
+                )
+                # OPENAI_BASE_URL can point at tools/stub_llm_server.py offline
+                self.openai_client = openai.AsyncOpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    base_url=getattr(settings, 'OPENAI_BASE_URL', None),
+                    http_client=self.http_client,
+                    max_retries=0  # retried in _call_openai, which honours Retry-After and the rate limiter
+                )
                 logger.info("ML service initialized with OpenAI")
             
             if settings.HUGGINGFACE_API_KEY:
@@ -31,28 +106,138 @@ class MLService:
                 )
                 logger.info("ML service initialized with HuggingFace")
             
+            self.router = self._create_router()
             self.initialized = True
+            if self.router:
+                readiness.mark("llm", READY)
+            else:
+                readiness.mark("llm", DEGRADED, "no LLM provider configured; using templates")
             
         except Exception as e:
             logger.error(f"Failed to initialize ML service: {str(e)}")
             self.initialized = False
+            readiness.mark("llm", FAILED, str(e))
+    
+    async def quick_gap_analysis(self, resume_content: str, job_description: str) -> List[str]:
+        """Specific gap suggestions from the local engine, in milliseconds and without an LLM"""
+        return (await self.gap_engine.analyze(resume_content, job_description))["suggestions"]
     
-    async def generate_gap_analysis(self, resume_content: str, job_description: str) -> List[str]:
-        """Generate comprehensive gap analysis with enhanced suggestions"""
+    async def generate_gap_analysis(self, resume_content: str, job_description: str, refine: bool = True,
+                                    draft: Optional[List[str]] = None) -> List[str]:
+        """Generate comprehensive gap analysis with enhanced suggestions
+        
+        The local engine's suggestions (``draft``, computed if not given) are
+        returned as they are with ``refine=False`` or no LLM provider; otherwise
+        the LLM refines them and they remain the fallback.
+        """
+        if draft is None:
+            draft = await self.quick_gap_analysis(resume_content, job_description)
+        if not refine or not self.router:
+            return draft
+        try:
+            prompt = await self._gap_prompt(resume_content, job_description, draft)
+            response = self._parse_json_object(await self._complete(prompt, json_mode=True))
+            suggestions = self._validate_suggestions(response.get("suggestions"))
+            if suggestions:
+                return suggestions
+        except Exception as e:
+            logger.error(f"Error generating gap analysis: {str(e)}")
+        return draft
+    
+    async def generate_email_draft(self, job_description: str, resume_content: str, personal_story: str = "") -> str:
+        """Generate personalized outreach email with enhanced personalization"""
         try:
-            # Extract key requirements from job description
-            job_keywords = self._extract_keywords(job_description)
-            resume_keywords = self._extract_keywords(resume_content)
+            # Extract company and role info
+            company_info = self._extract_company_info(job_description)
             
-            prompt = f"""
-            Analyze this resume against the job description and provide specific, actionable improvement suggestions.
+            if self.router:
+                prompt = await self._email_prompt(job_description, resume_content, personal_story)
+                email = await self._complete(prompt)
+                if email and len(email) > 50:
+                    return email
+            
+            # Fallback template with dynamic content
+            return self._fallback_email_template(company_info, job_description, personal_story)
+                
+        except Exception as e:
+            logger.error(f"Error generating email draft: {str(e)}")
+            return self._fallback_email_template({}, job_description, personal_story)
+    
+    async def generate_match_insights(self, resume_content: str, job_description: str,
+                                      personal_story: str = "", draft: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Gap analysis and outreach email from one structured LLM call
+        
+        Each field is validated separately; one the model got wrong falls back to
+        the local gap analysis or the email template without losing the other.
+        """
+        if draft is None:
+            draft = await self.quick_gap_analysis(resume_content, job_description)
+        suggestions, email, source = [], None, "template"
+        try:
+            if self.router:
+                prompt = await self._insights_prompt(resume_content, job_description, personal_story, draft)
+                response = self._parse_json_object(
+                    await self._complete(prompt, max_tokens=self.insights_max_tokens, json_mode=True)
+                )
+                suggestions = self._validate_suggestions(response.get("suggestions"))
+                email = self._validate_email(response.get("email"))
+                source = "llm" if suggestions and email else "partial" if suggestions or email else "template"
+        except Exception as e:
+            logger.error(f"Error generating match insights: {str(e)}")
+        
+        if not suggestions:
+            suggestions = draft
+        if not email:
+            email = self._fallback_email_template(
+                self._extract_company_info(job_description), job_description, personal_story
+            )
+        return {"gap_analysis": suggestions, "email_draft": email, "source": source}
+    
+    async def _insights_prompt(self, resume_content: str, job_description: str, personal_story: str,
+                               draft: Optional[List[str]] = None) -> str:
+        """Render the combined gap analysis + email prompt; both texts are sent once"""
+        job_text, resume_text = await self.prompt_budgeter.fit(
+            job_description, resume_content,
+            max(self.gap_job_tokens, self.email_job_tokens), max(self.gap_resume_tokens, self.email_resume_tokens)
+        )
+        return f"""
+            Analyze this resume against the job description, then write an outreach email for this job application.
             
             Job Description:
-            {job_description[:2000]}
+            {job_text}
             
             Resume Content:
-            {resume_content[:2000]}
+            {resume_text}
+            
+            Personal Context: {personal_story}
+            {self._draft_block(draft)}
+            Respond with only a JSON object matching this schema:
+            {json.dumps(INSIGHTS_SCHEMA)}
+            
+            "suggestions": 6-8 specific, actionable improvement suggestions covering missing technical
+            skills, experience to highlight, keywords to add, quantifiable achievements, industry
+            terminology and helpful certifications. Avoid generic advice.
+            
+            "email": a professional, personalized outreach email under 200 words. Include a subject line,
+            a warm conversational tone, specific matching skills and experiences, genuine interest in the
+            company/role and a clear call to action. Use [Hiring Manager] as placeholder for name.
+            """
+    
+    async def _gap_prompt(self, resume_content: str, job_description: str,
+                          draft: Optional[List[str]] = None) -> str:
+        """Render the gap analysis prompt with both texts packed into their token budgets"""
+        job_text, resume_text = await self.prompt_budgeter.fit(
+            job_description, resume_content, self.gap_job_tokens, self.gap_resume_tokens
+        )
+        return f"""
+            Analyze this resume against the job description and provide specific, actionable improvement suggestions.
+            
+            Job Description:
+            {job_text}
             
+            Resume Content:
+            {resume_text}
+            {self._draft_block(draft)}
             Provide 6-8 specific suggestions focusing on:
             1. Missing technical skills or technologies
             2. Relevant experience that should be highlighted
@@ -61,38 +246,33 @@ class MLService:
             5. Industry-specific terminology to include
             6. Certifications or training that would help
             
-            Format each suggestion as a clear, actionable bullet point.
             Be specific and avoid generic advice.
+            Respond with only a JSON object of the form {{"suggestions": ["...", "..."]}}.
             """
-            
-            if self.openai_client:
-                suggestions = await self._call_openai(prompt)
-                # Parse and clean suggestions
-                parsed_suggestions = self._parse_suggestions(suggestions)
-                if parsed_suggestions:
-                    return parsed_suggestions
-            
-            # Fallback to rule-based analysis
-            return self._fallback_gap_analysis(resume_keywords, job_keywords)
-                
-        except Exception as e:
-            logger.error(f"Error generating gap analysis: {str(e)}")
-            return self._fallback_gap_analysis(set(), set())
     
-    async def generate_email_draft(self, job_description: str, resume_content: str, personal_story: str = "") -> str:
-        """Generate personalized outreach email with enhanced personalization"""
-        try:
-            # Extract company and role info
-            company_info = self._extract_company_info(job_description)
-            
-            prompt = f"""
+    def _draft_block(self, draft: Optional[List[str]]) -> str:
+        """Local gap findings for the LLM to check and improve on"""
+        if not draft:
+            return ""
+        findings = "\n".join(f"- {suggestion}" for suggestion in draft)
+        return f"""
+            Preliminary findings from an automated requirement check (verify, correct and build on them):
+            {findings}
+            """
+    
+    async def _email_prompt(self, job_description: str, resume_content: str, personal_story: str) -> str:
+        """Render the outreach email prompt with both texts packed into their token budgets"""
+        job_text, resume_text = await self.prompt_budgeter.fit(
+            job_description, resume_content, self.email_job_tokens, self.email_resume_tokens
+        )
+        return f"""
             Write a professional, personalized outreach email for this job application.
             
             Job Description:
-            {job_description[:1500]}
+            {job_text}
             
             Candidate Background:
-            {resume_content[:1000]}
+            {resume_text}
             
             Personal Context: {personal_story}
             
@@ -107,57 +287,214 @@ class MLService:
             
             Make it feel personal and authentic, not templated.
             """
-            
-            if self.openai_client:
-                email = await self._call_openai(prompt)
-                if email and len(email) > 50:
-                    return email
-            
-            # Fallback template with dynamic content
-            return self._fallback_email_template(company_info, job_description, personal_story)
-                
-        except Exception as e:
-            logger.error(f"Error generating email draft: {str(e)}")
-            return self._fallback_email_template({}, job_description, personal_story)
     
-    async def _call_openai(self, prompt: str) -> str:
-        """Call OpenAI API with retry logic"""
+    async def stream_email_draft(self, job_description: str, resume_content: str,
+                                 personal_story: str = "") -> AsyncIterator[Dict[str, str]]:
+        """Stream an outreach email as events: ``token`` chunks, a ``fallback`` replacement on failure, then ``done``
+        
+        A ``fallback`` event carries the full template and replaces any tokens already sent.
+        """
+        company_info = self._extract_company_info(job_description)
+        prompt = await self._email_prompt(job_description, resume_content, personal_story)
+        key = self._cache_key(prompt)
+        
+        cached = await self.response_cache.lookup(key)
+        if cached is not None and len(cached) > 50:
+            yield {"event": "token", "text": cached}
+            yield {"event": "done", "source": "cache"}
+            return
+        
+        # Streaming is OpenAI-only; skip straight to the template while its circuit is open
+        if not self.openai_client or not self.router.available("openai"):
+            yield {"event": "fallback", "text": self._fallback_email_template(company_info, job_description, personal_story)}
+            yield {"event": "done", "source": "template"}
+            return
+        
+        parts = []
+        started = time.perf_counter()
         try:
-            response = await asyncio.to_thread(
-                openai.ChatCompletion.create,
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert career coach and resume advisor."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=600,
-                temperature=0.4
-            )
-            return response.choices[0].message.content.strip()
+            async for text in self._stream_openai(prompt):
+                parts.append(text)
+                yield {"event": "token", "text": text}
         except Exception as e:
-            logger.error(f"OpenAI API error: {str(e)}")
-            raise
-    
-    def _extract_keywords(self, text: str) -> set:
-        """Extract relevant keywords from text"""
-        import re
-        
-        # Common tech keywords and skills
-        tech_patterns = [
-            r'\b(?:Python|JavaScript|React|Node\.js|Java|C\+\+|SQL|AWS|Docker|Kubernetes)\b',
-            r'\b(?:machine learning|data science|frontend|backend|full[- ]?stack)\b',
-            r'\b(?:API|REST|GraphQL|microservices|DevOps|CI/CD)\b',
-            r'\b(?:agile|scrum|project management|leadership)\b',
-        ]
+            logger.error(f"Error streaming email draft: {str(e)}")
+            parts = []
         
-        keywords = set()
-        text_lower = text.lower()
+        email = "".join(parts).strip()
+        if len(email) > 50:
+            await self.response_cache.store(key, email, time.perf_counter() - started)
+            yield {"event": "done", "source": "llm"}
+        else:
+            yield {"event": "fallback", "text": self._fallback_email_template(company_info, job_description, personal_story)}
+            yield {"event": "done", "source": "template"}
+    
+    async def _stream_openai(self, prompt: str) -> AsyncIterator[str]:
+        """Yield completion text deltas as the provider streams them"""
+        estimated = self._estimate_call_tokens(prompt)
+        # The concurrency slot is held for the whole stream; streams aren't retried once tokens were sent
+        async with self.rate_limiter.limit(estimated):
+            stream = await self.openai_client.chat.completions.create(
+                model=self.model,
+                messages=self._messages(prompt),
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                stream=True
+            )
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(stream.__anext__(), self.stream_idle_timeout)
+                    except StopAsyncIteration:
+                        break
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        yield delta
+            finally:
+                # Also runs when the caller stops early (e.g. the client disconnected)
+                await stream.response.aclose()
+    
+    def _cache_key(self, prompt: str, max_tokens: Optional[int] = None, json_mode: bool = False) -> str:
+        params = {"max_tokens": max_tokens or self.max_tokens, "temperature": self.temperature}
+        if json_mode:
+            params["response_format"] = "json_object"
+        return self.response_cache.key(self.model, SYSTEM_PROMPT, prompt, params)
+    
+    async def _complete(self, prompt: str, max_tokens: Optional[int] = None, json_mode: bool = False) -> str:
+        """Call the LLM, serving byte-identical requests from the response cache"""
+        key = self._cache_key(prompt, max_tokens, json_mode)
+        cached = await self.response_cache.lookup(key)
+        if cached is not None:
+            return cached
         
-        for pattern in tech_patterns:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            keywords.update(matches)
+        async def fetch() -> str:
+            started = time.perf_counter()
+            response, provider = await self.router.route(
+                prompt, SYSTEM_PROMPT, max_tokens or self.max_tokens, self.temperature, json_mode=json_mode
+            )
+            # The key names self.model; a fallback provider's answer is served but not cached under it
+            if response and provider == "openai":
+                await self.response_cache.store(key, response, time.perf_counter() - started)
+            return response
         
-        return keywords
+        return await self.in_flight.run(key, fetch)
+    
+    def _messages(self, prompt: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _estimate_call_tokens(self, prompt: str, max_tokens: Optional[int] = None) -> int:
+        """Tokens to reserve for a call: the prompt plus the full completion allowance"""
+        return estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(prompt) + (max_tokens or self.max_tokens)
+    
+    def _create_router(self) -> ProviderRouter:
+        """OpenAI first, HuggingFace as the hedge/failover target, each behind a circuit breaker"""
+        providers = []
+        if self.openai_client:
+            providers.append(CallableProvider("openai", self._call_openai))
+        if self.huggingface_client:
+            providers.append(HuggingFaceProvider(
+                self.huggingface_client,
+                getattr(settings, 'HUGGINGFACE_MODEL', 'HuggingFaceH4/zephyr-7b-beta'),
+                base_url=getattr(settings, 'HUGGINGFACE_BASE_URL', 'https://api-inference.huggingface.co/models')
+            ))
+        breakers = {
+            provider.name: CircuitBreaker(
+                failure_threshold=getattr(settings, 'LLM_BREAKER_ERROR_RATE', 0.5),
+                slow_call_seconds=getattr(settings, 'LLM_BREAKER_SLOW_CALL_SECONDS', 10.0),
+                open_seconds=getattr(settings, 'LLM_BREAKER_OPEN_SECONDS', 30.0)
+            )
+            for provider in providers
+        }
+        return ProviderRouter(
+            providers,
+            breakers=breakers,
+            hedge=getattr(settings, 'LLM_HEDGE', True),
+            hedge_after=getattr(settings, 'LLM_HEDGE_AFTER_SECONDS', 3.0)
+        )
+    
+    async def _call_openai(self, prompt: str, max_tokens: Optional[int] = None, json_mode: bool = False) -> str:
+        """Call OpenAI API within the rate limits, retrying throttling and transient errors"""
+        estimated = self._estimate_call_tokens(prompt, max_tokens)
+        extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.rate_limiter.limit(estimated):
+                    response = await self.openai_client.chat.completions.create(
+                        model=self.model,
+                        messages=self._messages(prompt),
+                        max_tokens=max_tokens or self.max_tokens,
+                        temperature=self.temperature,
+                        **extra
+                    )
+                self.rate_limiter.record_usage(estimated, response.usage.total_tokens if response.usage else None)
+                return response.choices[0].message.content.strip()
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    logger.error(f"OpenAI API error after {attempt + 1} attempts: {str(e)}")
+                    raise
+                delay = self._retry_delay(e, attempt)
+                if isinstance(e, openai.RateLimitError):
+                    # The quota is shared, so every caller should back off, not just this one
+                    self.rate_limiter.pause(delay)
+                self.retries += 1
+                logger.warning(f"OpenAI call failed ({type(e).__name__}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                logger.error(f"OpenAI API error: {str(e)}")
+                raise
+    
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Seconds to wait before a retry: the provider's Retry-After if given, else jittered backoff"""
+        retry_after = self._retry_after(getattr(error, "response", None))
+        if retry_after is not None:
+            return min(retry_after, 60.0)
+        return min(2 ** attempt, 20) * (0.5 + random.random() / 2)
+    
+    @staticmethod
+    def _retry_after(response: Optional[httpx.Response]) -> Optional[float]:
+        if response is None:
+            return None
+        headers = response.headers
+        try:
+            if "retry-after-ms" in headers:
+                return float(headers["retry-after-ms"]) / 1000
+            if "retry-after" in headers:
+                value = headers["retry-after"]
+                try:
+                    return max(0.0, float(value))
+                except ValueError:
+                    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+        return None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Runtime counters for the ML service"""
+        return {
+            "initialized": self.initialized,
+            "model": self.model,
+            "response_cache": self.response_cache.stats(),
+            "in_flight": self.in_flight.stats(),
+            "rate_limiter": self.rate_limiter.stats(),
+            "prompt_budget": self.prompt_budgeter.stats(),
+            "gap_engine": self.gap_engine.stats(),
+            "providers": self.router.stats(),
+            "retries": self.retries
+        }
+    
+    async def close(self):
+        """Close provider clients and the response cache"""
+        # Closes the HuggingFace client through its provider
+        await self.router.close()
+        if self.http_client:
+            await self.http_client.aclose()
+        self.response_cache.close()
+    
+    def _extract_keywords(self, text: str) -> set:
+        """Extract relevant keywords from text"""
+        return set(skill_extractor.extract(text))
     
     def _extract_company_info(self, job_description: str) -> Dict[str, str]:
         """Extract company and role information"""
@@ -172,37 +509,32 @@ class MLService:
         
         return company_info
     
-    def _parse_suggestions(self, suggestions_text: str) -> List[str]:
-        """Parse AI-generated suggestions into clean list"""
-        lines = suggestions_text.split('\n')
+    def _parse_json_object(self, text: str) -> Dict[str, Any]:
+        """Parse a JSON object from a model response, tolerating code fences and stray prose"""
+        data = parse_json_object(text)
+        if data is None:
+            logger.warning("LLM response was not a JSON object")
+            return {}
+        return data
+    
+    def _validate_suggestions(self, value: Any) -> List[str]:
+        """Clean suggestions list, or [] when the field is missing or malformed"""
+        if not isinstance(value, list):
+            return []
         suggestions = []
-        
-        for line in lines:
-            line = line.strip()
+        for item in value:
+            if not isinstance(item, str):
+                continue
             # Remove numbering and bullet points
-            line = re.sub(r'^[\d\.\-\•\*]+\s*', '', line)
-            if line and len(line) > 10 and not line.startswith('#'):
-                suggestions.append(line)
-        
+            item = re.sub(r'^[\d\.\-\•\*]+\s*', '', item.strip())
+            if len(item) > 10 and item not in suggestions:
+                suggestions.append(item)
         return suggestions[:8]  # Limit to 8 suggestions
     
-    def _fallback_gap_analysis(self, resume_keywords: set, job_keywords: set) -> List[str]:
-        """Fallback gap analysis when AI is unavailable"""
-        missing_keywords = job_keywords - resume_keywords
-        
-        suggestions = [
-            "Add specific metrics and quantifiable achievements to demonstrate impact",
-            "Include more industry-specific keywords from the job description",
-            "Highlight relevant technical skills and technologies",
-            "Emphasize leadership and collaboration experiences",
-            "Add relevant certifications or professional development",
-            "Include specific project examples that match the role requirements"
-        ]
-        
-        if missing_keywords:
-            suggestions.insert(0, f"Consider adding these relevant skills: {', '.join(list(missing_keywords)[:3])}")
-        
-        return suggestions[:6]
+    def _validate_email(self, value: Any) -> Optional[str]:
+        if isinstance(value, str) and len(value.strip()) > 50:
+            return value.strip()
+        return None
     
     def _fallback_email_template(self, company_info: Dict, job_description: str, personal_story: str) -> str:
         """Fallback email template when AI is unavailable"""
@@ -226,5 +558,3 @@ Best regards,
 [Your Name]
 [Your Phone Number]
 [Your Email]"""
-
-import re
@@ -0,0 +1,140 @@
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.rate_limiter import estimate_tokens
+from app.services.skill_extractor import skill_extractor
+
+logger = logging.getLogger(__name__)
+
+# Sentence ends followed by what looks like the start of the next sentence
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?;])\s+(?=[A-Z0-9(])')
+_BULLET = re.compile(r'^\s*(?:[-*•●▪]|\d+[.)])\s*')
+
+# Units beyond this are ignored; keeps embedding cost bounded for pathological inputs
+MAX_UNITS = 256
+
+# Score weights: skills shared with the other document, the unit's own skill density
+# (keeps requirements the other side lacks), and semantic similarity to the other document
+OVERLAP_WEIGHT = 0.5
+DENSITY_WEIGHT = 0.2
+SIMILARITY_WEIGHT = 0.3
+
+# Units scoring below this (no shared skills, weak similarity) are boilerplate and never
+# packed, so over-budget texts usually shrink well below their budget
+MIN_RELEVANCE = 0.12
+
+class PromptUnit(NamedTuple):
+    position: int
+    text: str
+    tokens: int
+    skills: frozenset
+
+def split_units(text: str) -> List[PromptUnit]:
+    """Split text into bullet- and sentence-sized units, dropping blanks and repeats"""
+    units, seen = [], set()
+    for line in (text or "").splitlines():
+        line = _BULLET.sub("", line).strip()
+        for sentence in _SENTENCE_BREAK.split(line):
+            sentence = sentence.strip()
+            key = sentence.lower()
+            if len(sentence) < 3 or key in seen:
+                continue
+            seen.add(key)
+            units.append(PromptUnit(len(units), sentence, estimate_tokens(sentence) + 1,
+                                    frozenset(skill_extractor.extract(sentence))))
+            if len(units) >= MAX_UNITS:
+                return units
+    return units
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+def rank_units(units: Sequence[PromptUnit], reference_skills: frozenset,
+               similarities: Optional[np.ndarray] = None) -> np.ndarray:
+    """Relevance score per unit against the other document"""
+    overlap = np.array([len(unit.skills & reference_skills) for unit in units], dtype=np.float32)
+    density = np.array([min(1.0, len(unit.skills) / 3) for unit in units], dtype=np.float32)
+    scores = OVERLAP_WEIGHT * overlap / max(1, len(reference_skills)) + DENSITY_WEIGHT * density
+    if similarities is not None:
+        scores += SIMILARITY_WEIGHT * np.clip(similarities, 0.0, 1.0)
+    return scores
+
+def pack(units: Sequence[PromptUnit], scores: np.ndarray, budget_tokens: int) -> str:
+    """Best-scoring relevant units that fit ``budget_tokens``, in their original order"""
+    chosen, used = [], 0
+    for i in np.argsort(-scores, kind="stable"):
+        unit = units[i]
+        if scores[i] < MIN_RELEVANCE and chosen:
+            break
+        if used + unit.tokens <= budget_tokens:
+            chosen.append(unit)
+            used += unit.tokens
+    if not chosen and units:
+        # A single oversized unit: keep its head rather than sending nothing
+        best = units[int(np.argmax(scores))]
+        return best.text[:budget_tokens * 4]
+    return "\n".join(unit.text for unit in sorted(chosen, key=lambda unit: unit.position))
+
+class PromptBudgeter:
+    """Fit two documents into token budgets by keeping their most mutually relevant parts
+
+    Each text is split into sentences/bullets, scored by skill overlap with the
+    other document, skill density and (when an embedder is available)
+    similarity to the other document's mean unit embedding, then packed
+    greedily into its budget. Texts that already fit are returned unchanged.
+    """
+
+    def __init__(self, embed_many: Optional[Callable[[List[str]], Awaitable[Optional[np.ndarray]]]] = None):
+        self.embed_many = embed_many
+        self.tokens_in = 0
+        self.tokens_out = 0
+
+    async def fit(self, first: str, second: str, first_budget: int, second_budget: int) -> Tuple[str, str]:
+        """Compress ``first`` and ``second`` to their budgets; returns the packed pair"""
+        first, second = first or "", second or ""
+        first_tokens, second_tokens = estimate_tokens(first), estimate_tokens(second)
+        self.tokens_in += first_tokens + second_tokens
+        if first_tokens <= first_budget and second_tokens <= second_budget:
+            self.tokens_out += first_tokens + second_tokens
+            return first, second
+
+        first_units, second_units = split_units(first), split_units(second)
+        first_skills = frozenset().union(*(unit.skills for unit in first_units))
+        second_skills = frozenset().union(*(unit.skills for unit in second_units))
+
+        first_similarity = second_similarity = None
+        vectors = await self._embed([unit.text for unit in first_units + second_units])
+        if vectors is not None and first_units and second_units:
+            first_vectors, second_vectors = vectors[:len(first_units)], vectors[len(first_units):]
+            first_centroid = _normalize(first_vectors.mean(axis=0))
+            second_centroid = _normalize(second_vectors.mean(axis=0))
+            first_similarity = first_vectors @ second_centroid
+            second_similarity = second_vectors @ first_centroid
+
+        if first_tokens > first_budget:
+            first = pack(first_units, rank_units(first_units, second_skills, first_similarity), first_budget)
+        if second_tokens > second_budget:
+            second = pack(second_units, rank_units(second_units, first_skills, second_similarity), second_budget)
+        self.tokens_out += estimate_tokens(first) + estimate_tokens(second)
+        return first, second
+
+    async def _embed(self, texts: List[str]) -> Optional[np.ndarray]:
+        if not self.embed_many or not texts:
+            return None
+        try:
+            vectors = await self.embed_many(texts)
+        except Exception as e:
+            logger.warning(f"Prompt budgeting without embeddings: {str(e)}")
+            return None
+        return None if vectors is None else _normalize(np.asarray(vectors, dtype=np.float32))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tokens_in": self.tokens_in,
+            "tokens_out": self.tokens_out,
+            "saved_ratio": 1 - self.tokens_out / self.tokens_in if self.tokens_in else 0.0
+        }
@@ -0,0 +1,124 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (about four characters per token for English)"""
+    return max(1, len(text or "") // 4)
+
+class TokenBucket:
+    """Async token bucket refilled continuously at ``per_minute`` units per minute
+
+    ``acquire`` waits until enough units are available. ``adjust`` corrects a
+    reservation once the real cost is known; the balance may go negative, in
+    which case later callers wait the debt off.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Take ``amount`` units, waiting for the refill if needed; returns seconds waited"""
+        # Requests larger than the bucket could never fit; let them drain it completely instead
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        # The lock keeps callers FIFO so large requests aren't starved by small ones
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+    def adjust(self, delta: float):
+        """Charge (positive) or refund (negative) units after the fact"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+class LLMRateLimiter:
+    """Client-side limits for an LLM provider: concurrency, requests/min and tokens/min
+
+    Keeping below the provider's quotas avoids 429 storms; ``pause`` makes
+    every caller back off together when the provider asks for it anyway.
+    Bursts are capped at ``burst_seconds`` worth of quota, since providers
+    enforce per-minute limits over shorter intervals too.
+    """
+
+    def __init__(self, max_concurrency: int = 8, requests_per_minute: float = 500,
+                 tokens_per_minute: float = 90000, burst_seconds: float = 10.0):
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.requests = TokenBucket(requests_per_minute, capacity=max(1.0, requests_per_minute * burst_seconds / 60))
+        self.tokens = TokenBucket(tokens_per_minute, capacity=max(1.0, tokens_per_minute * burst_seconds / 60))
+        self._resume_at = 0.0
+        self.in_flight = 0
+        self.waiting = 0
+        self.calls = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self.pauses = 0
+
+    def pause(self, seconds: float):
+        """Hold back new calls for ``seconds`` (e.g. from a Retry-After header)"""
+        self.pauses += 1
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    @asynccontextmanager
+    async def limit(self, estimated_tokens: int):
+        """Hold a concurrency slot plus request and token budget for one call"""
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            pause = self._resume_at - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            await self.requests.acquire(1)
+            await self.tokens.acquire(estimated_tokens)
+
+            waited = time.monotonic() - started
+            if waited > 0.001:
+                self.throttled += 1
+                self.wait_seconds += waited
+            self.calls += 1
+            self.in_flight += 1
+            try:
+                yield self
+            finally:
+                self.in_flight -= 1
+        finally:
+            self._semaphore.release()
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Settle a call's token reservation against the usage the provider reported"""
+        if actual_tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "calls": self.calls,
+            "throttled": self.throttled,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "pauses": self.pauses,
+            "requests_available": round(self.requests.tokens, 1),
+            "tokens_available": round(self.tokens.tokens, 1)
+        }
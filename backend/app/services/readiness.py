@@ -0,0 +1,59 @@
+import time
+from typing import Any, Dict, Iterable, List
+
+PENDING = "pending"
+STARTING = "starting"
+READY = "ready"
+DEGRADED = "degraded"
+FAILED = "failed"
+
+# States in which a component can serve requests (degraded = working on a fallback)
+USABLE_STATES = {READY, DEGRADED}
+
+class ReadinessTracker:
+    """Per-component startup state shared by the warm-up task and request handlers"""
+
+    def __init__(self):
+        self._components: Dict[str, Dict[str, Any]] = {}
+        self.started_at = time.time()
+
+    def register(self, *names: str):
+        """Declare components that must warm up before the app is fully ready"""
+        for name in names:
+            self._components.setdefault(name, {"state": PENDING, "detail": None, "since": time.time()})
+
+    def mark(self, name: str, state: str, detail: str = None):
+        """Record a component's state transition"""
+        self._components[name] = {"state": state, "detail": detail, "since": time.time()}
+
+    def state(self, name: str) -> str:
+        return self._components.get(name, {}).get("state", PENDING)
+
+    def is_usable(self, name: str) -> bool:
+        return self.state(name) in USABLE_STATES
+
+    def not_ready(self, names: Iterable[str]) -> List[str]:
+        """Subset of ``names`` that can't serve requests yet"""
+        return [name for name in names if not self.is_usable(name)]
+
+    @property
+    def ready(self) -> bool:
+        return all(component["state"] in USABLE_STATES for component in self._components.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "ready": self.ready,
+            "uptime_seconds": round(now - self.started_at, 3),
+            "components": {
+                name: {
+                    "state": component["state"],
+                    "detail": component["detail"],
+                    "for_seconds": round(now - component["since"], 3)
+                }
+                for name, component in self._components.items()
+            }
+        }
+
+# Process-wide tracker; services report into it, /ready and request guards read it
+readiness = ReadinessTracker()
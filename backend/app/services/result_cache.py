@@ -0,0 +1,82 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.embedding_cache import normalize_text
+
+class SearchResultCache:
+    """TTL + LRU cache of search results, invalidated by per-user corpus versions
+
+    Keys include the user's corpus version at the time the search started.
+    Every write for a user bumps that version, so results computed against an
+    older corpus are unreachable immediately and simply age out of the LRU.
+    Writes whose owner isn't known bump a global epoch instead.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 300.0):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidations = 0
+
+    def version(self, user_id: int) -> Tuple[int, int]:
+        return self._epoch, self._versions.get(user_id, 0)
+
+    def invalidate_user(self, user_id: Optional[int] = None):
+        """Bump a user's corpus version (or the global epoch when the owner is unknown)"""
+        self.invalidations += 1
+        if user_id is None:
+            self._epoch += 1
+        else:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def key(self, user_id: int, job_description: str, limit: int, version: Tuple[int, int]) -> Tuple:
+        digest = hashlib.sha256(normalize_text(job_description).encode("utf-8")).hexdigest()
+        return user_id, digest, limit, version
+
+    def get(self, key: Tuple) -> Optional[List[Dict[str, Any]]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        stored_at, results = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self.expired += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        # Shallow copies so callers can re-score or annotate without corrupting the cache
+        return [dict(result) for result in results]
+
+    def put(self, key: Tuple, results: List[Dict[str, Any]]):
+        # A write may have landed while this search ran; don't cache against a stale version
+        user_id, _, _, version = key
+        if version != self.version(user_id):
+            return
+        self._entries[key] = (time.monotonic(), [dict(result) for result in results])
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
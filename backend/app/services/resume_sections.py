@@ -0,0 +1,83 @@
+import hashlib
+import re
+from typing import Dict, List, NamedTuple
+
+from app.services.embedding_cache import normalize_text
+
+# Section kind -> headings that open it
+SECTION_HEADINGS: Dict[str, tuple] = {
+    "summary": ("summary", "professional summary", "profile", "objective", "about", "about me"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history"),
+    "skills": ("skills", "technical skills", "core competencies", "technologies", "tools"),
+    "education": ("education", "academic background"),
+    "projects": ("projects", "personal projects", "selected projects"),
+    "certifications": ("certifications", "certificates", "licenses"),
+}
+
+# Sections whose blank-line separated blocks are independent entries (one job, one project)
+ENTRY_SECTIONS = {"experience", "projects"}
+
+# all-MiniLM-L6-v2 truncates at 256 word pieces; stay safely below it
+MAX_SECTION_WORDS = 150
+
+_HEADING_LOOKUP = {heading: kind for kind, headings in SECTION_HEADINGS.items() for heading in headings}
+_HEADING_CLEAN = re.compile(r'[^a-z ]+')
+_BLANK_LINES = re.compile(r'\n\s*\n')
+
+class ResumeSection(NamedTuple):
+    kind: str
+    text: str
+    hash: str
+
+def section_hash(text: str) -> str:
+    """Content hash identifying a section across edits"""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()[:32]
+
+def _heading_kind(line: str):
+    words = _HEADING_CLEAN.sub(" ", line.lower()).split()
+    if not words or len(words) > 4:
+        return None
+    return _HEADING_LOOKUP.get(" ".join(words))
+
+def _windows(text: str) -> List[str]:
+    """Split text into chunks that fit the encoder's token window"""
+    words = text.split()
+    if len(words) <= MAX_SECTION_WORDS:
+        return [text.strip()]
+    return [" ".join(words[i:i + MAX_SECTION_WORDS]) for i in range(0, len(words), MAX_SECTION_WORDS)]
+
+def split_sections(content: str) -> List[ResumeSection]:
+    """Split resume text into embeddable sections
+
+    Text before the first recognised heading is treated as the summary.
+    Experience and project sections are split into one section per entry,
+    and anything longer than the encoder window is chunked so no part of a
+    long resume is dropped.
+    """
+    blocks: List[tuple] = []
+    kind, lines = "summary", []
+    for line in (content or "").splitlines():
+        heading = _heading_kind(line)
+        if heading:
+            blocks.append((kind, "\n".join(lines)))
+            kind, lines = heading, []
+        else:
+            lines.append(line)
+    blocks.append((kind, "\n".join(lines)))
+
+    sections: List[ResumeSection] = []
+    seen = set()
+    for kind, text in blocks:
+        entries = _BLANK_LINES.split(text) if kind in ENTRY_SECTIONS else [text]
+        for entry in entries:
+            if not entry.strip():
+                continue
+            for chunk in _windows(entry):
+                digest = section_hash(chunk)
+                if digest in seen:
+                    continue
+                seen.add(digest)
+                sections.append(ResumeSection(kind, chunk, digest))
+
+    return sections
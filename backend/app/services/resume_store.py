@@ -0,0 +1,274 @@
+import asyncio
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Duplicate kinds reported by ingest
+SAME_USER = "same_user"
+OTHER_USER = "other_user"
+
+class ResumeStore:
+    """Content-addressed resume files with per-user references
+
+    Each distinct file is stored once under ``blobs/<sha[:2]>/<sha>.<format>``
+    and counted by the references users hold to it. Work derived from the
+    content (extracted text, keywords, section embeddings) is memoized on the
+    blob, so a file uploaded again by anyone skips all processing. Removing
+    a reference only decrements the count; ``collect_garbage`` deletes blobs
+    that have had no references for a grace period, which keeps a blob
+    released a moment before someone re-uploads it.
+    """
+
+    def __init__(self, root: str, db_path: Optional[str] = None):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.tmp_dir = os.path.join(root, "tmp")
+        self.db_path = db_path or os.path.join(root, "store.sqlite3")
+        self._lock = threading.Lock()
+        self.deduplicated = 0
+        self.collected = 0
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            "sha256 TEXT PRIMARY KEY, size INTEGER NOT NULL, file_format TEXT NOT NULL, "
+            "refcount INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, released_at REAL, "
+            "content_text TEXT, extraction TEXT, keywords TEXT, "
+            "embedding_model TEXT, section_vectors BLOB)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS refs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, "
+            "sha256 TEXT NOT NULL REFERENCES blobs (sha256), file_name TEXT NOT NULL, "
+            "index_id TEXT, created_at REAL NOT NULL, UNIQUE (user_id, sha256))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS blobs_released ON blobs (refcount, released_at)")
+        self._db.commit()
+
+    def temp_path(self, name: str) -> str:
+        """Scratch path for an upload in progress, on the same filesystem as the blobs"""
+        return os.path.join(self.tmp_dir, name)
+
+    def blob_path(self, sha256: str, file_format: str) -> str:
+        return os.path.join(self.blob_dir, sha256[:2], f"{sha256}.{file_format}")
+
+    # Blocking implementations; the async methods below run them off the event loop
+
+    def _ingest(self, temp_path: str, sha256: str, size: int, file_format: str,
+                user_id: str, file_name: str) -> Tuple[Dict[str, Any], Optional[str]]:
+        path = self.blob_path(sha256, file_format)
+        now = time.time()
+        with self._lock:
+            blob = self._db.execute("SELECT sha256 FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+            if blob is None:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(temp_path, path)
+                self._db.execute(
+                    "INSERT INTO blobs (sha256, size, file_format, created_at) VALUES (?, ?, ?, ?)",
+                    (sha256, size, file_format, now)
+                )
+            else:
+                os.remove(temp_path)
+
+            ref = self._db.execute(
+                "SELECT id FROM refs WHERE user_id = ? AND sha256 = ?", (user_id, sha256)
+            ).fetchone()
+            if ref is None:
+                self._db.execute(
+                    "INSERT INTO refs (user_id, sha256, file_name, created_at) VALUES (?, ?, ?, ?)",
+                    (user_id, sha256, file_name, now)
+                )
+                self._db.execute(
+                    "UPDATE blobs SET refcount = refcount + 1, released_at = NULL WHERE sha256 = ?", (sha256,)
+                )
+            self._db.commit()
+
+            duplicate = SAME_USER if ref is not None else OTHER_USER if blob is not None else None
+            if duplicate:
+                self.deduplicated += 1
+            return self._ref_row(user_id, sha256=sha256), duplicate
+
+    def _ref_row(self, user_id: str, ref_id: Optional[int] = None,
+                 sha256: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        column, value = ("refs.id", ref_id) if ref_id is not None else ("refs.sha256", sha256)
+        row = self._db.execute(
+            "SELECT refs.id, refs.user_id, refs.sha256, refs.file_name, refs.index_id, refs.created_at, "
+            "blobs.size, blobs.file_format FROM refs JOIN blobs ON blobs.sha256 = refs.sha256 "
+            f"WHERE refs.user_id = ? AND {column} = ?", (user_id, value)
+        ).fetchone()
+        if row is None:
+            return None
+        ref = dict(row)
+        ref["path"] = self.blob_path(ref["sha256"], ref["file_format"])
+        return ref
+
+    def _get_ref(self, user_id: str, ref_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._ref_row(user_id, ref_id=ref_id)
+
+    def _list_refs(self, user_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            ids = [row[0] for row in self._db.execute(
+                "SELECT id FROM refs WHERE user_id = ? ORDER BY created_at", (user_id,)
+            )]
+            return [self._ref_row(user_id, ref_id=ref_id) for ref_id in ids]
+
+    def _remove_ref(self, user_id: str, ref_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            ref = self._ref_row(user_id, ref_id=ref_id)
+            if ref is None:
+                return None
+            self._db.execute("DELETE FROM refs WHERE id = ?", (ref_id,))
+            self._db.execute(
+                "UPDATE blobs SET refcount = refcount - 1, "
+                "released_at = CASE WHEN refcount - 1 <= 0 THEN ? ELSE NULL END WHERE sha256 = ?",
+                (time.time(), ref["sha256"])
+            )
+            self._db.commit()
+            return ref
+
+    def _set_index_id(self, ref_id: int, index_id: Optional[str]):
+        with self._lock:
+            self._db.execute("UPDATE refs SET index_id = ? WHERE id = ?", (index_id, ref_id))
+            self._db.commit()
+
+    def _artifacts(self, sha256: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_text, extraction, keywords, embedding_model, section_vectors "
+                "FROM blobs WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+        if row is None:
+            return {}
+        vectors = None
+        if row["section_vectors"] is not None:
+            vectors = np.load(io.BytesIO(row["section_vectors"]), allow_pickle=False)
+        return {
+            "content_text": row["content_text"],
+            "extraction": json.loads(row["extraction"]) if row["extraction"] else None,
+            "keywords": json.loads(row["keywords"]) if row["keywords"] else None,
+            "embedding_model": row["embedding_model"],
+            "section_vectors": vectors
+        }
+
+    def _save_extraction(self, sha256: str, content_text: Optional[str], extraction: Dict[str, Any],
+                         keywords: Optional[List[str]]):
+        with self._lock:
+            self._db.execute(
+                "UPDATE blobs SET content_text = ?, extraction = ?, keywords = ? WHERE sha256 = ?",
+                (content_text, json.dumps(extraction), json.dumps(keywords) if keywords is not None else None,
+                 sha256)
+            )
+            self._db.commit()
+
+    def _save_section_vectors(self, sha256: str, model: str, vectors: np.ndarray):
+        buffer = io.BytesIO()
+        np.save(buffer, np.asarray(vectors, dtype=np.float32), allow_pickle=False)
+        with self._lock:
+            self._db.execute(
+                "UPDATE blobs SET embedding_model = ?, section_vectors = ? WHERE sha256 = ?",
+                (model, buffer.getvalue(), sha256)
+            )
+            self._db.commit()
+
+    def _collect_garbage(self, grace_seconds: float) -> Dict[str, int]:
+        cutoff = time.time() - grace_seconds
+        removed_blobs = removed_bytes = removed_temp = 0
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT sha256, size, file_format FROM blobs WHERE refcount <= 0 AND released_at < ?", (cutoff,)
+            ).fetchall()
+            for row in rows:
+                try:
+                    os.remove(self.blob_path(row["sha256"], row["file_format"]))
+                except FileNotFoundError:
+                    pass
+                self._db.execute("DELETE FROM blobs WHERE sha256 = ? AND refcount <= 0", (row["sha256"],))
+                removed_blobs += 1
+                removed_bytes += row["size"]
+            self._db.commit()
+            self.collected += removed_blobs
+
+        # Uploads abandoned mid-stream (crash, killed worker) leave their scratch files behind
+        for name in os.listdir(self.tmp_dir):
+            path = os.path.join(self.tmp_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed_temp += 1
+            except FileNotFoundError:
+                pass
+        return {"blobs": removed_blobs, "bytes": removed_bytes, "temp_files": removed_temp}
+
+    # Async API
+
+    async def ingest(self, temp_path: str, sha256: str, size: int, file_format: str,
+                     user_id: str, file_name: str) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Adopt a fully written upload; returns the user's reference and the duplicate kind, if any
+
+        ``temp_path`` is moved into the blob store, or deleted if the content
+        is already stored. Re-uploading a file the user already holds returns
+        their existing reference.
+        """
+        return await asyncio.to_thread(self._ingest, temp_path, sha256, size, file_format, user_id, file_name)
+
+    async def get_ref(self, user_id: str, ref_id: int) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get_ref, user_id, ref_id)
+
+    async def list_refs(self, user_id: str) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._list_refs, user_id)
+
+    async def remove_ref(self, user_id: str, ref_id: int) -> Optional[Dict[str, Any]]:
+        """Drop a user's reference; the blob waits for ``collect_garbage`` once nobody holds it"""
+        return await asyncio.to_thread(self._remove_ref, user_id, ref_id)
+
+    async def set_index_id(self, ref_id: int, index_id: Optional[str]):
+        """Remember the vector index entry created for a reference"""
+        await asyncio.to_thread(self._set_index_id, ref_id, index_id)
+
+    async def artifacts(self, sha256: str) -> Dict[str, Any]:
+        """Memoized text, extraction details, keywords and section vectors for a blob"""
+        return await asyncio.to_thread(self._artifacts, sha256)
+
+    async def save_extraction(self, sha256: str, content_text: Optional[str], extraction: Dict[str, Any],
+                              keywords: Optional[List[str]] = None):
+        await asyncio.to_thread(self._save_extraction, sha256, content_text, extraction, keywords)
+
+    async def save_section_vectors(self, sha256: str, model: str, vectors: np.ndarray):
+        await asyncio.to_thread(self._save_section_vectors, sha256, model, vectors)
+
+    async def collect_garbage(self, grace_seconds: float = 3600.0) -> Dict[str, int]:
+        """Delete blobs unreferenced for ``grace_seconds`` and stale scratch files"""
+        result = await asyncio.to_thread(self._collect_garbage, grace_seconds)
+        if result["blobs"] or result["temp_files"]:
+            logger.info(f"Resume store GC removed {result['blobs']} blobs ({result['bytes']} bytes) "
+                        f"and {result['temp_files']} scratch files")
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            blobs, stored_bytes = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+            refs = self._db.execute("SELECT COUNT(*) FROM refs").fetchone()[0]
+        return {
+            "blobs": blobs,
+            "bytes": stored_bytes,
+            "refs": refs,
+            "deduplicated": self.deduplicated,
+            "collected": self.collected
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,170 @@
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Canonical skill ID -> surface forms that should map to it
+SKILL_ALIASES: Dict[str, Tuple[str, ...]] = {
+    # Languages and frameworks
+    "python": ("python",),
+    "javascript": ("javascript",),
+    "typescript": ("typescript",),
+    "react": ("react", "react.js", "reactjs"),
+    "vue": ("vue", "vue.js", "vuejs"),
+    "angular": ("angular",),
+    "node.js": ("node.js", "nodejs"),
+    "java": ("java",),
+    "c++": ("c++",),
+    "c#": ("c#",),
+    "go": ("go", "golang"),
+    "rust": ("rust",),
+    "php": ("php",),
+    "ruby": ("ruby",),
+    "html": ("html",),
+    "css": ("css",),
+    "sass": ("sass",),
+    "bootstrap": ("bootstrap",),
+    "tailwind": ("tailwind",),
+    # Data stores
+    "sql": ("sql",),
+    "mysql": ("mysql",),
+    "postgresql": ("postgresql", "postgres"),
+    "mongodb": ("mongodb",),
+    "redis": ("redis",),
+    "elasticsearch": ("elasticsearch",),
+    # Cloud and tooling
+    "aws": ("aws",),
+    "azure": ("azure",),
+    "gcp": ("gcp", "google cloud"),
+    "docker": ("docker",),
+    "kubernetes": ("kubernetes", "k8s"),
+    "jenkins": ("jenkins",),
+    "git": ("git",),
+    "github": ("github",),
+    # Architecture
+    "rest": ("rest", "restful"),
+    "graphql": ("graphql",),
+    "api": ("api", "apis"),
+    "microservices": ("microservices",),
+    "serverless": ("serverless",),
+    "frontend": ("frontend", "front end", "front-end"),
+    "backend": ("backend", "back end", "back-end"),
+    "full stack": ("full stack", "full-stack", "fullstack"),
+    # Data and ML
+    "machine learning": ("machine learning", "ml"),
+    "ai": ("ai",),
+    "data science": ("data science",),
+    "analytics": ("analytics",),
+    # Process
+    "agile": ("agile",),
+    "scrum": ("scrum",),
+    "devops": ("devops",),
+    "ci/cd": ("ci/cd", "ci-cd", "cicd"),
+    "tdd": ("tdd",),
+    "testing": ("testing",),
+    # Soft skills
+    "leadership": ("leadership",),
+    "management": ("management",),
+    "communication": ("communication",),
+    "collaboration": ("collaboration",),
+    "problem solving": ("problem solving", "problem-solving"),
+    "analytical": ("analytical",),
+    "creative": ("creative",),
+    "innovative": ("innovative",),
+    "project management": ("project management",),
+    "team lead": ("team lead", "team leader"),
+    "mentoring": ("mentoring",),
+}
+
+# How to write a canonical skill in user-facing text; IDs not listed read fine as they are
+SKILL_DISPLAY_NAMES: Dict[str, str] = {
+    "python": "Python", "javascript": "JavaScript", "typescript": "TypeScript", "react": "React",
+    "vue": "Vue", "angular": "Angular", "node.js": "Node.js", "java": "Java", "c++": "C++", "c#": "C#",
+    "go": "Go", "rust": "Rust", "php": "PHP", "ruby": "Ruby", "html": "HTML", "css": "CSS",
+    "sass": "Sass", "bootstrap": "Bootstrap", "tailwind": "Tailwind",
+    "sql": "SQL", "mysql": "MySQL", "postgresql": "PostgreSQL", "mongodb": "MongoDB", "redis": "Redis",
+    "elasticsearch": "Elasticsearch",
+    "aws": "AWS", "azure": "Azure", "gcp": "GCP", "docker": "Docker", "kubernetes": "Kubernetes",
+    "jenkins": "Jenkins", "git": "Git", "github": "GitHub",
+    "rest": "REST", "graphql": "GraphQL", "api": "API",
+    "ai": "AI",
+    "agile": "Agile", "scrum": "Scrum", "devops": "DevOps", "ci/cd": "CI/CD", "tdd": "TDD",
+}
+
+def display_name(skill: str) -> str:
+    """Canonical skill ID as it should appear in prose (``aws`` -> ``AWS``)"""
+    return SKILL_DISPLAY_NAMES.get(skill, skill)
+
+class SkillMatch(NamedTuple):
+    skill: str
+    start: int
+    end: int
+
+# Word-ish tokens; keeps symbols that belong to skill names (c++, c#, node.js)
+_TOKEN = re.compile(r'[\w][\w+#.]*')
+_SEPARATORS = re.compile(r'[\s\-/]+')
+
+def _tokens_of(surface: str) -> Tuple[str, ...]:
+    return tuple(part.rstrip('.') for part in _SEPARATORS.split(surface.lower()) if part)
+
+class SkillExtractor:
+    """Single-pass skill extraction over a precompiled token trie
+
+    Every alias is stored as a token sequence keyed by its first token, so a
+    document is tokenized once and each token costs one dict lookup no matter
+    how large the vocabulary gets. Longer phrases are tried first, which makes
+    "project management" win over "management".
+    """
+
+    def __init__(self, aliases: Optional[Dict[str, Tuple[str, ...]]] = None):
+        aliases = aliases or SKILL_ALIASES
+        self.skills: List[str] = list(aliases)
+        trie: Dict[str, List[Tuple[Tuple[str, ...], str]]] = {}
+        for skill, forms in aliases.items():
+            for form in forms:
+                phrase = _tokens_of(form)
+                trie.setdefault(phrase[0], []).append((phrase, skill))
+        for candidates in trie.values():
+            candidates.sort(key=lambda item: len(item[0]), reverse=True)
+        self._trie = trie
+
+    def _match(self, tokens: List[str]):
+        """Yield (skill, first, last) token indices for every non-overlapping match"""
+        i = 0
+        while i < len(tokens):
+            candidates = self._trie.get(tokens[i])
+            if candidates:
+                for phrase, skill in candidates:
+                    n = len(phrase)
+                    if n == 1 or tuple(tokens[i:i + n]) == phrase:
+                        yield skill, i, i + n - 1
+                        i += n
+                        break
+                else:
+                    i += 1
+            else:
+                i += 1
+
+    def find(self, text: str) -> List[SkillMatch]:
+        """All skill occurrences with their character offsets"""
+        spans = []
+        for m in _TOKEN.finditer(text or ""):
+            token = m.group(0).rstrip('.')
+            spans.append((token.lower(), m.start(), m.start() + len(token)))
+
+        tokens = [span[0] for span in spans]
+        return [
+            SkillMatch(skill, spans[first][1], spans[last][2])
+            for skill, first, last in self._match(tokens)
+        ]
+
+    def extract(self, text: str, limit: Optional[int] = None) -> List[str]:
+        """Unique canonical skills in order of first appearance"""
+        tokens = [token.rstrip('.') for token in _TOKEN.findall((text or "").lower())]
+        seen = {}
+        for skill, _, _ in self._match(tokens):
+            seen.setdefault(skill, None)
+            if limit is not None and len(seen) >= limit:
+                break
+        return list(seen)
+
+# Shared instance; the trie is built once per process
+skill_extractor = SkillExtractor()
@@ -0,0 +1,94 @@
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.services.skill_extractor import SKILL_ALIASES
+
+if hasattr(np, "bitwise_count"):
+    _popcount = np.bitwise_count
+else:
+    _BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        counts = _BYTE_POPCOUNT[np.ascontiguousarray(words).view(np.uint8)]
+        return counts.reshape(words.shape + (8,)).sum(axis=-1)
+
+class SkillVocabulary:
+    """Fixed bit position per canonical skill, so skill sets become integer bitmasks
+
+    Positions follow the vocabulary order, so appending skills keeps existing
+    masks valid; reordering or removing skills requires re-ingesting masks.
+    """
+
+    def __init__(self, skills: Iterable[str]):
+        self.skills: List[str] = list(dict.fromkeys(skills))
+        self.positions: Dict[str, int] = {skill: i for i, skill in enumerate(self.skills)}
+        self.words = max(1, (len(self.skills) + 63) // 64)
+        self._width = self.words * 8
+        self._all = (1 << len(self.skills)) - 1
+
+    def mask(self, skills: Iterable[str]) -> int:
+        """Bitmask of the known skills in ``skills``"""
+        value = 0
+        for skill in skills:
+            position = self.positions.get(skill)
+            if position is not None:
+                value |= 1 << position
+        return value
+
+    def skills_of(self, mask: int) -> List[str]:
+        """Skills whose bits are set in ``mask``"""
+        return [skill for skill, position in self.positions.items() if mask >> position & 1]
+
+    def to_words(self, masks: Iterable[int]) -> np.ndarray:
+        """Pack masks into an (n, words) uint64 array
+
+        Each mask becomes a fixed-width little-endian byte string in C
+        (``int.to_bytes``) and the joined buffer is viewed as words, so there
+        is no per-word Python work. Bits past the vocabulary are dropped.
+        """
+        packed = b"".join((mask & self._all).to_bytes(self._width, "little") for mask in masks)
+        return np.frombuffer(packed, dtype="<u8").reshape(-1, self.words)
+
+    def skills_in(self, words: np.ndarray) -> List[List[str]]:
+        """Skills set in each row of an (n, words) array from ``to_words``"""
+        bits = np.unpackbits(np.ascontiguousarray(words, dtype="<u8").view(np.uint8), axis=-1, bitorder="little")
+        bits = bits.reshape(-1, self.words * 64)[:, :len(self.skills)]
+        return [[self.skills[i] for i in np.flatnonzero(row)] for row in bits]
+
+def encode_mask(mask: int) -> str:
+    """Serialize a mask for storage (hex keeps it exact beyond 64 bits)"""
+    return format(mask, "x")
+
+def decode_mask(value: Optional[str]) -> Optional[int]:
+    return int(value, 16) if value else None
+
+def rerank(results: List[Dict], job_mask: int, vocabulary: "SkillVocabulary",
+           vector_weight: float = 0.7, keyword_weight: float = 0.3) -> List[Dict]:
+    """Blend vector scores with skill overlap computed as a vectorized popcount
+
+    Each result needs ``score`` and ``skill_mask`` (an int). Sets ``score`` to
+    the blended value and ``keyword_matches`` to the shared skills.
+    """
+    if not results:
+        return results
+
+    job_words = vocabulary.to_words([job_mask])[0]
+    job_total = int(_popcount(job_words).sum())
+    candidate_words = vocabulary.to_words([result.get("skill_mask") or 0 for result in results])
+    shared = candidate_words & job_words
+    overlap = _popcount(shared).sum(axis=1)
+
+    keyword_scores = overlap / job_total if job_total else np.zeros(len(results))
+    vector_scores = np.fromiter((result["score"] for result in results), dtype=np.float64, count=len(results))
+    combined = vector_weight * vector_scores + keyword_weight * keyword_scores
+
+    matched = overlap > 0
+    matches = iter(vocabulary.skills_in(shared[matched]))
+    for result, score, has_match in zip(results, combined.tolist(), matched.tolist()):
+        result["score"] = score
+        result["keyword_matches"] = next(matches) if has_match else []
+    return results
+
+# Shared vocabulary over the canonical skills of the shared extractor
+skill_vocabulary = SkillVocabulary(SKILL_ALIASES)
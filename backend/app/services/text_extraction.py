@@ -0,0 +1,308 @@
+import asyncio
+import logging
+import os
+import re
+import shutil
+import signal
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows; memory limits are skipped there
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+PDF = "pdf"
+DOCX = "docx"
+DOC = "doc"
+
+# A page with fewer extracted characters than this has no usable text layer
+MIN_PAGE_CHARS = 20
+# Resumes are short; anything longer is cut off rather than parsed for minutes
+MAX_PAGES = 30
+MAX_TEXT_CHARS = 200_000
+
+_OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+# Printable runs in a legacy .doc: UTF-16LE text (how Word stores most body text) or 8-bit text
+_UTF16_RUN = re.compile(rb'(?:[\x20-\x7e\xa0-\xff\t\r\n]\x00){4,}')
+_BYTE_RUN = re.compile(rb'[\x20-\x7e\t\r\n]{8,}')
+_BLANK_RUNS = re.compile(r'[ \t]+')
+_MANY_NEWLINES = re.compile(r'\n{3,}')
+
+class ExtractionError(Exception):
+    """The document could not be turned into text"""
+
+class ExtractionTimeout(ExtractionError):
+    """The document took longer than its time limit"""
+
+class ExtractionMemoryError(ExtractionError):
+    """The document needed more memory than its limit"""
+
+class ExtractionWorkerLost(ExtractionError):
+    """The worker process died mid-extraction (killed by the OS, crashed, or its pool was reset)"""
+
+class UnsupportedDocument(ExtractionError):
+    """Not a PDF, DOCX or DOC file"""
+
+# Readers accept a PDF header anywhere in the first kilobyte
+SNIFF_BYTES = 1024
+
+def sniff_format(head: bytes, file_name: str = "") -> Optional[str]:
+    """Document format from its first bytes, falling back to the file extension if one is given"""
+    if b"%PDF-" in head[:SNIFF_BYTES]:
+        return PDF
+    if head.startswith(b"PK\x03\x04"):
+        return DOCX
+    if head.startswith(_OLE_MAGIC):
+        return DOC
+    extension = os.path.splitext(file_name)[1].lower().lstrip(".")
+    return extension if extension in (PDF, DOCX, DOC) else None
+
+def clean_text(text: str) -> str:
+    lines = [_BLANK_RUNS.sub(" ", line).strip() for line in text.replace("\r", "\n").split("\n")]
+    return _MANY_NEWLINES.sub("\n\n", "\n".join(lines)).strip()[:MAX_TEXT_CHARS]
+
+# ---------------------------------------------------------------------------
+# Worker side: everything below runs inside the process pool
+
+class _Deadline(BaseException):
+    """Raised by the alarm; a BaseException so parsers' broad ``except Exception`` can't swallow it"""
+
+def _on_alarm(signum, frame):
+    raise _Deadline()
+
+def _init_worker(max_memory_mb: int):
+    """Process pool initializer: cap the worker's address space and arm the timeout handler"""
+    signal.signal(signal.SIGALRM, _on_alarm)
+    if resource is not None and max_memory_mb:
+        limit = max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _ocr_image(data: bytes, deadline: float, languages: str) -> str:
+    """Run tesseract over one image; the subprocess inherits the worker's memory limit"""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise ExtractionTimeout("document exceeded its time limit during OCR")
+    try:
+        completed = subprocess.run(
+            ["tesseract", "stdin", "stdout", "-l", languages],
+            input=data, capture_output=True, timeout=remaining, check=False
+        )
+    except subprocess.TimeoutExpired:
+        raise ExtractionTimeout("document exceeded its time limit during OCR")
+    return completed.stdout.decode("utf-8", errors="ignore")
+
+def _extract_pdf(path: str, deadline: float, ocr: bool, languages: str) -> Dict[str, Any]:
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(path)
+    if reader.is_encrypted:
+        try:
+            reader.decrypt("")
+        except Exception:
+            raise ExtractionError("PDF is password protected")
+
+    texts, ocr_pages = [], 0
+    for page in reader.pages[:MAX_PAGES]:
+        text = page.extract_text() or ""
+        if len(text.strip()) < MIN_PAGE_CHARS and ocr:
+            # Scanned page: OCR the images drawn on it (Pillow, pulled in by sentence-transformers,
+            # decodes them); pages that do have a text layer never pay for this
+            try:
+                images = page.images
+            except Exception as e:
+                logger.warning(f"Could not read images on page {len(texts) + 1} of {path}: {str(e)}")
+                images = []
+            scanned = [_ocr_image(image.data, deadline, languages) for image in images]
+            if any(part.strip() for part in scanned):
+                text = "\n".join(scanned)
+                ocr_pages += 1
+        texts.append(text)
+    return {"text": "\n\n".join(texts), "pages": len(reader.pages), "ocr_pages": ocr_pages}
+
+def _extract_docx(path: str) -> Dict[str, Any]:
+    import docx
+
+    document = docx.Document(path)
+    parts = [paragraph.text for paragraph in document.paragraphs]
+    # Many resume templates lay out skills and dates in tables
+    for table in document.tables:
+        for row in table.rows:
+            cells = []
+            for cell in row.cells:
+                if cell.text not in cells:  # merged cells repeat their text
+                    cells.append(cell.text)
+            parts.append(" | ".join(cells))
+    return {"text": "\n".join(parts), "pages": None, "ocr_pages": 0}
+
+def _extract_doc(path: str, deadline: float) -> Dict[str, Any]:
+    """Legacy Word: antiword when installed, otherwise the printable runs of the file"""
+    if shutil.which("antiword"):
+        try:
+            completed = subprocess.run(["antiword", path], capture_output=True,
+                                       timeout=max(0.1, deadline - time.monotonic()), check=True)
+            return {"text": completed.stdout.decode("utf-8", errors="ignore"), "pages": None, "ocr_pages": 0}
+        except subprocess.TimeoutExpired:
+            raise ExtractionTimeout("document exceeded its time limit")
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"antiword failed on {path}, using raw text runs: {str(e)}")
+
+    with open(path, "rb") as f:
+        data = f.read()
+    runs = [run.decode("utf-16-le", errors="ignore") for run in _UTF16_RUN.findall(data)]
+    if sum(len(run) for run in runs) < MIN_PAGE_CHARS:
+        runs = [run.decode("latin-1") for run in _BYTE_RUN.findall(data)]
+    return {"text": "\n".join(runs), "pages": None, "ocr_pages": 0}
+
+def extract_document(path: str, file_format: str, timeout: float, ocr: bool = True,
+                     ocr_languages: str = "eng") -> Dict[str, Any]:
+    """Extract one document's text under a wall-clock limit; runs in a pool worker"""
+    started = time.monotonic()
+    deadline = started + timeout
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        if file_format == PDF:
+            result = _extract_pdf(path, deadline, ocr, ocr_languages)
+        elif file_format == DOCX:
+            result = _extract_docx(path)
+        elif file_format == DOC:
+            result = _extract_doc(path, deadline)
+        else:
+            raise UnsupportedDocument(f"unsupported document format: {file_format}")
+    except _Deadline:
+        raise ExtractionTimeout("document exceeded its time limit")
+    except MemoryError:
+        raise ExtractionMemoryError("document exceeded its memory limit")
+    except ExtractionError:
+        raise
+    except Exception as e:
+        # Parser exceptions may not pickle back to the parent; send the message only
+        raise ExtractionError(f"could not parse {file_format}: {type(e).__name__}: {str(e)}")
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+    result["text"] = clean_text(result["text"])
+    result["format"] = file_format
+    result["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+    return result
+
+# ---------------------------------------------------------------------------
+# Event loop side
+
+class TextExtractor:
+    """PDF/DOCX/DOC text extraction in a process pool
+
+    Parsing is CPU-bound and can be slow on hostile files, so it never runs on
+    the event loop. Each worker's address space is capped at ``max_memory_mb``
+    and each document gets ``timeout`` seconds; pages without a text layer are
+    OCRed with tesseract when it is installed. Workers are recycled after
+    ``max_tasks_per_child`` documents to return memory parsers leave behind,
+    and a pool broken by a crashed worker is replaced on the next call.
+
+    A dead worker breaks the whole ``ProcessPoolExecutor``, so one wedged
+    document (killed after its deadline) takes other in-flight documents down
+    with it; those are retried once on the replacement pool.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, timeout: float = 30.0, max_memory_mb: int = 512,
+                 ocr: bool = True, ocr_languages: str = "eng", max_tasks_per_child: int = 50):
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+        self.ocr = ocr and shutil.which("tesseract") is not None
+        if ocr and not self.ocr:
+            logger.warning("tesseract not found; scanned PDF pages will come back empty")
+        self.ocr_languages = ocr_languages
+        self.max_tasks_per_child = max_tasks_per_child
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.extracted = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.retried = 0
+        self.ocr_pages = 0
+        self.total_ms = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.max_memory_mb,),
+                max_tasks_per_child=self.max_tasks_per_child
+            )
+        return self._pool
+
+    def _reset_pool(self, pool: ProcessPoolExecutor):
+        """Drop a broken or wedged pool, killing its workers, unless it was already replaced"""
+        if pool is None or self._pool is not pool:
+            return
+        self._pool = None
+        # ProcessPoolExecutor can't cancel a running task; terminate the workers instead
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def extract(self, path: str, file_name: str = "") -> Dict[str, Any]:
+        """Text, page counts and timing for one document; raises ExtractionError"""
+        with open(path, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+        file_format = sniff_format(head, file_name or path)
+        if file_format is None:
+            self.failed += 1
+            raise UnsupportedDocument("only PDF, DOCX and DOC files are supported")
+
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            pool = self._get_pool()
+            try:
+                future = loop.run_in_executor(pool, extract_document, path, file_format,
+                                              self.timeout, self.ocr, self.ocr_languages)
+                # The worker enforces the limit itself; the grace period only catches a wedged worker
+                result = await asyncio.wait_for(future, self.timeout + 5.0)
+                break
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                self._reset_pool(pool)
+                raise ExtractionTimeout("document exceeded its time limit")
+            except BrokenProcessPool:
+                # Some worker died (OS kill, crash, or a wedged one we killed); this document
+                # may only have shared its pool, so it gets one more try on a fresh one
+                self._reset_pool(pool)
+                if attempt == 0:
+                    self.retried += 1
+                    continue
+                self.failed += 1
+                raise ExtractionWorkerLost("extraction worker died (killed by the OS, e.g. out of memory, or crashed)")
+            except ExtractionTimeout:
+                self.timeouts += 1
+                raise
+            except ExtractionError:
+                self.failed += 1
+                raise
+
+        self.extracted += 1
+        self.ocr_pages += result["ocr_pages"]
+        self.total_ms += result["elapsed_ms"]
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.max_workers,
+            "ocr": self.ocr,
+            "extracted": self.extracted,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "retried": self.retried,
+            "ocr_pages": self.ocr_pages,
+            "mean_ms": round(self.total_ms / self.extracted, 1) if self.extracted else 0.0
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,135 @@
+import hashlib
+import logging
+import uuid
+from typing import Iterable, NamedTuple, Optional
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+from starlette.responses import JSONResponse
+
+from app.services.text_extraction import SNIFF_BYTES, sniff_format
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_CHUNK_BYTES = 64 * 1024
+# Room for multipart boundaries and the other form fields on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+class UploadTooLarge(Exception):
+    """The upload is bigger than the configured limit"""
+
+class UnsupportedUpload(Exception):
+    """The upload's content is not a supported document type"""
+
+def format_size(size: int) -> str:
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):g} MB"
+    return f"{size / 1024:g} KB"
+
+class StoredUpload(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+    file_format: str
+
+async def save_upload(upload: UploadFile, path: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                      chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+                      allowed_formats: Optional[Iterable[str]] = None) -> StoredUpload:
+    """Stream an upload to ``path`` in fixed-size chunks, hashing and sniffing it on the way
+
+    The type is sniffed from the content alone (the file name is not trusted)
+    and checked on the first chunk and the size after every chunk, so a
+    bad or oversized upload stops early; memory use is one chunk whatever the
+    file size. Data goes to a temporary name and only replaces ``path`` once
+    it is complete.
+    """
+    partial = f"{path}.{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+    file_format = None
+    try:
+        async with aiofiles.open(partial, "wb") as out:
+            while True:
+                chunk = await upload.read(chunk_bytes)
+                if not chunk:
+                    break
+                if file_format is None:
+                    file_format = sniff_format(chunk[:SNIFF_BYTES])
+                    if file_format is None or (allowed_formats and file_format not in allowed_formats):
+                        raise UnsupportedUpload("Only PDF, DOCX and DOC files are supported")
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"File exceeds the {format_size(max_bytes)} upload limit")
+                digest.update(chunk)
+                await out.write(chunk)
+        if file_format is None:
+            raise UnsupportedUpload("Uploaded file is empty")
+        await aiofiles.os.replace(partial, path)
+    except BaseException:
+        try:
+            await aiofiles.os.remove(partial)
+        except OSError:
+            pass
+        raise
+    return StoredUpload(path, size, digest.hexdigest(), file_format)
+
+class UploadSizeLimit:
+    """ASGI middleware rejecting oversized request bodies on upload paths before they are parsed
+
+    Starlette spools the whole multipart body before the endpoint runs, so the
+    endpoint's own limit would only apply after the upload had been received.
+    A declared Content-Length over the limit gets a 413 straight away; a
+    chunked body is counted as it arrives and cut off once it crosses it.
+    """
+
+    def __init__(self, app, max_bytes: int = DEFAULT_MAX_BYTES, path_suffixes: Iterable[str] = ("/upload",)):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.max_body = max_bytes + MULTIPART_OVERHEAD
+        self.path_suffixes = tuple(path_suffixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].rstrip("/").endswith(self.path_suffixes):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        declared = headers.get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > self.max_body:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        too_large = False
+
+        async def limited_receive():
+            nonlocal received, too_large
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body:
+                    too_large = True
+                    raise UploadTooLarge("Request body exceeds the upload limit")
+            return message
+
+        async def guarded_send(message):
+            # Body parsing errors become a 400 inside FastAPI; answer with the 413 instead
+            if not too_large:
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except UploadTooLarge:
+            pass
+        if too_large:
+            logger.warning(f"Rejected upload to {scope['path']}: body over {self.max_body} bytes")
+            await self._reject(scope, receive, send)
+
+    async def _reject(self, scope, receive, send):
+        response = JSONResponse(
+            {"detail": f"File exceeds the {format_size(self.max_bytes)} upload limit"},
+            status_code=413, headers={"Connection": "close"}
+        )
+        await response(scope, receive, send)
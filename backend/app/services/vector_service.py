@@ -1,10 +1,20 @@
-import weaviate
-from sentence_transformers import SentenceTransformer
+import asyncio
+import numpy as np
+import os
 import uuid
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, AsyncIterator, Iterable, Optional, Tuple
 from app.core.config import settings
-import time
+from app.services.embedding_engine import EmbeddingEngine
+from app.services.embedding_cache import EmbeddingCache
+from app.services.encoders import create_encoder
+from app.services.local_index import LocalVectorIndex
+from app.services.readiness import readiness, STARTING, READY, DEGRADED, FAILED
+from app.services.result_cache import SearchResultCache
+from app.services.resume_sections import ResumeSection, section_hash, split_sections
+from app.services.skill_extractor import skill_extractor
+from app.services.skill_index import decode_mask, encode_mask, rerank, skill_vocabulary
+from app.services.weaviate_index import WeaviateIndex
 
 logger = logging.getLogger(__name__)
 
@@ -12,113 +22,177 @@ class VectorService:
     """Enhanced vector database service with better matching algorithms"""
     
     def __init__(self):
-        self.client = None
+        self.index = None
         self.encoder = None
+        self.embedder = None
+        self.model_name = 'all-MiniLM-L6-v2'
+        self.encoder_backend = getattr(settings, 'ENCODER_BACKEND', 'torch')
+        self.embedding_cache = EmbeddingCache(
+            # Backends agree only within a tolerance, so they don't share cached vectors
+            f"{self.model_name}:{self.encoder_backend}",
+            max_entries=getattr(settings, 'EMBEDDING_CACHE_SIZE', 10000),
+            disk_dir=getattr(settings, 'EMBEDDING_CACHE_DIR', None)
+        )
         self.class_name = "Resume"
+        self.result_cache = SearchResultCache(
+            max_entries=getattr(settings, 'SEARCH_CACHE_SIZE', 2048),
+            ttl_seconds=getattr(settings, 'SEARCH_CACHE_TTL_SECONDS', 300)
+        )
+        self.vector_weight = getattr(settings, 'SEARCH_VECTOR_WEIGHT', 0.7)
+        self.keyword_weight = getattr(settings, 'SEARCH_KEYWORD_WEIGHT', 0.3)
         self.initialized = False
     
     async def initialize(self):
-        """Initialize Weaviate client and sentence transformer with retry logic"""
+        """Load the sentence transformer and connect the configured vector index with async backoff"""
         max_retries = 3
-        retry_delay = 5
+        retry_delay = 1
+        backend = getattr(settings, 'VECTOR_BACKEND', 'auto')
         
         for attempt in range(max_retries):
             try:
-                # Initialize Weaviate client
-                self.client = weaviate.Client(
-                    url=settings.VECTOR_DB_URL,
-                    timeout_config=(5, 30)
-                )
+                # Initialize sentence transformer without blocking the event loop
+                if self.encoder is None:
+                    readiness.mark("encoder", STARTING)
+                    self.encoder = await asyncio.to_thread(
+                        create_encoder,
+                        self.encoder_backend,
+                        self.model_name,
+                        getattr(settings, 'ENCODER_THREADS', None)
+                    )
+                    logger.info("Sentence transformer loaded")
+                    
+                    # Batch concurrent encode requests off the event loop
+                    self.embedder = EmbeddingEngine(
+                        self.encoder,
+                        max_batch_size=getattr(settings, 'EMBEDDING_BATCH_SIZE', 32),
+                        max_wait_ms=getattr(settings, 'EMBEDDING_MAX_WAIT_MS', 5.0)
+                    )
+                    readiness.mark("encoder", READY, f"{self.model_name} ({self.encoder_backend})")
                 
-                # Test connection
-                if self.client.is_ready():
-                    logger.info("Weaviate connection established")
-                else:
-                    raise Exception("Weaviate not ready")
-                
-                # Initialize sentence transformer
-                self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
-                logger.info("Sentence transformer loaded")
-                
-                # Create schema if needed
-                await self._create_schema()
+                readiness.mark("weaviate", STARTING)
+                index = self._create_local_index() if backend == 'local' else self._create_weaviate_index()
+                try:
+                    await index.initialize()
+                except Exception:
+                    # Release the failed attempt's connection pool and worker threads
+                    await index.close()
+                    raise
+                self.index = index
                 
                 self.initialized = True
-                logger.info("Vector service initialized successfully")
+                if backend == 'local':
+                    readiness.mark("weaviate", DEGRADED, "disabled; using local vector index")
+                else:
+                    readiness.mark("weaviate", READY, settings.VECTOR_DB_URL)
+                logger.info(f"Vector service initialized successfully ({type(index).__name__})")
                 return
                 
             except Exception as e:
                 logger.error(f"Vector service initialization attempt {attempt + 1} failed: {str(e)}")
+                if self.encoder is None:
+                    readiness.mark("encoder", FAILED, str(e))
+                else:
+                    readiness.mark("weaviate", FAILED, str(e))
                 if attempt < max_retries - 1:
-                    logger.info(f"Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
+                    delay = retry_delay * (2 ** attempt)
+                    logger.info(f"Retrying in {delay} seconds...")
+                    await asyncio.sleep(delay)
                 else:
                     logger.error("Failed to initialize vector service after all retries")
                     self.initialized = False
-                    # Don't raise here - allow system to work without vector search
+        
+        # Keep matching alive without Weaviate when the encoder itself is usable
+        if backend == 'auto' and self.encoder is not None:
+            try:
+                index = self._create_local_index()
+                await index.initialize()
+                self.index = index
+                self.initialized = True
+                readiness.mark("weaviate", DEGRADED, "unreachable; using local vector index")
+                logger.warning("Weaviate unavailable, using local vector index")
+            except Exception as e:
+                logger.error(f"Local vector index fallback failed: {str(e)}")
+                # Don't raise here - allow system to work without vector search
+    
+    def _create_weaviate_index(self) -> WeaviateIndex:
+        """Build the Weaviate index with its bounded executor and session pool from settings"""
+        return WeaviateIndex(
+            settings.VECTOR_DB_URL,
+            class_name=self.class_name,
+            max_workers=getattr(settings, 'WEAVIATE_MAX_WORKERS', 8),
+            max_queue=getattr(settings, 'WEAVIATE_MAX_QUEUE', 64),
+            call_timeout=getattr(settings, 'WEAVIATE_CALL_TIMEOUT', 10.0),
+            import_timeout=getattr(settings, 'WEAVIATE_IMPORT_TIMEOUT', None)
+        )
+    
+    def _create_local_index(self) -> LocalVectorIndex:
+        """Build the in-process index from settings"""
+        return LocalVectorIndex(
+            getattr(settings, 'LOCAL_INDEX_DIR', os.path.join(os.getcwd(), "data", "vector_index")),
+            dimension=self.encoder.get_sentence_embedding_dimension(),
+            storage=getattr(settings, 'EMBEDDING_STORAGE', 'float32'),
+            rescore=getattr(settings, 'EMBEDDING_RESCORE', True)
+        )
+    
+    async def _embed(self, text: str):
+        """Embed text, serving repeats from the embedding cache"""
+        key = self.embedding_cache.key(text)
+        embedding = await self.embedding_cache.lookup(key)
+        if embedding is None:
+            embedding = await self.embedder.encode(text)
+            await self.embedding_cache.store(key, embedding)
+        return embedding
+    
+    async def _embed_many(self, texts: List[str]) -> np.ndarray:
+        """Embed several texts as one batch, serving repeats from the embedding cache"""
+        keys = [self.embedding_cache.key(text) for text in texts]
+        embeddings = [await self.embedding_cache.lookup(key) for key in keys]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            fresh = await self.embedder.encode_many([texts[i] for i in missing])
+            for i, embedding in zip(missing, fresh):
+                embeddings[i] = embedding
+                await self.embedding_cache.store(keys[i], embedding)
+        return np.stack(embeddings)
     
-    async def _create_schema(self):
-        """Create Weaviate schema for resumes with enhanced properties"""
-        schema = {
-            "class": self.class_name,
-            "description": "Resume documents with semantic embeddings",
-            "vectorIndexType": "hnsw",
-            "vectorIndexConfig": {
-                "distance": "cosine",
-                "efConstruction": 128,
-                "maxConnections": 64
-            },
-            "properties": [
-                {
-                    "name": "content",
-                    "dataType": ["text"],
-                    "description": "Full resume text content",
-                    "indexSearchable": True
-                },
-                {
-                    "name": "userId",
-                    "dataType": ["int"],
-                    "description": "User ID who owns this resume"
-                },
-                {
-                    "name": "fileName",
-                    "dataType": ["string"],
-                    "description": "Original filename"
-                },
-                {
-                    "name": "filePath",
-                    "dataType": ["string"],
-                    "description": "File storage path"
-                },
-                {
-                    "name": "keywords",
-                    "dataType": ["string[]"],
-                    "description": "Extracted keywords and skills"
-                },
-                {
-                    "name": "createdAt",
-                    "dataType": ["date"],
-                    "description": "Creation timestamp"
-                }
-            ],
-            "vectorizer": "none"
+    async def embed_texts(self, texts: List[str]) -> Optional[np.ndarray]:
+        """Embed texts for other services; None while the encoder isn't loaded"""
+        if self.embedder is None:
+            return None
+        return await self._embed_many(texts)
+    
+    def _split_sections(self, content: str) -> List[ResumeSection]:
+        """Resume sections, or the whole text as one section when nothing splits out"""
+        return split_sections(content) or [ResumeSection("summary", content, section_hash(content))]
+    
+    @staticmethod
+    def _document_vector(section_vectors: np.ndarray) -> np.ndarray:
+        """Whole-resume vector as the normalized mean of its section vectors"""
+        mean = np.asarray(section_vectors, dtype=np.float32).mean(axis=0)
+        norm = np.linalg.norm(mean)
+        return mean / norm if norm > 0 else mean
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Runtime counters for the vector service"""
+        return {
+            "initialized": self.initialized,
+            "index": type(self.index).__name__ if self.index else None,
+            "index_stats": self.index.stats() if hasattr(self.index, "stats") else None,
+            "embedding_cache": self.embedding_cache.stats(),
+            "result_cache": self.result_cache.stats()
         }
-        
-        try:
-            existing_schema = self.client.schema.get()
-            class_exists = any(cls["class"] == self.class_name for cls in existing_schema.get("classes", []))
-            
-            if not class_exists:
-                self.client.schema.create_class(schema)
-                logger.info(f"Created Weaviate schema for class {self.class_name}")
-            else:
-                logger.info(f"Schema for class {self.class_name} already exists")
-                
-        except Exception as e:
-            logger.error(f"Error creating/checking schema: {str(e)}")
     
-    async def store_resume(self, content: str, metadata: Dict[str, Any]) -> str:
-        """Store resume with enhanced metadata and error handling"""
+    async def embed_resume_sections(self, content: str) -> np.ndarray:
+        """Section vectors of a resume, in ``_split_sections`` order"""
+        return await self._embed_many([section.text for section in self._split_sections(content)])
+    
+    async def store_resume(self, content: str, metadata: Dict[str, Any],
+                           section_vectors: Optional[np.ndarray] = None) -> str:
+        """Store resume with enhanced metadata and error handling
+        
+        ``section_vectors`` from ``embed_resume_sections`` (e.g. memoized for
+        identical content) skip the encoder.
+        """
         if not self.initialized:
             logger.warning("Vector service not initialized, skipping vector storage")
             return str(uuid.uuid4())  # Return a fake ID for now
@@ -127,29 +201,27 @@ class VectorService:
             # Extract keywords for better searchability
             keywords = self._extract_keywords(content)
             
-            # Generate embedding
-            embedding = self.encoder.encode(content).tolist()
+            # Embed each section so nothing past the encoder window is dropped
+            sections = self._split_sections(content)
+            if section_vectors is None or len(section_vectors) != len(sections):
+                section_vectors = await self._embed_many([section.text for section in sections])
+            embedding = self._document_vector(section_vectors)
             
             # Create unique ID
             resume_id = str(uuid.uuid4())
             
             # Prepare data object with enhanced metadata
-            data_object = {
-                "content": content,
-                "userId": metadata["user_id"],
-                "fileName": metadata["file_name"],
-                "filePath": metadata["file_path"],
-                "keywords": keywords,
-                "createdAt": "2024-01-01T00:00:00Z"
-            }
+            data_object = self._build_data_object(content, metadata, keywords)
             
-            # Store in Weaviate
-            self.client.data_object.create(
-                data_object=data_object,
-                class_name=self.class_name,
-                uuid=resume_id,
-                vector=embedding
-            )
+            # Store in the active vector index
+            try:
+                await self.index.store(resume_id, embedding, data_object)
+                await self.index.store_sections([
+                    (resume_id, metadata["user_id"], section.hash, section.kind, vector)
+                    for section, vector in zip(sections, section_vectors)
+                ])
+            finally:
+                self.result_cache.invalidate_user(metadata["user_id"])
             
             logger.info(f"Successfully stored resume with ID: {resume_id}")
             return resume_id
@@ -159,147 +231,334 @@ class VectorService:
             # Return a fallback ID so the system doesn't crash
             return str(uuid.uuid4())
     
+    async def update_resume(self, resume_id: str, content: str, metadata: Dict[str, Any]) -> Dict[str, int]:
+        """Re-index an edited resume, re-encoding only sections whose content changed"""
+        if not self.initialized:
+            logger.warning("Vector service not initialized, skipping vector update")
+            return {"reencoded": 0, "reused": 0, "removed": 0}
+        
+        existing = (await self.index.get_sections([resume_id])).get(resume_id)
+        known = dict(zip(existing["hashes"], existing["vectors"])) if existing else {}
+        
+        sections = self._split_sections(content)
+        changed = [section for section in sections if section.hash not in known]
+        if changed:
+            fresh = await self._embed_many([section.text for section in changed])
+            known.update({section.hash: vector for section, vector in zip(changed, fresh)})
+        
+        current_hashes = {section.hash for section in sections}
+        stale = [digest for digest in (existing["hashes"] if existing else []) if digest not in current_hashes]
+        
+        embedding = self._document_vector(np.stack([known[section.hash] for section in sections]))
+        data_object = self._build_data_object(content, metadata, self._extract_keywords(content))
+        try:
+            await self.index.store(resume_id, embedding, data_object)
+            if stale:
+                await self.index.delete_sections(resume_id, stale)
+            if changed:
+                await self.index.store_sections([
+                    (resume_id, metadata["user_id"], section.hash, section.kind, known[section.hash])
+                    for section in changed
+                ])
+        finally:
+            self.result_cache.invalidate_user(metadata["user_id"])
+        
+        logger.info(f"Updated resume {resume_id}: {len(changed)} sections re-encoded, {len(stale)} removed")
+        return {"reencoded": len(changed), "reused": len(sections) - len(changed), "removed": len(stale)}
+    
+    def _build_data_object(self, content: str, metadata: Dict[str, Any], keywords: List[str]) -> Dict[str, Any]:
+        """Index properties for one resume"""
+        return {
+            "content": content,
+            "userId": metadata["user_id"],
+            "fileName": metadata["file_name"],
+            "filePath": metadata["file_path"],
+            "keywords": keywords,
+            "skillMask": encode_mask(skill_vocabulary.mask(keywords)),
+            "createdAt": "2024-01-01T00:00:00Z"
+        }
+    
+    async def bulk_store_resumes(
+        self,
+        resumes: Iterable[Dict[str, Any]],
+        encode_batch_size: int = 256,
+        import_batch_size: int = 100,
+        num_workers: int = 2
+    ) -> Dict[str, Any]:
+        """Encode and import many resumes in batches, collecting per-item failures
+        
+        Each item needs ``content``, ``user_id``, ``file_name`` and ``file_path``;
+        an optional ``id`` is used as the object UUID.
+        """
+        report = {"stored": [], "failed": []}
+        if not self.initialized:
+            logger.warning("Vector service not initialized, skipping bulk import")
+            return report
+        
+        chunk: List[Tuple[int, Dict[str, Any]]] = []
+        for position, item in enumerate(resumes):
+            chunk.append((position, item))
+            if len(chunk) >= encode_batch_size:
+                await self._bulk_store_chunk(chunk, import_batch_size, num_workers, report)
+                chunk = []
+        if chunk:
+            await self._bulk_store_chunk(chunk, import_batch_size, num_workers, report)
+        
+        logger.info(f"Bulk import finished: {len(report['stored'])} stored, {len(report['failed'])} failed")
+        return report
+    
+    async def _bulk_store_chunk(self, chunk, import_batch_size: int, num_workers: int, report: Dict[str, Any]):
+        """Encode one chunk as a single batch and hand it to the index importer"""
+        prepared = []
+        for position, item in chunk:
+            try:
+                content = item["content"]
+                if not content:
+                    raise ValueError("empty content")
+                resume_id = str(item.get("id") or uuid.uuid4())
+                data_object = self._build_data_object(content, item, self._extract_keywords(content))
+                prepared.append((position, resume_id, data_object, self._split_sections(content)))
+            except Exception as e:
+                report["failed"].append({"position": position, "id": item.get("id"), "error": f"invalid item: {str(e)}"})
+        
+        if not prepared:
+            return
+        
+        # All sections of the chunk go through the encoder as one batch
+        section_texts = [section.text for *_, sections in prepared for section in sections]
+        try:
+            section_vectors = await self.embedder.encode_many(section_texts)
+        except Exception as e:
+            logger.error(f"Bulk encode of {len(prepared)} resumes failed: {str(e)}")
+            for position, resume_id, _, _ in prepared:
+                report["failed"].append({"position": position, "id": resume_id, "error": f"encode failed: {str(e)}"})
+            return
+        
+        objects = []
+        section_entries = []
+        offset = 0
+        for _, resume_id, data_object, sections in prepared:
+            vectors = section_vectors[offset:offset + len(sections)]
+            offset += len(sections)
+            objects.append((resume_id, self._document_vector(vectors), data_object))
+            section_entries.extend(
+                (resume_id, data_object["userId"], section.hash, section.kind, vector)
+                for section, vector in zip(sections, vectors)
+            )
+        
+        try:
+            errors = await self.index.store_many(objects, batch_size=import_batch_size, num_workers=num_workers)
+            stored_ids = {resume_id for resume_id, _, _ in objects if resume_id not in errors}
+            section_errors = await self.index.store_sections(
+                [entry for entry in section_entries if entry[0] in stored_ids]
+            )
+            errors.update({resume_id: f"sections: {error}" for resume_id, error in section_errors.items()})
+        except Exception as e:
+            logger.error(f"Bulk import of {len(objects)} resumes failed: {str(e)}")
+            errors = {resume_id: str(e) for _, resume_id, _, _ in prepared}
+        
+        for user_id in {data_object["userId"] for _, _, data_object in objects}:
+            self.result_cache.invalidate_user(user_id)
+        
+        for position, resume_id, _, _ in prepared:
+            if resume_id in errors:
+                report["failed"].append({"position": position, "id": resume_id, "error": errors[resume_id]})
+            else:
+                report["stored"].append(resume_id)
+    
     async def search_resumes(self, job_description: str, user_id: int, limit: int = 5) -> List[Dict[str, Any]]:
         """Enhanced resume search with multiple strategies"""
         if not self.initialized:
             logger.warning("Vector service not initialized, returning empty results")
             return []
         
+        # Version captured before searching so a concurrent write can't be cached over
+        cache_key = self.result_cache.key(user_id, job_description, limit, self.result_cache.version(user_id))
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             # Generate embedding for job description
-            query_embedding = self.encoder.encode(job_description).tolist()
+            query_embedding = await self._embed(job_description)
             
             # Perform hybrid search (vector + keyword)
             vector_results = await self._vector_search(query_embedding, user_id, limit)
             
+            # Score each candidate by its best-matching section
+            await self._score_by_sections(query_embedding, vector_results)
+            
             # Add keyword-based scoring boost
             enhanced_results = self._enhance_with_keyword_matching(vector_results, job_description)
             
             # Sort by combined score
             enhanced_results.sort(key=lambda x: x["score"], reverse=True)
             
+            self.result_cache.put(cache_key, enhanced_results[:limit])
             return enhanced_results[:limit]
             
         except Exception as e:
+            # Re-raised so callers can tell a failed search from a user with no resumes
             logger.error(f"Error searching resumes: {str(e)}")
-            return []
+            raise
     
-    async def _vector_search(self, query_embedding: List[float], user_id: int, limit: int) -> List[Dict[str, Any]]:
-        """Perform vector similarity search"""
-        try:
-            result = (
-                self.client.query
-                .get(self.class_name, ["content", "userId", "fileName", "filePath", "keywords"])
-                .with_near_vector({"vector": query_embedding})
-                .with_where({
-                    "path": ["userId"],
-                    "operator": "Equal",
-                    "valueInt": user_id
-                })
-                .with_additional(["distance", "id"])
-                .with_limit(limit * 2)  # Get more results for reranking
-                .do()
-            )
-            
-            resumes = []
-            if result.get("data", {}).get("Get", {}).get(self.class_name):
-                for item in result["data"]["Get"][self.class_name]:
-                    resumes.append({
-                        "id": item["_additional"]["id"],
-                        "content": item["content"],
-                        "file_name": item["fileName"],
-                        "file_path": item["filePath"],
-                        "keywords": item.get("keywords", []),
-                        "distance": item["_additional"]["distance"],
-                        "score": 1 - item["_additional"]["distance"]
-                    })
+    async def match_jobs(
+        self,
+        job_descriptions: List[str],
+        user_id: int,
+        limit: int = 5,
+        chunk_size: int = 16
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Score many job descriptions against all of a user's resumes, yielding each job as it finishes
+        
+        Jobs are encoded a chunk at a time and scored with one job x section
+        matrix product; each resume takes its best section (max-sim), then the
+        usual keyword blend is applied per job.
+        """
+        if not self.initialized:
+            logger.warning("Vector service not initialized, returning empty results")
+            for position in range(len(job_descriptions)):
+                yield {"index": position, "matches": []}
+            return
+        
+        corpus = await self.index.get_user_vectors(user_id)
+        section_matrix, offsets, kinds = await self._section_matrix(corpus["ids"], corpus["vectors"])
+        bounds = list(zip(offsets, list(offsets[1:]) + [len(section_matrix)]))
+        
+        for start in range(0, len(job_descriptions), chunk_size):
+            chunk = job_descriptions[start:start + chunk_size]
+            if not corpus["ids"]:
+                for position in range(len(chunk)):
+                    yield {"index": start + position, "matches": []}
+                continue
             
-            return resumes
+            job_vectors = await self._embed_many(chunk)
+            job_vectors = job_vectors / np.maximum(np.linalg.norm(job_vectors, axis=1, keepdims=True), 1e-12)
+            # jobs x sections, then max over each resume's block of section columns
+            section_similarities = job_vectors @ section_matrix.T
+            best = np.stack([
+                section_similarities[:, first:last].argmax(axis=1) + first for first, last in bounds
+            ], axis=1)
+            similarities = np.take_along_axis(section_similarities, best, axis=1)
             
+            for row, job_description in enumerate(chunk):
+                results = [
+                    {
+                        "id": resume_id,
+                        "content": properties.get("content"),
+                        "file_name": properties.get("fileName"),
+                        "file_path": properties.get("filePath"),
+                        "keywords": properties.get("keywords") or [],
+                        "skill_mask": decode_mask(properties.get("skillMask")),
+                        "distance": 1 - float(similarity),
+                        "score": float(similarity),
+                        "best_section": kinds[column]
+                    }
+                    for resume_id, properties, similarity, column in zip(
+                        corpus["ids"], corpus["metadata"], similarities[row], best[row]
+                    )
+                ]
+                enhanced_results = self._enhance_with_keyword_matching(results, job_description)
+                enhanced_results.sort(key=lambda x: x["score"], reverse=True)
+                yield {"index": start + row, "matches": enhanced_results[:limit]}
+    
+    async def _section_matrix(self, resume_ids: List[str], document_vectors: np.ndarray):
+        """Stack every resume's normalized section vectors
+        
+        Returns the matrix, each resume's first row, and the section kind of every row.
+        """
+        if not resume_ids:
+            return np.zeros((0, 0), dtype=np.float32), np.zeros(0, dtype=np.int64), []
+        
+        sections = await self.index.get_sections(resume_ids)
+        blocks, offsets, kinds, row = [], [], [], 0
+        for resume_id, document_vector in zip(resume_ids, document_vectors):
+            entry = sections.get(resume_id)
+            if entry and len(entry["vectors"]):
+                block = np.asarray(entry["vectors"], dtype=np.float32)
+                kinds.extend(entry["kinds"])
+            else:
+                block = np.asarray(document_vector, dtype=np.float32)[None, :]
+                kinds.append(None)
+            blocks.append(block / np.maximum(np.linalg.norm(block, axis=1, keepdims=True), 1e-12))
+            offsets.append(row)
+            row += len(block)
+        return np.vstack(blocks), np.asarray(offsets, dtype=np.int64), kinds
+    
+    async def _vector_search(self, query_embedding, user_id: int, limit: int) -> List[Dict[str, Any]]:
+        """Perform vector similarity search"""
+        try:
+            # Get more results for reranking
+            return await self.index.search(query_embedding, user_id, limit * 2)
         except Exception as e:
             logger.error(f"Vector search error: {str(e)}")
             return []
     
+    async def _score_by_sections(self, query_embedding, results: List[Dict[str, Any]]):
+        """Replace whole-document similarity with max-sim over each resume's sections"""
+        if not results:
+            return
+        try:
+            sections = await self.index.get_sections([result["id"] for result in results])
+        except Exception as e:
+            logger.error(f"Section lookup failed, keeping document scores: {str(e)}")
+            return
+        
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        for result in results:
+            entry = sections.get(result["id"])
+            if not entry or not len(entry["vectors"]):
+                continue
+            vectors = entry["vectors"]
+            similarities = (vectors @ query) / np.maximum(np.linalg.norm(vectors, axis=1), 1e-12)
+            best = int(np.argmax(similarities))
+            result["score"] = float(similarities[best])
+            result["distance"] = 1 - result["score"]
+            result["best_section"] = entry["kinds"][best]
+    
     def _enhance_with_keyword_matching(self, results: List[Dict], job_description: str) -> List[Dict]:
         """Enhance vector search results with keyword matching"""
-        job_keywords = set(self._extract_keywords(job_description))
+        job_mask = skill_vocabulary.mask(self._extract_keywords(job_description))
         
         for result in results:
-            resume_keywords = set(result.get("keywords", []))
-            
-            # Calculate keyword overlap score
-            if job_keywords and resume_keywords:
-                overlap = len(job_keywords.intersection(resume_keywords))
-                keyword_score = overlap / len(job_keywords)
-            else:
-                keyword_score = 0
-            
-            # Combine vector and keyword scores (weighted average)
-            vector_score = result["score"]
-            combined_score = (0.7 * vector_score) + (0.3 * keyword_score)
-            
-            result["score"] = combined_score
-            result["keyword_matches"] = list(job_keywords.intersection(resume_keywords))
+            # Objects stored before masks existed fall back to their keyword list
+            if result.get("skill_mask") is None:
+                result["skill_mask"] = skill_vocabulary.mask(result.get("keywords", []))
         
-        return results
+        # Combine vector and keyword scores (weighted average)
+        return rerank(
+            results,
+            job_mask,
+            skill_vocabulary,
+            vector_weight=self.vector_weight,
+            keyword_weight=self.keyword_weight
+        )
     
     def _extract_keywords(self, text: str) -> List[str]:
         """Extract relevant keywords from text"""
-        import re
-        
-        # Technical skills patterns
-        tech_patterns = [
-            r'\b(?:Python|JavaScript|TypeScript|React|Vue|Angular|Node\.js|Java|C\+\+|C#|Go|Rust|PHP|Ruby)\b',
-            r'\b(?:SQL|MySQL|PostgreSQL|MongoDB|Redis|Elasticsearch)\b',
-            r'\b(?:AWS|Azure|GCP|Docker|Kubernetes|Jenkins|Git|GitHub)\b',
-            r'\b(?:HTML|CSS|SASS|Bootstrap|Tailwind)\b',
-            r'\b(?:REST|GraphQL|API|microservices|serverless)\b',
-            r'\b(?:machine learning|ML|AI|data science|analytics)\b',
-            r'\b(?:agile|scrum|DevOps|CI/CD|TDD|testing)\b'
-        ]
-        
-        # Soft skills patterns
-        soft_patterns = [
-            r'\b(?:leadership|management|communication|collaboration)\b',
-            r'\b(?:problem[- ]solving|analytical|creative|innovative)\b',
-            r'\b(?:project management|team lead|mentoring)\b'
-        ]
-        
-        keywords = []
-        text_lower = text.lower()
-        
-        all_patterns = tech_patterns + soft_patterns
-        for pattern in all_patterns:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            keywords.extend(matches)
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_keywords = []
-        for keyword in keywords:
-            if keyword.lower() not in seen:
-                seen.add(keyword.lower())
-                unique_keywords.append(keyword)
-        
-        return unique_keywords[:20]  # Limit to top 20 keywords
+        return skill_extractor.extract(text, limit=20)  # Limit to top 20 keywords
     
-    async def delete_resume(self, resume_id: str):
+    async def delete_resume(self, resume_id: str, user_id: Optional[int] = None):
         """Delete resume from vector database"""
         if not self.initialized:
             logger.warning("Vector service not initialized, skipping deletion")
             return
         
         try:
-            self.client.data_object.delete(
-                uuid=resume_id,
-                class_name=self.class_name
-            )
+            await self.index.delete(resume_id)
             logger.info(f"Deleted resume with ID: {resume_id}")
         except Exception as e:
             logger.error(f"Error deleting resume: {str(e)}")
+        finally:
+            # Without an owner every user's cached results are dropped
+            self.result_cache.invalidate_user(user_id)
     
     async def close(self):
         """Close connections and cleanup"""
         self.initialized = False
-        # Weaviate client doesn't need explicit closing
+        if self.embedder:
+            await self.embedder.close()
+        if self.index:
+            await self.index.close()
         logger.info("Vector service closed")
@@ -0,0 +1,373 @@
+import weaviate
+import logging
+import threading
+import uuid
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+from weaviate.exceptions import ObjectAlreadyExistsException
+
+from app.services.bounded_executor import BoundedExecutor
+from app.services.skill_index import decode_mask
+
+logger = logging.getLogger(__name__)
+
+class WeaviateIndex:
+    """Weaviate-backed resume vector index
+
+    The v3 client is synchronous, so every call runs on a dedicated bounded
+    thread pool sized to the client's keep-alive session pool: each worker
+    reuses a pooled connection and the event loop never blocks on I/O. The
+    client has a single, non-thread-safe ``Batch``, so batch imports and
+    deletes take turns on ``_batch_lock``.
+    """
+
+    def __init__(self, url: str, class_name: str = "Resume", max_workers: int = 8,
+                 max_queue: int = 64, call_timeout: float = 10.0, import_timeout: Optional[float] = None):
+        self.url = url
+        self.class_name = class_name
+        self.section_class_name = f"{class_name}Section"
+        self.call_timeout = call_timeout
+        self.import_timeout = import_timeout
+        self.executor = BoundedExecutor(
+            "weaviate", max_workers=max_workers, max_queue=max_queue, default_timeout=call_timeout
+        )
+        self.client = None
+        self._batch_lock = threading.Lock()
+
+    async def _call(self, fn, *args, timeout: Optional[float] = ..., **kwargs):
+        """Run a blocking client call on the index's executor"""
+        return await self.executor.run(fn, *args, timeout=timeout, **kwargs)
+
+    def _connect(self) -> "weaviate.Client":
+        pool_size = self.executor.max_workers
+        return weaviate.Client(
+            url=self.url,
+            # The read timeout also bounds how long a worker can be held by a call the caller gave up on
+            timeout_config=(5, max(1, int(self.call_timeout or 30))),
+            additional_config=weaviate.Config(
+                connection_config=weaviate.ConnectionConfig(
+                    session_pool_connections=pool_size,
+                    session_pool_maxsize=pool_size
+                )
+            )
+        )
+
+    async def initialize(self):
+        """Connect to Weaviate and make sure the schema exists"""
+        # The client constructor probes the server, so keep it off the event loop
+        self.client = await self._call(self._connect)
+
+        # Test connection
+        if await self._call(self.client.is_ready):
+            logger.info("Weaviate connection established")
+        else:
+            raise Exception("Weaviate not ready")
+
+        # Create schema if needed
+        await self._create_schema()
+
+    async def _create_schema(self):
+        """Create Weaviate schema for resumes with enhanced properties"""
+        schema = {
+            "class": self.class_name,
+            "description": "Resume documents with semantic embeddings",
+            "vectorIndexType": "hnsw",
+            "vectorIndexConfig": {
+                "distance": "cosine",
+                "efConstruction": 128,
+                "maxConnections": 64
+            },
+            "properties": [
+                {
+                    "name": "content",
+                    "dataType": ["text"],
+                    "description": "Full resume text content",
+                    "indexSearchable": True
+                },
+                {
+                    "name": "userId",
+                    "dataType": ["int"],
+                    "description": "User ID who owns this resume"
+                },
+                {
+                    "name": "fileName",
+                    "dataType": ["string"],
+                    "description": "Original filename"
+                },
+                {
+                    "name": "filePath",
+                    "dataType": ["string"],
+                    "description": "File storage path"
+                },
+                {
+                    "name": "keywords",
+                    "dataType": ["string[]"],
+                    "description": "Extracted keywords and skills"
+                },
+                {
+                    "name": "skillMask",
+                    "dataType": ["text"],
+                    "description": "Hex bitmask of canonical skills (see skill_index.SkillVocabulary)",
+                    "indexSearchable": False
+                },
+                {
+                    "name": "createdAt",
+                    "dataType": ["date"],
+                    "description": "Creation timestamp"
+                }
+            ],
+            "vectorizer": "none"
+        }
+
+        section_schema = {
+            "class": self.section_class_name,
+            "description": "Per-section resume embeddings keyed by section content hash",
+            "vectorIndexType": "hnsw",
+            "vectorIndexConfig": {
+                "distance": "cosine"
+            },
+            "properties": [
+                {
+                    "name": "resumeId",
+                    "dataType": ["string"],
+                    "description": "ID of the parent resume object"
+                },
+                {
+                    "name": "userId",
+                    "dataType": ["int"],
+                    "description": "User ID who owns this resume"
+                },
+                {
+                    "name": "sectionHash",
+                    "dataType": ["string"],
+                    "description": "Content hash of the section text"
+                },
+                {
+                    "name": "kind",
+                    "dataType": ["string"],
+                    "description": "Section kind (summary, experience, skills, ...)"
+                }
+            ],
+            "vectorizer": "none"
+        }
+
+        try:
+            existing_schema = await self._call(self.client.schema.get)
+            existing_classes = {cls["class"]: cls for cls in existing_schema.get("classes", [])}
+
+            for class_schema in (schema, section_schema):
+                existing = existing_classes.get(class_schema["class"])
+                if existing is None:
+                    await self._call(self.client.schema.create_class, class_schema)
+                    logger.info(f"Created Weaviate schema for class {class_schema['class']}")
+                    continue
+
+                # Classes created by an older release lack properties added since (e.g. skillMask);
+                # objects stored before the upgrade simply have no value for them
+                known = {prop["name"] for prop in existing.get("properties") or []}
+                for prop in class_schema["properties"]:
+                    if prop["name"] not in known:
+                        await self._call(self.client.schema.property.create, class_schema["class"], prop)
+                        logger.info(f"Added property {prop['name']} to Weaviate class {class_schema['class']}")
+                logger.info(f"Schema for class {class_schema['class']} is up to date")
+
+        except Exception as e:
+            logger.error(f"Error creating/checking schema: {str(e)}")
+
+    async def store(self, resume_id: str, vector, properties: Dict[str, Any]):
+        """Store (or replace) one resume object with its embedding"""
+        try:
+            await self._call(
+                self.client.data_object.create,
+                data_object=properties,
+                class_name=self.class_name,
+                uuid=resume_id,
+                vector=vector.tolist()
+            )
+        except ObjectAlreadyExistsException:
+            await self._call(
+                self.client.data_object.replace,
+                data_object=properties,
+                class_name=self.class_name,
+                uuid=resume_id,
+                vector=vector.tolist()
+            )
+
+    async def store_many(self, objects: Sequence[Tuple[str, Any, Dict[str, Any]]],
+                         batch_size: int = 100, num_workers: int = 2) -> Dict[str, str]:
+        """Import (id, vector, properties) triples via the batch API; returns failures by ID"""
+        return await self._call(
+            self._import_batch, objects, batch_size, num_workers, timeout=self.import_timeout
+        )
+
+    def _import_batch(self, objects, batch_size: int, num_workers: int, class_name: Optional[str] = None) -> Dict[str, str]:
+        errors: Dict[str, str] = {}
+
+        def collect_errors(results):
+            for result in results or []:
+                item_errors = result.get("result", {}).get("errors")
+                if item_errors:
+                    messages = [error.get("message", "") for error in item_errors.get("error", [])]
+                    errors[str(result.get("id"))] = "; ".join(filter(None, messages)) or str(item_errors)
+
+        # Configure and flush under one lock so concurrent imports can't
+        # reconfigure each other's batch or share a flush and its callback
+        with self._batch_lock:
+            self.client.batch.configure(
+                batch_size=batch_size,
+                num_workers=num_workers,
+                dynamic=False,
+                callback=collect_errors
+            )
+            with self.client.batch as batch:
+                for resume_id, vector, properties in objects:
+                    batch.add_data_object(
+                        data_object=properties,
+                        class_name=class_name or self.class_name,
+                        uuid=resume_id,
+                        vector=vector
+                    )
+        return errors
+
+    def _delete_batch(self, class_name: str, where: Dict[str, Any]):
+        with self._batch_lock:
+            return self.client.batch.delete_objects(class_name=class_name, where=where)
+
+    async def search(self, vector, user_id: int, limit: int) -> List[Dict[str, Any]]:
+        """Perform vector similarity search within a user's resumes"""
+        query = (
+            self.client.query
+            .get(self.class_name, ["content", "userId", "fileName", "filePath", "keywords", "skillMask"])
+            .with_near_vector({"vector": vector.tolist()})
+            .with_where({
+                "path": ["userId"],
+                "operator": "Equal",
+                "valueInt": user_id
+            })
+            .with_additional(["distance", "id"])
+            .with_limit(limit)
+        )
+        result = await self._call(query.do)
+
+        resumes = []
+        if result.get("data", {}).get("Get", {}).get(self.class_name):
+            for item in result["data"]["Get"][self.class_name]:
+                resumes.append({
+                    "id": item["_additional"]["id"],
+                    "content": item["content"],
+                    "file_name": item["fileName"],
+                    "file_path": item["filePath"],
+                    "keywords": item.get("keywords", []),
+                    "skill_mask": decode_mask(item.get("skillMask")),
+                    "distance": item["_additional"]["distance"],
+                    "score": 1 - item["_additional"]["distance"]
+                })
+
+        return resumes
+
+    async def get_user_vectors(self, user_id: int, max_resumes: int = 1000) -> Dict[str, Any]:
+        """All of a user's resume IDs, properties and vectors"""
+        query = (
+            self.client.query
+            .get(self.class_name, ["content", "fileName", "filePath", "keywords", "skillMask"])
+            .with_where({
+                "path": ["userId"],
+                "operator": "Equal",
+                "valueInt": user_id
+            })
+            .with_additional(["id", "vector"])
+            .with_limit(max_resumes)
+        )
+        result = await self._call(query.do)
+
+        ids, metadata, vectors = [], [], []
+        for item in result.get("data", {}).get("Get", {}).get(self.class_name) or []:
+            ids.append(item["_additional"]["id"])
+            vectors.append(item["_additional"]["vector"])
+            metadata.append({key: item.get(key) for key in ("content", "fileName", "filePath", "keywords", "skillMask")})
+        return {"ids": ids, "metadata": metadata, "vectors": np.asarray(vectors, dtype=np.float32)}
+
+    async def delete(self, resume_id: str):
+        """Delete one resume object and its sections"""
+        await self._call(
+            self.client.data_object.delete,
+            uuid=resume_id,
+            class_name=self.class_name
+        )
+        await self.delete_sections(resume_id)
+
+    def _section_uuid(self, resume_id: str, digest: str) -> str:
+        # Deterministic IDs make re-importing an unchanged section an idempotent overwrite
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{resume_id}/{digest}"))
+
+    async def store_sections(self, entries) -> Dict[str, str]:
+        """Upsert (resume_id, user_id, section_hash, kind, vector) entries; returns failures by resume ID"""
+        objects = []
+        owners = {}
+        for resume_id, user_id, digest, kind, vector in entries:
+            section_id = self._section_uuid(resume_id, digest)
+            owners[section_id] = resume_id
+            objects.append((section_id, vector, {
+                "resumeId": resume_id,
+                "userId": user_id,
+                "sectionHash": digest,
+                "kind": kind
+            }))
+        if not objects:
+            return {}
+
+        errors = await self._call(
+            self._import_batch, objects, 100, 1, self.section_class_name, timeout=self.import_timeout
+        )
+        return {owners[section_id]: error for section_id, error in errors.items() if section_id in owners}
+
+    async def delete_sections(self, resume_id: str, hashes: Optional[List[str]] = None):
+        """Remove some (or all) section objects of a resume"""
+        where = {"path": ["resumeId"], "operator": "Equal", "valueString": resume_id}
+        if hashes is not None:
+            if not hashes:
+                return
+            where = {"operator": "And", "operands": [
+                where,
+                {"path": ["sectionHash"], "operator": "ContainsAny", "valueStringArray": list(hashes)}
+            ]}
+        await self._call(self._delete_batch, self.section_class_name, where)
+
+    async def get_sections(self, resume_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Section hashes, kinds and vectors for the given resumes"""
+        if not resume_ids:
+            return {}
+        query = (
+            self.client.query
+            .get(self.section_class_name, ["resumeId", "sectionHash", "kind"])
+            .with_where({"path": ["resumeId"], "operator": "ContainsAny", "valueStringArray": list(resume_ids)})
+            .with_additional(["vector"])
+            .with_limit(10000)
+        )
+        result = await self._call(query.do)
+
+        grouped: Dict[str, Dict[str, list]] = {}
+        for item in result.get("data", {}).get("Get", {}).get(self.section_class_name) or []:
+            entry = grouped.setdefault(item["resumeId"], {"hashes": [], "kinds": [], "vectors": []})
+            entry["hashes"].append(item["sectionHash"])
+            entry["kinds"].append(item["kind"])
+            entry["vectors"].append(item["_additional"]["vector"])
+
+        return {
+            resume_id: {
+                "hashes": entry["hashes"],
+                "kinds": entry["kinds"],
+                "vectors": np.asarray(entry["vectors"], dtype=np.float32)
+            }
+            for resume_id, entry in grouped.items()
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Executor queue depth, in-flight calls and outcome counters"""
+        return {"executor": self.executor.stats(), "call_timeout": self.call_timeout}
+
+    async def close(self):
+        """Drop the client and stop the executor's threads"""
+        self.client = None
+        self.executor.shutdown()
@@ -0,0 +1,85 @@
+"""Throughput, p95 latency and vector agreement of encoder backends
+
+Run from backend/: python -m benchmarks.bench_encoders [--threads N]
+
+Every backend is compared with the full-precision ``torch`` backend; the run
+fails if any backend's minimum cosine similarity drops below
+COMPATIBILITY_TOLERANCE, since its vectors could then no longer share an
+index with existing ones.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from app.services.encoders import COMPATIBILITY_TOLERANCE, ENCODER_BACKENDS, create_encoder
+
+SENTENCES = [
+    "Built event-driven microservices in Python and Go running on Kubernetes.",
+    "Led a team of five engineers delivering a React and TypeScript design system.",
+    "Reduced PostgreSQL query latency by 40% through indexing and query rewrites.",
+    "Owned CI/CD pipelines with GitHub Actions, Docker and Terraform on AWS.",
+    "Trained and deployed machine learning models for demand forecasting.",
+    "We are looking for a senior backend engineer with strong distributed systems experience.",
+    "Experience with GraphQL APIs, Redis caching and observability tooling is a plus.",
+    "Mentored junior developers and ran agile ceremonies for a cross-functional team.",
+]
+
+def make_texts(rng: random.Random, count: int, sentences_per_text: int) -> list:
+    return [" ".join(rng.choice(SENTENCES) for _ in range(sentences_per_text)) for _ in range(count)]
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--backends", nargs="+", default=sorted(ENCODER_BACKENDS))
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--latency-samples", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    texts = make_texts(rng, args.texts, sentences_per_text=6)
+    singles = make_texts(rng, args.latency_samples, sentences_per_text=3)
+
+    reference = None
+    failed = False
+    print(f"{args.model}, threads={args.threads or 'default'}, batch={args.batch_size}")
+    print(f"{'backend':<12}{'texts/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'min cos':>10}{'mean cos':>10}")
+    for backend in ["torch"] + [b for b in args.backends if b != "torch"]:
+        encoder = create_encoder(backend, args.model, num_threads=args.threads)
+        encoder.encode(texts[:args.batch_size], batch_size=args.batch_size)  # warm-up
+
+        start = time.perf_counter()
+        vectors = encoder.encode(texts, batch_size=args.batch_size)
+        throughput = len(texts) / (time.perf_counter() - start)
+
+        latencies = []
+        for text in singles:
+            start = time.perf_counter()
+            encoder.encode([text], batch_size=1)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        if reference is None:
+            reference = vectors
+        cosines = (vectors * reference).sum(axis=1)
+        if cosines.min() < COMPATIBILITY_TOLERANCE:
+            failed = True
+
+        print(f"{backend:<12}{throughput:>10.1f}{statistics.median(latencies):>10.2f}"
+              f"{percentile(latencies, 95):>10.2f}{cosines.min():>10.4f}{cosines.mean():>10.4f}")
+
+    if failed:
+        print(f"FAIL: a backend fell below the {COMPATIBILITY_TOLERANCE} cosine compatibility tolerance")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Resume text extraction throughput: inline on the event loop vs the process pool
+
+Run from backend/: python -m benchmarks.bench_extraction [--corpus DIR] [--documents 200] [--workers 4]
+
+Without ``--corpus`` a synthetic corpus of multi-page PDFs and DOCX files is
+generated in a temporary directory. Besides documents per second, each run
+reports the worst event-loop stall seen by a 10 ms heartbeat, which is what
+other requests would wait while a document is parsed.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import docx
+
+from app.services.text_extraction import TextExtractor, _init_worker, extract_document, sniff_format
+
+WORDS = ("python", "kubernetes", "postgresql", "led", "migrated", "reduced", "latency", "pipeline", "team",
+         "services", "designed", "react", "aws", "terraform", "customers", "api", "scaled", "on-call")
+
+def _line(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 14))).capitalize()
+
+def write_pdf(path: str, pages):
+    """Minimal PDF with one Helvetica text stream per page"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        commands = ["BT", "/F1 10 Tf", "14 TL", "50 780 Td"]
+        for line in lines:
+            commands.append(f"({line.replace('(', '').replace(')', '')}) Tj T*")
+        commands.append("ET")
+        stream = "\n".join(commands)
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    body, offsets = b"%PDF-1.4\n", []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    body += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(body)
+
+def write_docx(path: str, lines):
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).text, table.cell(0, 1).text = "Skills", "Python, Kubernetes, PostgreSQL"
+    table.cell(1, 0).text, table.cell(1, 1).text = "Languages", "English, German"
+    document.save(path)
+
+def build_corpus(directory: str, count: int, seed: int = 0):
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        if i % 3 == 2:
+            path = os.path.join(directory, f"resume_{i}.docx")
+            write_docx(path, [_line(rng) for _ in range(60)])
+        else:
+            path = os.path.join(directory, f"resume_{i}.pdf")
+            write_pdf(path, [[_line(rng) for _ in range(50)] for _ in range(rng.randint(1, 3))])
+        paths.append(path)
+    return paths
+
+async def heartbeat(stop: asyncio.Event, lags: list):
+    """Record how late a 10 ms timer fires; a blocked loop shows up as a large lag"""
+    while not stop.is_set():
+        expected = time.perf_counter() + 0.01
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - expected)
+
+async def run_inline(paths, timeout: float):
+    _init_worker(0)  # the SIGALRM handler extract_document relies on
+    latencies = []
+    for path in paths:
+        with open(path, "rb") as f:
+            file_format = sniff_format(f.read(8), path)
+        started = time.perf_counter()
+        extract_document(path, file_format, timeout, ocr=False)
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0)
+    return latencies
+
+async def run_pool(paths, extractor: TextExtractor, concurrency: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(path: str):
+        async with semaphore:
+            started = time.perf_counter()
+            await extractor.extract(path)
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one(path) for path in paths))
+    return latencies
+
+async def measure(mode: str, paths, args) -> dict:
+    stop, lags = asyncio.Event(), []
+    beat = asyncio.create_task(heartbeat(stop, lags))
+    extractor = None
+    started = time.perf_counter()
+    if mode == "inline":
+        latencies = await run_inline(paths, args.timeout)
+    else:
+        extractor = TextExtractor(max_workers=args.workers, timeout=args.timeout, ocr=False)
+        # Start the workers outside the timed region
+        await extractor.extract(paths[0])
+        started = time.perf_counter()
+        latencies = await run_pool(paths, extractor, args.workers * 2)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await beat
+    if extractor:
+        extractor.shutdown()
+    return {
+        "docs_per_s": len(paths) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": sorted(latencies)[int(0.95 * (len(latencies) - 1))] * 1000,
+        "max_lag_ms": max(lags, default=0.0) * 1000
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", help="directory of .pdf/.docx/.doc files (default: synthetic)")
+    parser.add_argument("--documents", type=int, default=200, help="synthetic corpus size")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        if args.corpus:
+            paths = [os.path.join(args.corpus, name) for name in sorted(os.listdir(args.corpus))
+                     if name.lower().endswith((".pdf", ".docx", ".doc"))]
+        else:
+            paths = build_corpus(scratch, args.documents)
+        print(f"{len(paths)} documents, {args.workers} workers")
+        print(f"{'mode':<8}{'docs/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'max loop stall ms':>19}")
+        for mode in ("inline", "pool"):
+            result = asyncio.run(measure(mode, paths, args))
+            print(f"{mode:<8}{result['docs_per_s']:>9.1f}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}"
+                  f"{result['max_lag_ms']:>19.1f}")
+
+if __name__ == "__main__":
+    main()
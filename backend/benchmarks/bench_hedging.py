@@ -0,0 +1,73 @@
+"""Tail latency of LLM calls with and without hedging across providers
+
+Run from backend/: python -m benchmarks.bench_hedging [--requests 300] [--time-scale 0.1]
+
+Uses in-process stub providers: a primary with a slow tail (and an optional
+outage window) and a steadier secondary. Delays are multiplied by
+``--time-scale`` so the run finishes quickly; reported latencies are scaled
+back to real seconds.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.services.llm_providers import CircuitBreaker, ProviderRouter, ProvidersUnavailable
+from tools.stub_providers import StubProvider
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+async def run(hedge: bool, args) -> dict:
+    scale = args.time_scale
+    primary = StubProvider("openai", median_seconds=1.0 * scale, tail_probability=args.tail,
+                           tail_seconds=8.0 * scale, failure_rate=args.failure_rate, seed=1)
+    secondary = StubProvider("huggingface", median_seconds=1.5 * scale, failure_rate=0.01, seed=2)
+    breakers = {name: CircuitBreaker(slow_call_seconds=10.0 * scale, open_seconds=30.0 * scale)
+                for name in ("openai", "huggingface")}
+    router = ProviderRouter([primary, secondary], breakers=breakers, hedge=hedge,
+                            hedge_after=3.0 * scale, min_hedge_delay=0.25 * scale)
+
+    latencies, failures = [], 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def call():
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await router.complete("prompt", "system", 600, 0.4)
+            except ProvidersUnavailable:
+                failures += 1
+                return
+            latencies.append((time.perf_counter() - started) / scale)
+
+    await asyncio.gather(*(call() for _ in range(args.requests)))
+    return {
+        "p50": statistics.median(latencies),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "failures": failures,
+        "hedged": router.hedged,
+        "secondary_calls": secondary.calls
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--tail", type=float, default=0.1, help="share of primary calls in the slow tail")
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--time-scale", type=float, default=0.1)
+    args = parser.parse_args()
+
+    print(f"{args.requests} calls, primary tail {args.tail:.0%}, primary errors {args.failure_rate:.0%}")
+    print(f"{'mode':<10}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}{'failed':>8}{'hedged':>8}{'2nd calls':>11}")
+    for hedge in (False, True):
+        result = asyncio.run(run(hedge, args))
+        print(f"{'hedged' if hedge else 'primary':<10}{result['p50']:>8.2f}{result['p95']:>8.2f}{result['p99']:>8.2f}"
+              f"{result['failures']:>8}{result['hedged']:>8}{result['secondary_calls']:>11}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Throughput and 429s of the LLM client under a provider quota, with and without client-side limits
+
+Run from backend/: python -m benchmarks.bench_llm_client [--requests 200] [--rpm 60 --window 10]
+
+Starts tools/stub_llm_server in-process with a request quota of ``--rpm``
+calls per ``--window`` seconds, then fires every request at once through
+MLService._call_openai. The "unlimited" run only has retries (honouring
+Retry-After) to cope with the quota; the "limited" run also sizes the token
+buckets to 90% of the quota.
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+import httpx
+import openai
+import uvicorn
+
+from app.services.ml_service import MLService
+from app.services.rate_limiter import LLMRateLimiter
+from tools.stub_llm_server import Quota, create_app
+
+def start_stub(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+async def run(mode: str, args, app) -> dict:
+    app.state.quota = Quota(rpm=args.rpm, window_seconds=args.window)
+    per_minute = args.rpm * 60 / args.window
+
+    service = MLService()
+    service.max_retries = args.retries
+    http_client = httpx.AsyncClient(limits=httpx.Limits(max_connections=args.concurrency,
+                                                        max_keepalive_connections=args.concurrency))
+    service.openai_client = openai.AsyncOpenAI(
+        api_key="stub", base_url=f"http://127.0.0.1:{args.port}/v1", http_client=http_client, max_retries=0
+    )
+    if mode == "limited":
+        service.rate_limiter = LLMRateLimiter(
+            max_concurrency=args.concurrency,
+            requests_per_minute=0.9 * per_minute,
+            tokens_per_minute=10 ** 9,
+            burst_seconds=args.window / 6
+        )
+    else:
+        service.rate_limiter = LLMRateLimiter(max_concurrency=args.concurrency,
+                                              requests_per_minute=10 ** 9, tokens_per_minute=10 ** 12)
+
+    latencies = []
+
+    async def call(i: int):
+        started = time.perf_counter()
+        await service._call_openai(f"Suggest resume improvements for job posting #{i}")
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(call(i) for i in range(args.requests)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    await http_client.aclose()
+
+    return {
+        "ok": len(latencies),
+        "failed": sum(isinstance(outcome, Exception) for outcome in outcomes),
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p95": percentile(latencies, 95) if latencies else 0.0,
+        "retries": service.retries,
+        "server_429": app.state.quota.rejected
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rpm", type=int, default=60, help="requests allowed per window by the stub")
+    parser.add_argument("--window", type=float, default=10.0, help="stub quota window in seconds")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--port", type=int, default=8091)
+    args = parser.parse_args()
+
+    app = create_app(args.latency_ms, 0.0)
+    server = start_stub(app, args.port)
+
+    quota_rps = args.rpm / args.window
+    print(f"{args.requests} requests, quota {args.rpm}/{args.window:g}s ({quota_rps:.1f} req/s), "
+          f"concurrency {args.concurrency}, retries {args.retries}")
+    print(f"{'mode':<11}{'ok':>6}{'failed':>8}{'req/s':>8}{'p50 s':>8}{'p95 s':>8}{'retries':>9}{'429s':>7}")
+    for mode in ("unlimited", "limited"):
+        result = asyncio.run(run(mode, args, app))
+        print(f"{mode:<11}{result['ok']:>6}{result['failed']:>8}{result['rps']:>8.2f}{result['p50']:>8.2f}"
+              f"{result['p95']:>8.2f}{result['retries']:>9}{result['server_429']:>7}")
+
+    server.should_exit = True
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Memory and recall of quantized embedding storage against float32
+
+Run from backend/: python -m benchmarks.bench_quantization
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.services import quantization
+from app.services.quantization import QuantizedMatrix
+
+def make_embeddings(rng: np.random.Generator, n: int, dim: int, clusters: int = 256) -> np.ndarray:
+    """Clustered unit vectors, closer to real sentence embeddings than uniform noise"""
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--rescore-factor", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    vectors = make_embeddings(rng, args.rows, args.dim)
+    queries = make_embeddings(rng, args.queries, args.dim)
+
+    baseline = QuantizedMatrix.from_float32(vectors, "float32")
+    truth = [set(quantization.top_k(baseline.scores(q), args.k)) for q in queries]
+
+    print(f"{args.rows} x {args.dim} vectors, {args.queries} queries, recall@{args.k}")
+    print(f"{'mode':<18}{'MB / 1M rows':>14}{'recall':>10}{'ms / query':>12}")
+    for mode in ("float32", "float16", "int8"):
+        matrix = QuantizedMatrix.from_float32(vectors, mode)
+        mb_per_million = matrix.nbytes / args.rows * 1_000_000 / 2**20
+        variants = [(mode, None)]
+        if mode != "float32":
+            variants.append((f"{mode}+rescore", vectors))
+
+        for label, exact in variants:
+            hits = 0
+            start = time.perf_counter()
+            for q, expected in zip(queries, truth):
+                found, _ = quantization.search(matrix, q, args.k, exact=exact, rescore_factor=args.rescore_factor)
+                hits += len(expected.intersection(found.tolist()))
+            per_query_ms = (time.perf_counter() - start) / len(queries) * 1000
+            recall = hits / (args.k * len(queries))
+            print(f"{label:<18}{mb_per_million:>14.1f}{recall:>10.4f}{per_query_ms:>12.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Per-document cost of skill extraction on ~10 KB resumes
+
+Run from backend/: python -m benchmarks.bench_skill_extractor
+"""
+import argparse
+import random
+import re
+import time
+
+from app.services.skill_extractor import SkillExtractor
+
+# The per-call regex passes previously used by VectorService._extract_keywords
+LEGACY_PATTERNS = [
+    r'\b(?:Python|JavaScript|TypeScript|React|Vue|Angular|Node\.js|Java|C\+\+|C#|Go|Rust|PHP|Ruby)\b',
+    r'\b(?:SQL|MySQL|PostgreSQL|MongoDB|Redis|Elasticsearch)\b',
+    r'\b(?:AWS|Azure|GCP|Docker|Kubernetes|Jenkins|Git|GitHub)\b',
+    r'\b(?:HTML|CSS|SASS|Bootstrap|Tailwind)\b',
+    r'\b(?:REST|GraphQL|API|microservices|serverless)\b',
+    r'\b(?:machine learning|ML|AI|data science|analytics)\b',
+    r'\b(?:agile|scrum|DevOps|CI/CD|TDD|testing)\b',
+    r'\b(?:leadership|management|communication|collaboration)\b',
+    r'\b(?:problem[- ]solving|analytical|creative|innovative)\b',
+    r'\b(?:project management|team lead|mentoring)\b',
+]
+
+FILLER = (
+    "Designed and delivered features across the platform, partnering with product and "
+    "design to ship on schedule while improving reliability and reducing costs. "
+).split()
+SKILLS = ["Python", "React", "Node.js", "AWS", "Docker", "Kubernetes", "PostgreSQL",
+          "GraphQL", "CI/CD", "machine learning", "leadership", "problem-solving", "C++"]
+
+def legacy_extract(text: str):
+    keywords = []
+    text_lower = text.lower()
+    for pattern in LEGACY_PATTERNS:
+        keywords.extend(re.findall(pattern, text_lower, re.IGNORECASE))
+    seen = set()
+    unique_keywords = []
+    for keyword in keywords:
+        if keyword.lower() not in seen:
+            seen.add(keyword.lower())
+            unique_keywords.append(keyword)
+    return unique_keywords[:20]
+
+def make_resume(rng: random.Random, size: int) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(SKILLS) if rng.random() < 0.05 else rng.choice(FILLER)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+def bench(label, fn, docs, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for doc in docs:
+            fn(doc)
+    elapsed = time.perf_counter() - start
+    per_doc_us = elapsed / (repeat * len(docs)) * 1e6
+    print(f"{label:<12} {per_doc_us:10.1f} us/doc")
+    return per_doc_us
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--size", type=int, default=10_000, help="characters per resume")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    docs = [make_resume(rng, args.size) for _ in range(args.docs)]
+    extractor = SkillExtractor()
+
+    print(f"{args.docs} docs x {args.size} chars, {args.repeat} rounds")
+    legacy = bench("legacy", legacy_extract, docs, args.repeat)
+    shared = bench("shared", lambda doc: extractor.extract(doc, limit=20), docs, args.repeat)
+    print(f"speedup      {legacy / shared:10.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,11 @@ from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import os
 import uuid
-import aiofiles
 from typing import List
 from pydantic import BaseModel
 import logging
 from dotenv import load_dotenv
+from app.services.uploads import DEFAULT_MAX_BYTES, UnsupportedUpload, UploadSizeLimit, UploadTooLarge, save_upload
 
 # Load environment variables
 load_dotenv()
@@ -30,6 +30,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", DEFAULT_MAX_BYTES))
+
+# Reject oversized uploads before their bodies are spooled
+app.add_middleware(UploadSizeLimit, max_bytes=MAX_UPLOAD_BYTES)
+
 # In-memory storage for demo
 resumes_store = []
 matches_store = []
@@ -88,10 +93,13 @@ async def upload_resume(
     unique_filename = f"{file_id}{file_extension}"
     file_path = os.path.join(upload_dir, unique_filename)
     
-    # Save file
-    async with aiofiles.open(file_path, 'wb') as f:
-        content = await file.read()
-        await f.write(content)
+    # Stream to disk in chunks, checking size and content type as it arrives
+    try:
+        stored = await save_upload(file, file_path, max_bytes=MAX_UPLOAD_BYTES)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedUpload as e:
+        raise HTTPException(status_code=415, detail=str(e))
     
     # Store resume info
     resume_data = {
@@ -99,6 +107,8 @@ async def upload_resume(
         "file_name": file.filename,
         "file_path": file_path,
         "clerk_user_id": clerk_user_id,
+        "file_size": stored.size,
+        "sha256": stored.sha256,
         "created_at": "2024-01-01T00:00:00Z"
     }
     resumes_store.append(resume_data)
@@ -0,0 +1,176 @@
+"""OpenAI-compatible stub LLM server for offline development and load tests
+
+Run from backend/: python -m tools.stub_llm_server [--port 8089] [--token-delay-ms 30]
+
+Serves ``POST /v1/chat/completions`` with canned career-coach answers, either
+as one JSON body or, with ``"stream": true``, as OpenAI-style SSE chunks
+emitted one word at a time. Point the backend at it with
+``OPENAI_BASE_URL=http://localhost:8089/v1`` and any non-empty OPENAI_API_KEY.
+
+It also answers HuggingFace Inference API calls on ``POST /models/{model}``
+(``HUGGINGFACE_BASE_URL=http://localhost:8089/models``), so provider
+failover and hedging can be exercised offline.
+
+``--rpm`` / ``--tpm`` enforce per-minute request and token quotas like the
+real API: over-quota calls get a 429 with a Retry-After header.
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections import deque
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+EMAIL_REPLY = """Subject: Backend Engineer Application - Python and Distributed Systems
+
+Dear [Hiring Manager],
+
+I was excited to see the backend engineer opening on your platform team. Over the past four years I have built Python and Go services on Kubernetes, cut PostgreSQL query latency by 40% and owned the CI/CD pipelines that ship them.
+
+Your focus on reliable, data-heavy APIs matches the work I enjoy most, and I would love to bring that experience to your team.
+
+Would you be open to a short call next week to discuss how I could contribute?
+
+Best regards,
+[Your Name]"""
+
+GAP_REPLY = """- Add Kubernetes and Helm to the skills section and name the clusters you operated
+- Quantify the impact of the PostgreSQL tuning work with latency and cost numbers
+- Mention Terraform explicitly in the infrastructure bullet points
+- Highlight on-call ownership and incident response for production services
+- Add the AWS Solutions Architect certification if you hold it
+- Describe one distributed-systems project end to end, including scale and outcome"""
+
+def pick_reply(messages) -> str:
+    prompt = " ".join(message.get("content", "") for message in messages).lower()
+    if "json" in prompt:
+        payload = {"suggestions": [line.lstrip("- ") for line in GAP_REPLY.splitlines()]}
+        if "email" in prompt:
+            payload["email"] = EMAIL_REPLY
+        return json.dumps(payload)
+    return EMAIL_REPLY if "email" in prompt else GAP_REPLY
+
+class Quota:
+    """Sliding window of (timestamp, tokens) used to emulate provider rate limits
+
+    ``window_seconds`` shorter than a minute compresses time for quick load tests.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, window_seconds: float = 60.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window_seconds = window_seconds
+        self.window = deque()
+        self.tokens = 0
+        self.accepted = 0
+        self.rejected = 0
+
+    def admit(self, tokens: int):
+        """Return None if the call fits the quota, else seconds until it would"""
+        now = time.monotonic()
+        while self.window and now - self.window[0][0] >= self.window_seconds:
+            self.tokens -= self.window.popleft()[1]
+        over_requests = self.rpm and len(self.window) + 1 > self.rpm
+        over_tokens = self.tpm and self.tokens + tokens > self.tpm
+        if (over_requests or over_tokens) and self.window:
+            self.rejected += 1
+            return max(0.05, self.window_seconds - (now - self.window[0][0]))
+        self.window.append((now, tokens))
+        self.tokens += tokens
+        self.accepted += 1
+        return None
+
+def create_app(first_token_ms: float, token_delay_ms: float, rpm: int = 0, tpm: int = 0,
+               window_seconds: float = 60.0) -> FastAPI:
+    app = FastAPI(title="Stub LLM")
+    app.state.quota = Quota(rpm, tpm, window_seconds)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "stub")
+        reply = pick_reply(body.get("messages", []))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+        retry_after = app.state.quota.admit(prompt_tokens + int(body.get("max_tokens") or 256))
+        if retry_after is not None:
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"retry-after": f"{retry_after:.3f}", "retry-after-ms": str(int(retry_after * 1000))}
+            )
+
+        if not body.get("stream"):
+            await asyncio.sleep((first_token_ms + token_delay_ms * len(reply.split())) / 1000)
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(reply) // 4,
+                          "total_tokens": prompt_tokens + len(reply) // 4}
+            })
+
+        def chunk(delta: dict, finish_reason=None) -> str:
+            return "data: " + json.dumps({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }) + "\n\n"
+
+        async def stream():
+            await asyncio.sleep(first_token_ms / 1000)
+            yield chunk({"role": "assistant", "content": ""})
+            words = reply.split(" ")
+            for i, word in enumerate(words):
+                yield chunk({"content": word if i == 0 else " " + word})
+                await asyncio.sleep(token_delay_ms / 1000)
+            yield chunk({}, finish_reason="stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.post("/models/{model:path}")
+    async def huggingface_generate(model: str, request: Request):
+        body = await request.json()
+        reply = pick_reply([{"content": body.get("inputs", "")}])
+        max_tokens = int(body.get("parameters", {}).get("max_new_tokens") or 256)
+        retry_after = app.state.quota.admit(len(body.get("inputs", "")) // 4 + max_tokens)
+        if retry_after is not None:
+            return JSONResponse({"error": "Rate limit reached"}, status_code=429,
+                                headers={"retry-after": f"{retry_after:.3f}"})
+        await asyncio.sleep((first_token_ms + token_delay_ms * len(reply.split())) / 1000)
+        return JSONResponse([{"generated_text": reply}])
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--first-token-ms", type=float, default=300.0)
+    parser.add_argument("--token-delay-ms", type=float, default=30.0)
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute quota (0 = unlimited)")
+    parser.add_argument("--tpm", type=int, default=0, help="tokens per minute quota (0 = unlimited)")
+    parser.add_argument("--window-seconds", type=float, default=60.0, help="quota window length")
+    args = parser.parse_args()
+
+    app = create_app(args.first_token_ms, args.token_delay_ms, rpm=args.rpm, tpm=args.tpm,
+                     window_seconds=args.window_seconds)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""In-process LLM providers with scripted latency and failures, for router tests and benchmarks
+
+Example: a primary with a slow tail and occasional errors, hedged to a steady secondary::
+
+    primary = StubProvider("openai", median_seconds=0.8, tail_probability=0.1, tail_seconds=6.0)
+    secondary = StubProvider("huggingface", median_seconds=1.2, failure_rate=0.02)
+    router = ProviderRouter([primary, secondary])
+"""
+import asyncio
+import random
+from typing import Optional
+
+from app.services.llm_providers import LLMProvider
+
+class StubProvider(LLMProvider):
+    """Answers after a lognormal delay, sometimes from a slow tail, sometimes with an error"""
+
+    def __init__(self, name: str, median_seconds: float = 0.5, jitter: float = 0.25,
+                 tail_probability: float = 0.0, tail_seconds: float = 5.0, failure_rate: float = 0.0,
+                 reply: Optional[str] = None, seed: Optional[int] = None):
+        self.name = name
+        self.median_seconds = median_seconds
+        self.jitter = jitter
+        self.tail_probability = tail_probability
+        self.tail_seconds = tail_seconds
+        self.failure_rate = failure_rate
+        self.reply = reply or f'{{"suggestions": ["Answer from {name}"], "email": "Reply generated by the {name} stub provider for offline testing."}}'
+        self.random = random.Random(seed)
+        self.calls = 0
+
+    async def complete(self, prompt: str, system_prompt: str, max_tokens: int,
+                       temperature: float, json_mode: bool = False) -> str:
+        self.calls += 1
+        if self.random.random() < self.tail_probability:
+            delay = self.tail_seconds
+        else:
+            delay = self.median_seconds * self.random.lognormvariate(0, self.jitter)
+        failing = self.random.random() < self.failure_rate
+        await asyncio.sleep(delay)
+        if failing:
+            raise RuntimeError(f"{self.name} stub provider error")
+        return self.reply